@@ -1,12 +1,20 @@
-from db import get_conn
+import json
+import time
+from db import connection, DB_PATH
 from auth import hash_pw
+from counters import get_all_user_counts
+from passwords import hash_many
+from sessions import revoke_user_sessions
+from tasks import read_import_file
+
+def get_users(db_path=DB_PATH):
+    """[(id, alias, locked, failed_attempts, is_admin), ...] nach ID."""
+    with connection(db_path) as con:
+        return con.execute("SELECT id, alias, locked, failed_attempts, is_admin FROM users ORDER BY id").fetchall()
 
 def admin_show_users():
-    con = get_conn()
-    cur = con.cursor()
-    cur.execute("SELECT id, alias, locked, failed_attempts, is_admin FROM users ORDER BY id")
-    rows = cur.fetchall()
-    con.close()
+    rows = get_users()
+    counts = get_all_user_counts()
 
     print("\n=== Users ===")
     for r in rows:
@@ -14,25 +22,97 @@ def admin_show_users():
         if r[4]: status.append("ADMIN")
         if r[2]: status.append("LOCKED")
         status_txt = " | ".join(status) if status else "-"
-        print(f"{r[0]} | {r[1]} | {status_txt} | Fails: {r[3]}")
+        open_cnt, done_cnt, overdue = counts.get(r[0], (0, 0, 0))
+        print(f"{r[0]} | {r[1]} | {status_txt} | Fails: {r[3]} | Tasks: {open_cnt} open, {done_cnt} done, {overdue} overdue")
     print()
 
-def admin_unlock_user(user_id):
-    con= get_conn()
-    cur = con.cursor()
-    cur.execute("UPDATE users SET locked = 0, failed_attempts = 0 WHERE id = ?", (user_id,))
-    con.commit()
+def admin_unlock_user(user_id, db_path=DB_PATH):
+    with connection(db_path) as con:
+        changed = con.execute("UPDATE users SET locked = 0, failed_attempts = 0 WHERE id = ?",
+                              (user_id,)).rowcount
+    if not changed:
+        print("User not found.")
+        return False
     print("✅ User unlocked!")
-    con.close()
-
-def admin_reset_password(user_id, new_password):
-    con= get_conn()
-    cur = con.cursor()
-    cur.execute("UPDATE users SET password_hash = ? WHERE id = ?",
-                (hash_pw(new_password), user_id))
-    con.commit()
+    return True
+
+def admin_reset_password(user_id, new_password, db_path=DB_PATH):
+    if not new_password:
+        print("Password cannot be empty.")
+        return False
+    pw_hash = hash_pw(new_password)
+    with connection(db_path) as con:
+        changed = con.execute("UPDATE users SET password_hash = ? WHERE id = ?",
+                              (pw_hash, user_id)).rowcount
+    if not changed:
+        print("User not found.")
+        return False
+    revoke_user_sessions(user_id, db_path)
     print("✅ Password updated!")
-    con.close()
+    return True
+
+# Benutzer aus Datei anlegen (CSV mit Kopfzeile oder JSON Lines: alias, password[, is_admin])
+def provision_users(records, db_path=DB_PATH, rounds=None):
+    """
+    Legt viele User auf einmal an:
+    - ungültige Zeilen und doppelte Aliase in der Datei werden übersprungen,
+    - bestehende Aliase werden mit EINER Abfrage (json_each) ermittelt,
+    - Passwörter werden parallel gehasht (passwords.hash_many),
+    - alle neuen User werden in einer Transaktion eingefügt.
+    Liefert {"created", "existing", "duplicate", "invalid", "seconds"}.
+    """
+    started = time.perf_counter()
+    report = {"created": 0, "existing": 0, "duplicate": 0, "invalid": 0}
+    users = {}
+    for line_no, record in records:
+        # JSONL-Zeilen können Listen/Zahlen/Strings sein; kaputtes JSON markiert read_import_file mit _error
+        if not isinstance(record, dict) or "_error" in record:
+            reason = record["_error"] if isinstance(record, dict) else "expected an object"
+            print(f"Line {line_no}: {reason}.")
+            report["invalid"] += 1
+            continue
+        alias = str(record.get("alias") or "").strip()
+        password = str(record.get("password") or "")
+        is_admin = str(record.get("is_admin") or "0").strip().lower() in ("1", "true", "yes")
+        if not alias or not password:
+            print(f"Line {line_no}: alias and password are required.")
+            report["invalid"] += 1
+        elif alias in users:
+            report["duplicate"] += 1
+        else:
+            users[alias] = (password, int(is_admin))
+
+    with connection(db_path) as con:
+        existing = {alias for (alias,) in con.execute(
+            "SELECT alias FROM users WHERE alias IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(users)),))}
+    report["existing"] = len(existing)
+    new_users = [(alias, pw, flag) for alias, (pw, flag) in users.items() if alias not in existing]
+
+    # Hashen außerhalb der Transaktion
+    hashes = hash_many([pw for _alias, pw, _flag in new_users], rounds)
+
+    with connection(db_path) as con:
+        before = con.total_changes
+        # OR IGNORE: Alias, der seit der Prüfung angelegt wurde, zählt als vorhanden
+        con.executemany(
+            "INSERT OR IGNORE INTO users (alias, password_hash, is_admin) VALUES (?, ?, ?)",
+            [(alias, pw_hash, flag) for (alias, _pw, flag), pw_hash in zip(new_users, hashes)])
+        report["created"] = con.total_changes - before
+    report["existing"] += len(new_users) - report["created"]
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def admin_provision_users(path, db_path=DB_PATH):
+    try:
+        report = provision_users(read_import_file(path), db_path)
+    except (OSError, ValueError) as e:
+        print(f"Could not read user file: {e}")
+        return
+    print(f"✅ {report['created']} users created, {report['existing']} already existed, "
+          f"{report['duplicate']} duplicates in file, {report['invalid']} invalid "
+          f"({report['seconds']:.1f}s).")
 
 def admin_handle_choice(choice):
     if choice.upper() == "A":
@@ -55,4 +135,9 @@ def admin_handle_choice(choice):
             print("Invalid ID.")
             return
         new_pw = input("New password: ").strip()
-        admin_reset_password(uid, new_pw)
\ No newline at end of file
+        admin_reset_password(uid, new_pw)
+
+    elif choice.upper() == "D":
+        path = input("User file (CSV/JSONL with alias,password[,is_admin]; 0 = back): ").strip()
+        if path == "0" or not path: return
+        admin_provision_users(path)
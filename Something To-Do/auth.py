@@ -1,6 +1,7 @@
-import sqlite3
-import bcrypt
-from db import DB_PATH
+from db import connection, DB_PATH
+from passwords import hash_pw, check_pw, needs_rehash
+from sessions import (create_session, validate_session, revoke_session, forget_cached_user,
+                      load_remembered_token, save_remembered_token, clear_remembered_token)
 
 # interner Login-Status NUR hier halten
 _logged_in_user = None  # Dict wie {"id": 1, "alias": "Max", "is_admin": 0}
@@ -14,42 +15,64 @@ def set_logged_in_user(user_or_none):
     global _logged_in_user
     _logged_in_user = user_or_none
 
-def logout_user():
-# Loggt den aktuellen Benutzer aus.
+def logout_user(db_path=DB_PATH):
+# Loggt den aktuellen Benutzer aus und beendet eine gemerkte Sitzung.
+    token = load_remembered_token()
+    if token:
+        revoke_session(token, db_path)
+        clear_remembered_token()
     set_logged_in_user(None)
 
-# Passwort-Helfer
-def hash_pw(plain: str) -> str:
-    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# Passwort-Helfer: hash_pw / check_pw kommen aus passwords.py
 
-def check_pw(plain: str, hashed: str) -> bool:
-    try:
-        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
-    except Exception:
-        return False
+def _login_succeeded(uid, password, pw_hash, fails, db_path=DB_PATH):
+# Fehlversuche zurücksetzen; Hash mit veraltetem Kostenfaktor gleich erneuern.
+# Ohne Fehlversuche und ohne Rehash ist kein UPDATE nötig.
+    new_hash = hash_pw(password) if needs_rehash(pw_hash) else None
+    if not new_hash and not fails:
+        return
+    with connection(db_path) as con:
+        if new_hash:
+            con.execute("UPDATE users SET failed_attempts = 0, password_hash = ? WHERE id = ?",
+                        (new_hash, uid))
+        else:
+            con.execute("UPDATE users SET failed_attempts = 0 WHERE id = ?", (uid,))
+
+# "Angemeldet bleiben": Sitzungs-Token statt Passwort (kein bcrypt)
+def remember_login(user, db_path=DB_PATH):
+    save_remembered_token(create_session(user["id"], db_path))
+
+def login_with_token(db_path=DB_PATH):
+# Meldet mit dem gemerkten Token an; ungültige Tokens werden verworfen.
+    token = load_remembered_token()
+    if not token:
+        return None
+    user = validate_session(token, db_path)
+    if user is None:
+        clear_remembered_token()
+        return None
+    set_logged_in_user(user)
+    return user
 
 # Registrierung
 def register_user(alias: str, password: str, db_path=DB_PATH):
+# Liefert die neue User-ID oder None.
     if not alias.strip():
         print("Alias cannot be empty.")
-        return
+        return None
     if not password:
         print("Password cannot be empty.")
-        return
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute("SELECT 1 FROM users WHERE alias = ?", (alias.strip(),))
-    if cur.fetchone():
-        print("Alias already exists.")
-        con.close()
-        return
-    cur.execute(
-        "INSERT INTO users (alias, password_hash) VALUES (?, ?)",
-        (alias.strip(), hash_pw(password))
-    )
-    con.commit()
-    con.close()
+        return None
+    with connection(db_path) as con:
+        if con.execute("SELECT 1 FROM users WHERE alias = ?", (alias.strip(),)).fetchone():
+            print("Alias already exists.")
+            return None
+        user_id = con.execute(
+            "INSERT INTO users (alias, password_hash) VALUES (?, ?)",
+            (alias.strip(), hash_pw(password))
+        ).lastrowid
     print(f"User '{alias}' registered.")
+    return user_id
 
 # Login mit Menü (Sign in / Register / Exit)
 def login_user(db_path=DB_PATH):
@@ -81,43 +104,39 @@ def login_user(db_path=DB_PATH):
             if pw == "0":
                 continue
 
-            con = sqlite3.connect(db_path)
-            cur = con.cursor()
-            cur.execute("""
-                SELECT id, password_hash, failed_attempts, locked, is_admin
-                FROM users WHERE alias = ?
-            """, (alias,))
-            row = cur.fetchone()
+            with connection(db_path) as con:
+                row = con.execute("""
+                    SELECT id, password_hash, failed_attempts, locked, is_admin
+                    FROM users WHERE alias = ?
+                """, (alias,)).fetchone()
             if not row:
                 print("Alias not found.")
-                con.close()
                 continue
 
             uid, pw_hash, fails, locked, is_admin = row
 
             if locked:
                 print("Account is locked. Please contact admin.")
-                con.close()
                 continue
 
             if check_pw(pw, pw_hash):
-                cur.execute("UPDATE users SET failed_attempts = 0 WHERE id = ?", (uid,))
-                con.commit()
-                con.close()
+                _login_succeeded(uid, pw, pw_hash, fails, db_path)
                 user_dict = {"id": uid, "alias": alias, "is_admin": int(is_admin)}
                 set_logged_in_user(user_dict)
+                if input("Stay signed in on this computer? (y/N): ").strip().lower() == "y":
+                    remember_login(user_dict, db_path)
                 print(f"Welcome, {alias}!")
                 return user_dict
             else:
                 fails += 1
-                if fails >= 3:
-                    cur.execute("UPDATE users SET locked = 1, failed_attempts = ? WHERE id = ?", (fails, uid))
-                    print("Too many failed attempts. Account is now locked.")
-                else:
-                    cur.execute("UPDATE users SET failed_attempts = ? WHERE id = ?", (fails, uid))
-                    print(f"Wrong password. Attempts left: {3 - fails}")
-                con.commit()
-                con.close()
+                with connection(db_path) as con:
+                    if fails >= 3:
+                        con.execute("UPDATE users SET locked = 1, failed_attempts = ? WHERE id = ?", (fails, uid))
+                        forget_cached_user(uid)
+                        print("Too many failed attempts. Account is now locked.")
+                    else:
+                        con.execute("UPDATE users SET failed_attempts = ? WHERE id = ?", (fails, uid))
+                        print(f"Wrong password. Attempts left: {3 - fails}")
                 continue
 
         else:
@@ -125,39 +144,35 @@ def login_user(db_path=DB_PATH):
 
 #------------------------------------------
 # GUI-Login
-def authenticate(alias: str, password: str, db_path=DB_PATH):
-    con = sqlite3.connect(db_path)
-    cur = con.cursor()
-    cur.execute("""
-        SELECT id, password_hash, failed_attempts, locked, is_admin
-        FROM users WHERE alias = ?
-    """, (alias,))
-    row = cur.fetchone()
+def authenticate(alias: str, password: str, db_path=DB_PATH, remember=False):
+    with connection(db_path) as con:
+        row = con.execute("""
+            SELECT id, password_hash, failed_attempts, locked, is_admin
+            FROM users WHERE alias = ?
+        """, (alias,)).fetchone()
 
     if not row:
-        con.close()
         return None
 
     uid, pw_hash, fails, locked, is_admin = row
 
     if locked:
-        con.close()
         return None
 
     if check_pw(password, pw_hash):
-        # Login zählt als Erfolg → Fehlversuche zurücksetzen
-        cur.execute("UPDATE users SET failed_attempts = 0 WHERE id = ?", (uid,))
-        con.commit()
-        con.close()
+        # Login zählt als Erfolg → Fehlversuche zurücksetzen (ggf. Rehash)
+        _login_succeeded(uid, password, pw_hash, fails, db_path)
         user = {"id": uid, "alias": alias, "is_admin": int(is_admin)}
         set_logged_in_user(user)
+        if remember:
+            remember_login(user, db_path)
         return user
     else:
         fails += 1
-        if fails >= 3:
-            cur.execute("UPDATE users SET locked = 1, failed_attempts = ? WHERE id = ?", (fails, uid))
-        else:
-            cur.execute("UPDATE users SET failed_attempts = ? WHERE id = ?", (fails, uid))
-        con.commit()
-        con.close()
+        with connection(db_path) as con:
+            if fails >= 3:
+                con.execute("UPDATE users SET locked = 1, failed_attempts = ? WHERE id = ?", (fails, uid))
+                forget_cached_user(uid)
+            else:
+                con.execute("UPDATE users SET failed_attempts = ? WHERE id = ?", (fails, uid))
         return None
\ No newline at end of file
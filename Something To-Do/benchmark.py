@@ -0,0 +1,501 @@
+"""
+Benchmark der öffentlichen Funktionen aus tasks.py, categories.py, auth.py und profile.py
+auf synthetischen Daten (datagen.py).
+
+Aufruf:  python benchmark.py [--sizes 10k,100k,1M] [--seed S] [--today YYYY-MM-DD] [--min-time SEK]
+                             [--only MUSTER] [--out DATEI.json] [--compare ALT.json]
+- Je Größe wird eine Datenbank einmalig erzeugt und in TODO_BENCH_DIR
+  (Standard: <tmp>/something_todo_bench) wiederverwendet; gemessen wird auf einer Kopie,
+  damit schreibende Benchmarks die Ausgangsdaten nicht verändern.
+- Seed und Stichtag (--today, Standard REFERENCE_DATE) legen Datensatz und Eingaben fest,
+  damit Läufe von verschiedenen Tagen und Revisionen vergleichbar bleiben.
+- Jede Funktion läuft mindestens --min-time Sekunden (höchstens MAX_CALLS Aufrufe);
+  gemessen werden Aufrufe/s, p50/p99-Latenz und (in einem eigenen Lauf mit tracemalloc)
+  der Spitzenverbrauch an Python-Speicher eines Aufrufs.
+- Das Ergebnis (inkl. Git-Revision, Python-/SQLite-Version, Speicherprofil, bcrypt-Kosten)
+  wird als JSON gespeichert; --compare stellt die p50-Latenzen einer früheren Datei gegenüber.
+- Interaktive Funktionen (input(), Menüs) werden nicht gemessen.
+  Konsolenausgaben der Funktionen gehen während der Messung nach os.devnull.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from db import BASE_DIR, close_pools, connection, get_storage_profile
+import datagen
+import tasks
+import categories
+import auth
+import profile
+import sessions
+from migrations import migrate
+from passwords import BCRYPT_ROUNDS
+
+BENCH_DIR = os.getenv("TODO_BENCH_DIR") or os.path.join(tempfile.gettempdir(), "something_todo_bench")
+DEFAULT_SIZES = "10k,100k"
+MIN_TIME = float(os.getenv("TODO_BENCH_MIN_TIME", "1.0"))
+MIN_CALLS = 3
+MAX_CALLS = 500
+
+# Fester Stichtag für Datensatz und Eingaben (Fälligkeiten, überfällige Tasks)
+REFERENCE_DATE = date(2025, 6, 30)
+
+# Tasks pro Aufruf bei den Batch-/Import-Benchmarks
+BATCH_SIZE = 50
+
+
+# ----------------------------
+# Registrierung
+# ----------------------------
+BENCHMARKS = {}
+
+
+def bench(name):
+    """
+    Decorator: registriert eine Vorbereitungsfunktion prepare(ctx) → call().
+    call() wird pro Messung einmal ausgeführt; was prepare erledigt, wird nicht gemessen.
+    """
+    def decorator(prepare):
+        BENCHMARKS[name] = prepare
+        return prepare
+    return decorator
+
+
+class Context:
+    """Datenbank und typische Eingaben für die Benchmarks einer Datensatzgröße."""
+
+    def __init__(self, db_path, seed, today=REFERENCE_DATE):
+        self.db_path = db_path
+        self.rng = random.Random(seed)
+        self.today = today.isoformat()
+        with connection(db_path) as con:
+            # Vielnutzer (meiste Tasks) und ein typischer User (Median)
+            per_user = con.execute("""
+                SELECT users.id, users.alias, COUNT(task.id) AS n
+                FROM users JOIN task ON task.user_id = users.id
+                WHERE users.alias LIKE ?
+                GROUP BY users.id ORDER BY n DESC, users.id
+            """, (datagen.USER_PREFIX + "%",)).fetchall()
+            self.admin = dict(zip(("id", "alias"), con.execute(
+                "SELECT id, alias FROM users WHERE is_admin = 1 ORDER BY id LIMIT 1").fetchone()))
+            self.category_names = [row[0] for row in con.execute("SELECT name FROM category ORDER BY id")]
+        (self.heavy_id, self.heavy_alias, self.heavy_count) = per_user[0]
+        (self.typical_id, self.typical_alias, self.typical_count) = per_user[len(per_user) // 2]
+        self._counter = 0
+
+    def task_ids(self, user_id, n, completed=None):
+        """n zufällige Task-IDs eines Users (optional nur offene/erledigte)."""
+        sql = "SELECT id FROM task WHERE user_id = ?"
+        params = [user_id]
+        if completed is not None:
+            sql += " AND completed = ?"
+            params.append(completed)
+        with connection(self.db_path) as con:
+            ids = [row[0] for row in con.execute(sql, params)]
+        self.rng.shuffle(ids)
+        return ids[:n]
+
+    def unique(self, prefix):
+        self._counter += 1
+        return f"{prefix}-{os.getpid()}-{self._counter}"
+
+
+def _draw(values):
+    """Liefert bei jedem Aufruf den nächsten Wert (für Benchmarks, die Daten verbrauchen)."""
+    it = iter(values)
+    return lambda: next(it)
+
+
+# Anzahl Werte, die ein verbrauchender Benchmark höchstens braucht (Speicherlauf + Messung)
+_POOL = MAX_CALLS + 1
+
+
+# ----------------------------
+# tasks.py
+# ----------------------------
+@bench("tasks.get_task")
+def _get_task(ctx):
+    ids = ctx.task_ids(ctx.heavy_id, 1000)
+    return lambda: tasks.get_task(ctx.rng.choice(ids), ctx.heavy_id, db_path=ctx.db_path)
+
+
+@bench("tasks.get_tasks (typical user)")
+def _get_tasks_user(ctx):
+    return lambda: tasks.get_tasks(ctx.typical_id, ctx.db_path)
+
+
+@bench("tasks.get_tasks (heavy user)")
+def _get_tasks_heavy(ctx):
+    return lambda: tasks.get_tasks(ctx.heavy_id, ctx.db_path)
+
+
+@bench("tasks.get_tasks (admin)")
+def _get_tasks_admin(ctx):
+    return lambda: tasks.get_tasks(ctx.admin["id"], ctx.db_path, is_admin=True)
+
+
+@bench("tasks.get_tasks_page (first page)")
+def _get_tasks_page_first(ctx):
+    return lambda: tasks.get_tasks_page(ctx.heavy_id, db_path=ctx.db_path)
+
+
+@bench("tasks.get_tasks_page (deep offset)")
+def _get_tasks_page_deep(ctx):
+    return lambda: tasks.get_tasks_page(ctx.heavy_id, db_path=ctx.db_path, offset=ctx.heavy_count // 2)
+
+
+@bench("tasks.count_tasks (admin)")
+def _count_tasks(ctx):
+    return lambda: tasks.count_tasks(ctx.admin["id"], ctx.db_path, is_admin=True)
+
+
+@bench("tasks.list_tasks (heavy user)")
+def _list_tasks(ctx):
+    return lambda: tasks.list_tasks(ctx.heavy_id, ctx.db_path)
+
+
+@bench("tasks.iter_tasks (admin)")
+def _iter_tasks(ctx):
+    return lambda: sum(1 for _row in tasks.iter_tasks(ctx.admin["id"], ctx.db_path, is_admin=True))
+
+
+@bench("tasks.iter_export_chunks (all)")
+def _iter_export_chunks(ctx):
+    return lambda: sum(len(chunk) for chunk in tasks.iter_export_chunks(db_path=ctx.db_path))
+
+
+@bench("tasks.search_tasks")
+def _search_tasks(ctx):
+    words = [obj.split()[0] for obj in datagen._OBJECTS]
+    return lambda: tasks.search_tasks(ctx.rng.choice(words), ctx.heavy_id, db_path=ctx.db_path)
+
+
+@bench("tasks.TaskQuery (overdue, by due date)")
+def _task_query(ctx):
+    return lambda: tasks.TaskQuery(ctx.heavy_id).overdue(ctx.today).sort("due").fetch(ctx.db_path)
+
+
+@bench("tasks.create_task")
+def _create_task(ctx):
+    return lambda: tasks.create_task("Benchmark task", None, "created by benchmark.py", ctx.today,
+                                     0, None, ctx.heavy_id, ctx.db_path)
+
+
+@bench("tasks.import_tasks")
+def _import_tasks(ctx):
+    def call():
+        records = [(i, {"title": f"Imported {i}", "category": ctx.rng.choice(ctx.category_names),
+                        "due_date": ctx.today, "completed": "0"})
+                   for i in range(1, BATCH_SIZE + 1)]
+        return tasks.import_tasks(records, ctx.typical_id, ctx.db_path)
+    return call
+
+
+@bench("tasks.update_task")
+def _update_task(ctx):
+    ids = ctx.task_ids(ctx.heavy_id, 1000)
+    return lambda: tasks.update_task(ctx.rng.choice(ids), ctx.heavy_id, description="updated",
+                                     db_path=ctx.db_path)
+
+
+@bench("tasks.complete_task")
+def _complete_task(ctx):
+    next_id = _draw(ctx.task_ids(ctx.heavy_id, _POOL, completed=0))
+    return lambda: tasks.complete_task(next_id(), ctx.heavy_id, ctx.db_path)
+
+
+@bench("tasks.complete_tasks (batch)")
+def _complete_tasks(ctx):
+    ids = ctx.task_ids(ctx.heavy_id, 100000, completed=0)
+    batches = _draw(ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE))
+    return lambda: tasks.complete_tasks(ctx.heavy_id, batches(), ctx.db_path)
+
+
+@bench("tasks.delete_task")
+def _delete_task(ctx):
+    next_id = _draw(ctx.task_ids(ctx.heavy_id, _POOL))
+    return lambda: tasks.delete_task(next_id(), ctx.heavy_id, ctx.db_path)
+
+
+@bench("tasks.delete_tasks (batch)")
+def _delete_tasks(ctx):
+    ids = ctx.task_ids(ctx.heavy_id, 100000)
+    batches = _draw(ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE))
+    return lambda: tasks.delete_tasks(ctx.heavy_id, batches(), ctx.db_path)
+
+
+# ----------------------------
+# categories.py
+# ----------------------------
+@bench("categories.get_or_create_category")
+def _get_or_create_category(ctx):
+    return lambda: categories.get_or_create_category(ctx.rng.choice(ctx.category_names), ctx.db_path)
+
+
+@bench("categories.get_categories")
+def _get_categories(ctx):
+    return lambda: categories.get_categories(ctx.db_path)
+
+
+@bench("categories.list_categories")
+def _list_categories(ctx):
+    return lambda: categories.list_categories(ctx.db_path)
+
+
+@bench("categories.add_category")
+def _add_category(ctx):
+    return lambda: categories.add_category(ctx.unique("Bench category"), db_path=ctx.db_path)
+
+
+@bench("categories.delete_category")
+def _delete_category(ctx):
+    with _quiet():
+        ids = [categories.add_category(ctx.unique("Bench delete"), db_path=ctx.db_path) for _ in range(_POOL)]
+    next_id = _draw(ids)
+    return lambda: categories.delete_category(next_id(), ctx.db_path)
+
+
+# ----------------------------
+# auth.py / profile.py
+# ----------------------------
+@bench("auth.authenticate")
+def _authenticate(ctx):
+    return lambda: auth.authenticate(ctx.typical_alias, datagen.BENCH_PASSWORD, ctx.db_path)
+
+
+@bench("auth.authenticate (unknown alias)")
+def _authenticate_unknown(ctx):
+    return lambda: auth.authenticate("no-such-user", datagen.BENCH_PASSWORD, ctx.db_path)
+
+
+@bench("auth.register_user")
+def _register_user(ctx):
+    return lambda: auth.register_user(ctx.unique("bench-new"), datagen.BENCH_PASSWORD, ctx.db_path)
+
+
+@bench("sessions.validate_session")
+def _validate_session(ctx):
+    token = sessions.create_session(ctx.typical_id, ctx.db_path)
+    return lambda: sessions.validate_session(token, ctx.db_path)
+
+
+@bench("profile.show_my_profile (heavy user)")
+def _show_my_profile(ctx):
+    def call():
+        auth.set_logged_in_user({"id": ctx.heavy_id, "alias": ctx.heavy_alias, "is_admin": 0})
+        profile.show_my_profile(ctx.db_path)
+    return call
+
+
+# ----------------------------
+# Messung
+# ----------------------------
+@contextlib.contextmanager
+def _quiet():
+    """Konsolenausgaben der gemessenen Funktionen verwerfen."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _percentile(sorted_values, pct):
+    """Nächstgelegener Rang (ohne Interpolation), damit p99 ein tatsächlich gemessener Wert ist."""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def measure(call, min_time=MIN_TIME, max_calls=MAX_CALLS):
+    """
+    Der erste Aufruf misst den Speicher (tracemalloc) und wärmt zugleich auf,
+    danach wird call() wiederholt ohne tracemalloc ausgeführt.
+    Liefert {"calls", "throughput_per_s", "mean_ms", "p50_ms", "p99_ms", "max_ms", "peak_kib"}.
+    Gehen einem verbrauchenden Benchmark die Daten aus (StopIteration), endet die Messung früher;
+    reichen sie nicht einmal für den Speicherlauf und einen gemessenen Aufruf, liefert sie None.
+    """
+    # Speicher zuerst und getrennt messen: tracemalloc verlangsamt jeden Aufruf deutlich
+    tracemalloc.start()
+    try:
+        call()
+        _current, peak = tracemalloc.get_traced_memory()
+    except StopIteration:
+        return None
+    finally:
+        tracemalloc.stop()
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_calls and (len(latencies) < MIN_CALLS or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        try:
+            call()
+        except StopIteration:
+            break
+        latencies.append(time.perf_counter() - t0)
+    if not latencies:
+        return None
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "calls": len(latencies),
+        "throughput_per_s": round(len(latencies) / total, 2) if total else None,
+        "mean_ms": round(total / len(latencies) * 1000, 4),
+        "p50_ms": round(statistics.median(latencies) * 1000, 4),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def dataset(size, seed, today=REFERENCE_DATE):
+    """Pfad der (bei Bedarf erzeugten) Ausgangsdatenbank für `size` Tasks."""
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f"tasks-{size}-seed{seed}-{today.isoformat()}.db")
+    if not os.path.exists(path):
+        print(f"Generating {size} tasks → {path}")
+        tmp = path + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(tmp + suffix):
+                os.remove(tmp + suffix)
+        with _quiet():
+            result = datagen.generate(tmp, size, seed=seed, today=today)
+        close_pools()       # Checkpoint → alles steht in der Hauptdatei
+        os.replace(tmp, path)
+        print(f"  done in {result['seconds']:.1f} s")
+    else:
+        # Zwischengespeicherte Daten können von einem älteren Schema stammen
+        with _quiet():
+            migrate(path)
+        close_pools()
+    return path
+
+
+def run(sizes, seed=42, min_time=MIN_TIME, only=None, today=REFERENCE_DATE):
+    """Misst alle (bzw. die zu `only` passenden) Benchmarks; liefert die Ergebnisliste."""
+    results = []
+    names = [name for name in BENCHMARKS if not only or any(o.lower() in name.lower() for o in only)]
+    for size in sizes:
+        source = dataset(size, seed, today)
+        work = os.path.join(BENCH_DIR, f"work-{os.getpid()}.db")
+        shutil.copyfile(source, work)
+        try:
+            ctx = Context(work, seed, today)
+            print(f"\n=== {size} tasks (heavy user: {ctx.heavy_count} tasks, "
+                  f"typical user: {ctx.typical_count} tasks) ===")
+            for name in names:
+                with _quiet():
+                    stats = measure(BENCHMARKS[name](ctx), min_time)
+                if stats is None:
+                    print(f"{name:<42} skipped (ran out of input data)")
+                    continue
+                results.append({"size": size, "name": name, **stats})
+                print(f"{name:<42} {stats['throughput_per_s'] or 0:>10.1f}/s  p50 {stats['p50_ms']:>9.3f} ms"
+                      f"  p99 {stats['p99_ms']:>9.3f} ms  peak {stats['peak_kib']:>9.1f} KiB")
+        finally:
+            close_pools()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(work + suffix):
+                    os.remove(work + suffix)
+    return results
+
+
+def environment(seed, min_time, today=REFERENCE_DATE):
+    """Rahmendaten für den Vergleich zwischen Revisionen."""
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        revision, dirty = None, None
+    return {
+        "revision": revision,
+        "dirty": dirty,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "storage_profile": get_storage_profile()[0],
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "seed": seed,
+        "today": today.isoformat(),
+        "min_time": min_time,
+    }
+
+
+def compare(old, new):
+    """Stellt die p50-Latenzen zweier Ergebnisdateien gegenüber (Verhältnis neu/alt)."""
+    before = {(r["size"], r["name"]): r for r in old["results"]}
+    print(f"\n=== Compared with {old['environment'].get('revision')} ===")
+    for r in new["results"]:
+        o = before.get((r["size"], r["name"]))
+        if o is None:
+            continue
+        ratio = r["p50_ms"] / o["p50_ms"] if o["p50_ms"] else float("nan")
+        mark = "!! " if ratio > 1.2 else "++ " if ratio < 0.8 else "   "
+        print(f"{mark}{r['size']:>8} {r['name']:<42} p50 {o['p50_ms']:>9.3f} → {r['p50_ms']:>9.3f} ms"
+              f"  ({ratio:.2f}x)")
+
+
+def parse_sizes(text):
+    """'10k,100k,1M' → [10000, 100000, 1000000]"""
+    factors = {"k": 1000, "m": 1000000}
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        factor = factors.get(part[-1], 1)
+        sizes.append(int(float(part[:-1] if factor > 1 else part) * factor))
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the task store on synthetic data.")
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes(DEFAULT_SIZES),
+                        help=f"comma separated task counts, e.g. 10k,100k,1M (default: {DEFAULT_SIZES})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=date.fromisoformat, default=REFERENCE_DATE,
+                        help=f"reference date for the data set and inputs (default: {REFERENCE_DATE})")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds per benchmark")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this text")
+    parser.add_argument("--out", help="result file (default: benchmark-<revision>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare with")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    old = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+
+    env = environment(args.seed, args.min_time, args.today)
+    report = {"environment": env,
+              "results": run(args.sizes, args.seed, args.min_time, args.only, args.today)}
+    out = args.out or f"benchmark-{env['revision'] or 'unknown'}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {out}")
+
+    if old is not None:
+        compare(old, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
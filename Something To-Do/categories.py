@@ -1,56 +1,143 @@
-from db import get_conn, DB_PATH
+import os
+import threading
+from db import connection, DB_PATH
+
+
+# ----------------------------
+# Cache Name <-> ID
+# ----------------------------
+class CategoryCache:
+    """
+    Prozessweiter Read-Through-Cache aller Kategorien (id, name) einer Datenbank.
+    - add/delete/get_or_create invalidieren ihn explizit.
+    - Änderungen durch andere Prozesse/Verbindungen erkennt `PRAGMA data_version`:
+      der Wert ändert sich, sobald eine *andere* Verbindung committet. Er wird
+      je Pool-Verbindung gemerkt; eine noch unbekannte Verbindung lädt neu.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._rows = None       # [(id, name)] nach Name sortiert, None = ungültig
+        self._by_name = {}
+        self._versions = {}     # id(Verbindung) -> zuletzt gesehene data_version
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _load(self, con):
+        """Cache gültig halten; True, wenn er aus der DB neu geladen wurde (Miss)."""
+        version = con.execute("PRAGMA data_version").fetchone()[0]
+        if self._versions.get(id(con)) != version:
+            self._versions[id(con)] = version
+            self._rows = None
+        if self._rows is not None:
+            self.hits += 1
+            return False
+        self.misses += 1
+        self._rows = con.execute("SELECT id, name FROM category ORDER BY name").fetchall()
+        self._by_name = {name: cid for (cid, name) in self._rows}
+        return True
+
+    def rows(self):
+        with connection(self.db_path) as con, self._lock:
+            self._load(con)
+            return list(self._rows)
+
+    def lookup(self, name):
+        """ID zum Namen oder None, wenn es die Kategorie nicht gibt."""
+        with connection(self.db_path) as con, self._lock:
+            self._load(con)
+            return self._by_name.get(name)
+
+    def invalidate(self):
+        with self._lock:
+            if self._rows is not None:
+                self.invalidations += 1
+            self._rows = None
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._rows) if self._rows is not None else 0,
+            }
+
+
+# Mit TODO_CATEGORY_CACHE=0 wird bei jedem Aufruf neu gelesen (z.B. zum Vergleich)
+CACHE_ENABLED = os.getenv("TODO_CATEGORY_CACHE", "1") != "0"
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_category_cache(db_path=DB_PATH):
+    """Liefert den (einmalig erzeugten) Cache für eine Datenbankdatei."""
+    key = os.path.abspath(db_path) if db_path != ":memory:" else db_path
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = CategoryCache(db_path)
+        return cache
+
+
+def invalidate_category_cache(db_path=DB_PATH):
+    get_category_cache(db_path).invalidate()
+
+
+def category_cache_stats(db_path=DB_PATH):
+    """{"hits", "misses", "invalidations", "hit_rate", "size"} des Caches."""
+    return get_category_cache(db_path).stats()
+
 
 # Kategorie erstellen
-def add_category(name, description=""):
+def add_category(name, description="", db_path=DB_PATH):
     if not name.strip():
         raise ValueError("Category cannot be empty.")
 
-    con = get_conn(DB_PATH)
-    cur = con.cursor()
+    with connection(db_path) as con:
+        category_id = con.execute("""
+            INSERT INTO category (name, description)
+            VALUES (?, ?)
+        """, (name.strip(), description.strip())).lastrowid
+    invalidate_category_cache(db_path)
 
-    cur.execute("""
-        INSERT INTO category (name, description)
-        VALUES (?, ?)
-    """, (name.strip(), description.strip()))
-
-    con.commit()
-    con.close()
     print(f"Category '{name}' has been created.")
+    return category_id
 
 
 # Kategorie erstellen ( in 'Create task')
-def get_or_create_category(name):
+def get_or_create_category(name, db_path=DB_PATH):
     if name is None or name.strip() == "":
         return None
 
     name = name.strip()
-    con = get_conn(DB_PATH)
-    cur = con.cursor()
-
-    # Kategorie suchen
-    cur.execute("SELECT id FROM category WHERE name = ?", (name,))
-    row = cur.fetchone()
-    if row:
-        con.close()
-        return row[0]
-
-    cur.execute("INSERT INTO category (name) VALUES (?)", (name,))
-    con.commit()
-    category_id = cur.lastrowid
-    con.close()
+    if CACHE_ENABLED:
+        category_id = get_category_cache(db_path).lookup(name)
+        if category_id is not None:
+            return category_id
+
+    with connection(db_path) as con:
+        # Kategorie suchen (Cache-Miss oder Cache aus)
+        row = con.execute("SELECT id FROM category WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+
+        category_id = con.execute("INSERT INTO category (name) VALUES (?)", (name,)).lastrowid
+    invalidate_category_cache(db_path)
+
     print(f"Category '{name}' has been created.")
     return category_id
 
 
 # Kategorien anzeigen/auflisten
-def list_categories():
-    con = get_conn(DB_PATH)
-    cur = con.cursor()
-
-    cur.execute("SELECT id, name, description FROM category ORDER BY id")
-
-    rows = cur.fetchall()
-    con.close()
+def list_categories(db_path=DB_PATH):
+    with connection(db_path) as con:
+        rows = con.execute("SELECT id, name, description FROM category ORDER BY id").fetchall()
 
     if not rows:
         print(f"No categories found.")
@@ -61,38 +148,39 @@ def list_categories():
         print()
 
 
+# Aufgaben einer Kategorie (Index idx_task_category)
+_USAGE_COUNT = "SELECT COUNT(*) FROM task WHERE category_id = ?"
+
+
 # Kategorie löschen (NUR wenn sie leer ist!)
-def delete_category(category_id):
-    con = get_conn(DB_PATH)
-    cur = con.cursor()
-
-    # Prüfen, ob Aufgaben diese Kategorie nutzen
-    cur.execute("SELECT COUNT(*) FROM task WHERE category_id = ?",
-                (category_id,))
-    count = cur.fetchone()[0]
-
-    if count > 0:
-        con.close()
-        print(
-            f"Category cannot be deleted! There are still {count} tasks associated with it.")
-        return
-
-    # Kategorie löschen, wenn sie nicht verwendet wird
-    cur.execute("DELETE FROM category WHERE id = ?", (category_id,))
-    con.commit()
-    con.close()
+def delete_category(category_id, db_path=DB_PATH):
+    with connection(db_path) as con:
+        # Prüfen, ob Aufgaben diese Kategorie nutzen
+        count = con.execute(_USAGE_COUNT, (category_id,)).fetchone()[0]
+
+        if count > 0:
+            print(
+                f"Category cannot be deleted! There are still {count} tasks associated with it.")
+            return False
+
+        # Kategorie löschen, wenn sie nicht verwendet wird
+        deleted = con.execute("DELETE FROM category WHERE id = ?", (category_id,)).rowcount
+    if not deleted:
+        print(f"Category with ID {category_id} not found.")
+        return False
+    invalidate_category_cache(db_path)
+
     print(f"Category with ID {category_id} has been deleted.")
+    return True
 
 
 #--------------------------------------------------
 # GUI-Anpassung
 def get_categories(db_path=DB_PATH):
     """
-    Liefert eine Liste [(id, name), ...] für die GUI.
+    Liefert eine Liste [(id, name), ...] für die GUI (aus dem Cache).
     """
-    con = get_conn(db_path)
-    cur = con.cursor()
-    cur.execute("SELECT id, name FROM category ORDER BY name")
-    rows = cur.fetchall()
-    con.close()
-    return rows
\ No newline at end of file
+    if CACHE_ENABLED:
+        return get_category_cache(db_path).rows()
+    with connection(db_path) as con:
+        return con.execute("SELECT id, name FROM category ORDER BY name").fetchall()
@@ -0,0 +1,489 @@
+"""
+Nicht-interaktive Kommandozeile mit Unterbefehlen und JSON-Ausgabe (für Skripte).
+
+Aufruf:  python cli.py [--db PFAD] [--user ALIAS | --token TOKEN] [--pretty] [--quiet]
+                       BEFEHL ...
+    task add TITEL [--category NAME] [--description TEXT] [--due YYYY-MM-DD]
+    task list [--open | --completed] [--category NAME] [--owner ALIAS] [--from D] [--to D]
+              [--overdue] [--sort KEY] [--desc] [--limit N] [--offset N]
+    task get ID | task search TEXT [--limit N]
+    task complete IDS | task delete IDS | task update IDS [--title ..] [--category ..]
+                                                          [--description ..] [--due ..]
+    category list | category add NAME [--description TEXT] | category delete ID
+    user add ALIAS [--password-stdin] | user list | user unlock ID
+    user reset-password ID [--password-stdin] | user provision DATEI
+    login | logout
+    batch [DATEI]   (Befehle zeilenweise aus Datei oder stdin, '#' = Kommentar)
+
+- IDS wie "1,4,7-9".
+- Anmeldung: --token / TODO_SESSION_TOKEN, --user mit Passwort aus TODO_PASSWORD,
+  sonst das gemerkte Token ("Stay signed in"). `login` liefert ein neues Token.
+- Neue Passwörter (user add / reset-password) nie als Argument (ps, Shell-History):
+  --password-stdin liest die erste Zeile von stdin, sonst TODO_NEW_PASSWORD,
+  sonst Abfrage am Terminal (getpass).
+- stdout enthält nur JSON; Meldungen der Funktionen gehen nach stderr (--quiet: weg).
+- batch führt alle Zeilen in EINER Transaktion aus; der erste Fehler rollt alles zurück.
+
+Exit-Codes: 0 ok, 1 Fehler, 2 falscher Aufruf, 3 Anmeldung fehlgeschlagen/keine Rechte,
+            4 nicht gefunden
+"""
+import argparse
+import contextlib
+import getpass
+import io
+import json
+import os
+import shlex
+import sqlite3
+import sys
+from datetime import datetime
+from db import connection, init_db, DB_PATH
+from auth import authenticate, register_user
+from admin import get_users, admin_unlock_user, admin_reset_password, provision_users
+from categories import add_category, delete_category, get_categories, get_or_create_category, \
+    invalidate_category_cache
+from counters import get_all_user_counts
+from importer import resolve_user
+from sessions import create_session, validate_session, revoke_session, load_remembered_token
+from tasks import (create_task, get_task, search_tasks, complete_tasks, delete_tasks, update_tasks,
+                   read_import_file, TaskQuery, SORT_KEYS, SEARCH_LIMIT)
+from utils import parse_id_list
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_AUTH = 3
+EXIT_NOT_FOUND = 4
+
+TASK_FIELDS = ("id", "title", "category", "description", "creation_date", "completed", "due_date", "owner")
+
+
+class CliError(Exception):
+    def __init__(self, message, code=EXIT_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Fehler als CliError statt sys.exit (nötig für den Batch-Modus)."""
+
+    def error(self, message):
+        raise CliError(f"{self.prog}: {message}", EXIT_USAGE)
+
+
+_NOT_CHECKED = object()
+
+
+class Context:
+    """Datenbank und (erst bei Bedarf angemeldeter) User eines Aufrufs."""
+
+    def __init__(self, args):
+        self.db_path = args.db
+        self.alias = args.user
+        self.token = args.token or os.getenv("TODO_SESSION_TOKEN")
+        self.stdin_in_use = False       # batch liest die Befehle von stdin
+        self._user = _NOT_CHECKED
+
+    def login(self):
+        """
+        Prüft die Anmeldedaten genau einmal; liefert den User oder None.
+        Auch ein Fehlschlag wird gemerkt: ein zweiter Versuch würde erneut als
+        Fehlversuch zählen.
+        """
+        if self._user is _NOT_CHECKED:
+            if self.token:
+                self._user = validate_session(self.token, self.db_path)
+            elif self.alias:
+                self._user = authenticate(self.alias, os.getenv("TODO_PASSWORD", ""), self.db_path)
+            else:
+                self._user = validate_session(load_remembered_token(), self.db_path)
+        return self._user
+
+    def user(self, admin=False):
+        if self.login() is None:
+            raise CliError("Not logged in (use --token, --user with TODO_PASSWORD, or a remembered login).",
+                           EXIT_AUTH)
+        if admin and not self._user["is_admin"]:
+            raise CliError("This command requires an admin.", EXIT_AUTH)
+        return self._user
+
+
+def _task_dict(row):
+    return dict(zip(TASK_FIELDS, row))
+
+
+def _ids(value):
+    try:
+        ids = parse_id_list(value)
+    except ValueError:
+        raise CliError(f"Invalid id list '{value}'.", EXIT_USAGE)
+    if not ids:
+        raise CliError("No task ids given.", EXIT_USAGE)
+    return ids
+
+
+def _new_password(args, ctx):
+    """Neues Passwort aus stdin (--password-stdin), TODO_NEW_PASSWORD oder vom Terminal."""
+    if args.password_stdin:
+        if ctx.stdin_in_use:
+            raise CliError("--password-stdin cannot be used while batch reads commands from stdin.", EXIT_USAGE)
+        password = sys.stdin.readline().rstrip("\r\n")
+    elif os.getenv("TODO_NEW_PASSWORD"):
+        password = os.getenv("TODO_NEW_PASSWORD")
+    elif sys.stdin.isatty():
+        password = getpass.getpass("New password: ", stream=sys.stderr)
+    else:
+        raise CliError("No password given (use --password-stdin or TODO_NEW_PASSWORD).", EXIT_USAGE)
+    if not password:
+        raise CliError("Password cannot be empty.", EXIT_USAGE)
+    return password
+
+
+def _changed(changed, ids):
+    if not changed:
+        raise CliError("No matching tasks (not found or not yours).", EXIT_NOT_FOUND)
+    return {"changed": changed, "requested": len(set(ids))}
+
+
+# ----------------------------
+# task
+# ----------------------------
+def task_add(args, ctx):
+    user = ctx.user()
+    category_id = get_or_create_category(args.category, ctx.db_path) if args.category else None
+    task_id = create_task(args.title, category_id, args.description, datetime.now().strftime("%Y-%m-%d"),
+                          0, args.due, user["id"], db_path=ctx.db_path)
+    return {"id": task_id}
+
+
+def task_list(args, ctx):
+    user = ctx.user()
+    query = TaskQuery(user["id"], is_admin=bool(user["is_admin"]))
+    if args.open:
+        query.open()
+    if args.completed:
+        query.completed()
+    if args.category:
+        query.category(args.category)
+    if args.owner:
+        owner_id = resolve_user(args.owner, ctx.db_path)
+        if owner_id is None:
+            raise CliError(f"User '{args.owner}' not found.", EXIT_NOT_FOUND)
+        query.owner(owner_id)
+    if args.date_from or args.date_to:
+        query.due_between(args.date_from, args.date_to)
+    if args.overdue:
+        query.overdue()
+    query.sort(args.sort, args.desc)
+    rows = query.fetch(ctx.db_path, limit=args.limit, offset=args.offset)
+    return {"count": len(rows), "tasks": [_task_dict(row) for row in rows]}
+
+
+def task_get(args, ctx):
+    user = ctx.user()
+    row = get_task(args.id, user["id"], is_admin=bool(user["is_admin"]), db_path=ctx.db_path)
+    if row is None:
+        raise CliError(f"Task {args.id} not found.", EXIT_NOT_FOUND)
+    return {"task": _task_dict(row)}
+
+
+def task_search(args, ctx):
+    user = ctx.user()
+    rows = search_tasks(args.text, user["id"], is_admin=bool(user["is_admin"]), limit=args.limit,
+                        db_path=ctx.db_path)
+    return {"count": len(rows),
+            "tasks": [{**_task_dict(row[:8]), "snippet": row[8]} for row in rows]}
+
+
+def task_complete(args, ctx):
+    user = ctx.user()
+    ids = _ids(args.ids)
+    return _changed(complete_tasks(user["id"], ids, db_path=ctx.db_path, is_admin=bool(user["is_admin"])), ids)
+
+
+def task_delete(args, ctx):
+    user = ctx.user()
+    ids = _ids(args.ids)
+    return _changed(delete_tasks(user["id"], ids, db_path=ctx.db_path, is_admin=bool(user["is_admin"])), ids)
+
+
+def task_update(args, ctx):
+    user = ctx.user()
+    ids = _ids(args.ids)
+    if all(v is None for v in (args.title, args.category, args.description, args.due)):
+        raise CliError("Nothing to update (give --title, --category, --description or --due).", EXIT_USAGE)
+    category_id = get_or_create_category(args.category, ctx.db_path) if args.category else None
+    changed = update_tasks(user["id"], ids, title=args.title, category_id=category_id,
+                           description=args.description, due_date=args.due,
+                           db_path=ctx.db_path, is_admin=bool(user["is_admin"]))
+    return _changed(changed, ids)
+
+
+# ----------------------------
+# category
+# ----------------------------
+def category_list(args, ctx):
+    return {"categories": [{"id": cid, "name": name} for cid, name in get_categories(ctx.db_path)]}
+
+
+def category_add(args, ctx):
+    ctx.user()
+    return {"id": add_category(args.name, args.description, db_path=ctx.db_path)}
+
+
+def category_delete(args, ctx):
+    ctx.user()
+    if not delete_category(args.id, db_path=ctx.db_path):
+        raise CliError(f"Category {args.id} not deleted (not found or still in use).", EXIT_NOT_FOUND)
+    return {"id": args.id}
+
+
+# ----------------------------
+# user
+# ----------------------------
+def user_add(args, ctx):
+    user_id = register_user(args.alias, _new_password(args, ctx), db_path=ctx.db_path)
+    if user_id is None:
+        raise CliError(f"User '{args.alias}' not created (empty or existing alias).")
+    return {"id": user_id}
+
+
+def user_list(args, ctx):
+    ctx.user(admin=True)
+    counts = get_all_user_counts(ctx.db_path)
+    users = []
+    for uid, alias, locked, fails, is_admin in get_users(ctx.db_path):
+        open_cnt, done_cnt, overdue = counts.get(uid, (0, 0, 0))
+        users.append({"id": uid, "alias": alias, "is_admin": bool(is_admin), "locked": bool(locked),
+                      "failed_attempts": fails, "open": open_cnt, "done": done_cnt, "overdue": overdue})
+    return {"users": users}
+
+
+def user_unlock(args, ctx):
+    ctx.user(admin=True)
+    if not admin_unlock_user(args.id, db_path=ctx.db_path):
+        raise CliError(f"User {args.id} not found.", EXIT_NOT_FOUND)
+    return {"id": args.id}
+
+
+def user_reset_password(args, ctx):
+    ctx.user(admin=True)
+    if not admin_reset_password(args.id, _new_password(args, ctx), db_path=ctx.db_path):
+        raise CliError(f"Password of user {args.id} not changed.", EXIT_NOT_FOUND)
+    return {"id": args.id}
+
+
+def user_provision(args, ctx):
+    ctx.user(admin=True)
+    try:
+        return provision_users(read_import_file(args.file), ctx.db_path)
+    except OSError as e:
+        raise CliError(f"Could not read user file: {e}")
+
+
+# ----------------------------
+# login / logout
+# ----------------------------
+def login(args, ctx):
+    user = ctx.user()
+    return {"user": user, "token": create_session(user["id"], ctx.db_path)}
+
+
+def logout(args, ctx):
+    token = ctx.token or load_remembered_token()
+    if not token:
+        raise CliError("No session token to revoke.", EXIT_USAGE)
+    revoke_session(token, ctx.db_path)
+    return {}
+
+
+# ----------------------------
+# Parser
+# ----------------------------
+def build_parser():
+    parser = ArgumentParser(prog="cli.py", description="Scriptable task CLI with JSON output.")
+    parser.add_argument("--db", default=DB_PATH, help="database path")
+    parser.add_argument("--user", help="log in as this alias (password from TODO_PASSWORD)")
+    parser.add_argument("--token", help="session token (default: TODO_SESSION_TOKEN or remembered login)")
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON output")
+    parser.add_argument("--quiet", action="store_true", help="drop human-readable messages")
+    groups = parser.add_subparsers(dest="group", required=True, parser_class=ArgumentParser)
+
+    task = groups.add_parser("task").add_subparsers(dest="command", required=True, parser_class=ArgumentParser)
+    p = task.add_parser("add")
+    p.add_argument("title")
+    p.add_argument("--category")
+    p.add_argument("--description")
+    p.add_argument("--due", help="YYYY-MM-DD")
+    p.set_defaults(handler=task_add)
+
+    p = task.add_parser("list")
+    state = p.add_mutually_exclusive_group()
+    state.add_argument("--open", action="store_true")
+    state.add_argument("--completed", action="store_true")
+    p.add_argument("--category")
+    p.add_argument("--owner", help="alias or id (admins only)")
+    p.add_argument("--from", dest="date_from", help="due date from (YYYY-MM-DD)")
+    p.add_argument("--to", dest="date_to", help="due date to (YYYY-MM-DD)")
+    p.add_argument("--overdue", action="store_true")
+    p.add_argument("--sort", choices=SORT_KEYS, default="default")
+    p.add_argument("--desc", action="store_true")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--offset", type=int, default=0)
+    p.set_defaults(handler=task_list)
+
+    p = task.add_parser("get")
+    p.add_argument("id", type=int)
+    p.set_defaults(handler=task_get)
+
+    p = task.add_parser("search")
+    p.add_argument("text")
+    p.add_argument("--limit", type=int, default=SEARCH_LIMIT)
+    p.set_defaults(handler=task_search)
+
+    for name, handler in (("complete", task_complete), ("delete", task_delete)):
+        p = task.add_parser(name)
+        p.add_argument("ids", help="e.g. 1,4,7-9")
+        p.set_defaults(handler=handler)
+
+    p = task.add_parser("update")
+    p.add_argument("ids", help="e.g. 1,4,7-9")
+    p.add_argument("--title")
+    p.add_argument("--category")
+    p.add_argument("--description")
+    p.add_argument("--due", help="YYYY-MM-DD")
+    p.set_defaults(handler=task_update)
+
+    category = groups.add_parser("category").add_subparsers(dest="command", required=True,
+                                                            parser_class=ArgumentParser)
+    category.add_parser("list").set_defaults(handler=category_list)
+    p = category.add_parser("add")
+    p.add_argument("name")
+    p.add_argument("--description", default="")
+    p.set_defaults(handler=category_add)
+    p = category.add_parser("delete")
+    p.add_argument("id", type=int)
+    p.set_defaults(handler=category_delete)
+
+    user = groups.add_parser("user").add_subparsers(dest="command", required=True, parser_class=ArgumentParser)
+    p = user.add_parser("add")
+    p.add_argument("alias")
+    p.add_argument("--password-stdin", action="store_true", help="read the password from the first line of stdin")
+    p.set_defaults(handler=user_add)
+    user.add_parser("list").set_defaults(handler=user_list)
+    p = user.add_parser("unlock")
+    p.add_argument("id", type=int)
+    p.set_defaults(handler=user_unlock)
+    p = user.add_parser("reset-password")
+    p.add_argument("id", type=int)
+    p.add_argument("--password-stdin", action="store_true", help="read the password from the first line of stdin")
+    p.set_defaults(handler=user_reset_password)
+    p = user.add_parser("provision")
+    p.add_argument("file", help="CSV/JSONL with alias,password[,is_admin]")
+    p.set_defaults(handler=user_provision)
+
+    groups.add_parser("login").set_defaults(handler=login)
+    groups.add_parser("logout").set_defaults(handler=logout)
+
+    p = groups.add_parser("batch")
+    p.add_argument("file", nargs="?", default="-", help="command file ('-' = stdin)")
+    p.set_defaults(handler=None)
+    return parser
+
+
+# ----------------------------
+# Ausführung
+# ----------------------------
+def _messages(args):
+    """Meldungen der Bibliotheksfunktionen (print) von der JSON-Ausgabe trennen."""
+    return contextlib.redirect_stdout(io.StringIO() if args.quiet else sys.stderr)
+
+
+def run_command(args, ctx):
+    """Führt einen geparsten Befehl aus; liefert das Ergebnis-Dict (CliError bei jedem Fehler)."""
+    try:
+        with _messages(args):
+            return args.handler(args, ctx)
+    except CliError:
+        raise
+    except (ValueError, sqlite3.Error) as e:
+        raise CliError(str(e))
+    except (Exception, SystemExit) as e:
+        # Auch unerwartete Fehler als JSON melden (im Batch mit Rollback)
+        raise CliError(f"{type(e).__name__}: {e}")
+
+
+def _parse_line(parser, args, line):
+    """Eine Batch-Zeile parsen; --help o.ä. beendet nicht das Programm mitten in der Transaktion."""
+    try:
+        words = shlex.split(line)
+    except ValueError as e:
+        raise CliError(f"Invalid line: {e}", EXIT_USAGE)
+    try:
+        with _messages(args):
+            return parser.parse_args(words)
+    except SystemExit:
+        raise CliError("Help and version options are not available in batch mode.", EXIT_USAGE)
+
+
+def run_batch(parser, args, ctx):
+    """Alle Befehle der Datei in einer Transaktion; liefert (exit_code, ergebnis)."""
+    f = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    ctx.stdin_in_use = f is sys.stdin
+    results = []
+    # Anmelden, bevor die Batch-Transaktion beginnt: sonst würde ein Rollback auch
+    # den gezählten Fehlversuch (failed_attempts/locked) zurücknehmen.
+    with _messages(args):
+        ctx.login()
+    try:
+        with connection(ctx.db_path):
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                try:
+                    cmd = _parse_line(parser, args, line)
+                    if cmd.handler is None:
+                        raise CliError("'batch' cannot be nested.", EXIT_USAGE)
+                    cmd.quiet = cmd.quiet or args.quiet
+                    results.append({"line": line_no, "ok": True, **run_command(cmd, ctx)})
+                except CliError as e:
+                    results.append({"line": line_no, "ok": False, "error": str(e)})
+                    raise
+    except Exception as e:
+        # Rollback: Kategorie-Cache könnte zurückgerollte Kategorien enthalten
+        invalidate_category_cache(ctx.db_path)
+        code = e.code if isinstance(e, CliError) else EXIT_ERROR
+        return code, {"ok": False, "committed": False, "error": str(e), "results": results}
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return EXIT_OK, {"ok": True, "committed": True, "results": results}
+
+
+def main(argv=None):
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except CliError as e:
+        print(json.dumps({"ok": False, "error": str(e)}))
+        return e.code
+
+    with _messages(args):
+        init_db(args.db)
+    ctx = Context(args)
+    try:
+        if args.handler is None:
+            code, result = run_batch(parser, args, ctx)
+        else:
+            code, result = EXIT_OK, {"ok": True, **run_command(args, ctx)}
+    except CliError as e:
+        code, result = e.code, {"ok": False, "error": str(e)}
+    except Exception as e:
+        code, result = EXIT_ERROR, {"ok": False, "error": str(e)}
+
+    print(json.dumps(result, ensure_ascii=False, indent=2 if args.pretty else None))
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Zähler für Task-Statistiken (task_counter aus Migration 5, task_category_due_counter aus Migration 7).
+
+Die Trigger auf `task` halten die Zähler bei jedem Insert/Update/Delete aktuell,
+Profil und Admin-Übersicht lesen daher nur wenige Zeilen statt alle Tasks.
+"Überfällig" hängt vom heutigen Datum ab und wird je Kategorie als Summe über die
+offenen Tasks je Fälligkeitstag (due_date < heute) gebildet.
+
+Aufruf:  python counters.py [--check] [pfad-zur-db]
+- ohne Option: Zähler aus der task-Tabelle neu aufbauen (Abgleich)
+- --check: nur vergleichen, Exit-Code 1 bei Abweichungen
+"""
+import sys
+from datetime import datetime
+from db import connection, DB_PATH
+
+
+# ----------------------------
+# Abgleich
+# ----------------------------
+_ACTUAL_COUNTS = """
+    SELECT user_id, COALESCE(category_id, 0),
+           SUM(completed = 0), SUM(completed <> 0)
+    FROM task
+    GROUP BY user_id, COALESCE(category_id, 0)
+"""
+
+_ACTUAL_DUE_COUNTS = """
+    SELECT user_id, COALESCE(category_id, 0), due_date, COUNT(*)
+    FROM task
+    WHERE completed = 0 AND due_date IS NOT NULL
+    GROUP BY user_id, COALESCE(category_id, 0), due_date
+"""
+
+
+def rebuild_counters(con):
+    """Baut beide Zählertabellen aus `task` neu auf (innerhalb der laufenden Transaktion)."""
+    con.execute("DELETE FROM task_counter")
+    con.execute("DELETE FROM task_category_due_counter")
+    con.execute(f"INSERT INTO task_counter (user_id, category_id, open_cnt, done_cnt) {_ACTUAL_COUNTS}")
+    con.execute(f"INSERT INTO task_category_due_counter (user_id, category_id, due_date, open_cnt) "
+                f"{_ACTUAL_DUE_COUNTS}")
+
+
+def check_counters(db_path=DB_PATH):
+    """Vergleicht Zähler und tatsächliche Werte; liefert [(tabelle, schlüssel, gespeichert, tatsächlich)]."""
+    problems = []
+    with connection(db_path) as con:
+        checks = (
+            ("task_counter", 2, _ACTUAL_COUNTS,
+             "SELECT user_id, category_id, open_cnt, done_cnt FROM task_counter"),
+            ("task_category_due_counter", 3, _ACTUAL_DUE_COUNTS,
+             "SELECT user_id, category_id, due_date, open_cnt FROM task_category_due_counter"),
+        )
+        for table, key_len, actual_sql, stored_sql in checks:
+            actual = {row[:key_len]: row[key_len:] for row in con.execute(actual_sql)}
+            stored = {row[:key_len]: row[key_len:] for row in con.execute(stored_sql)}
+            for key in actual.keys() | stored.keys():
+                zero = (0,) * len(actual.get(key) or stored.get(key))
+                have, want = stored.get(key, zero), actual.get(key, zero)
+                if have != want:
+                    problems.append((table, key, have, want))
+    return problems
+
+
+# ----------------------------
+# Lesen (Abfragen auch von tests/test_queryplan.py geprüft)
+# ----------------------------
+# Überfällig je Kategorie: Bereich (user_id, category_id, due_date < heute) im Primärschlüssel
+_USER_CATEGORY_COUNTS = """
+    SELECT category.name, task_counter.open_cnt, task_counter.done_cnt,
+           (SELECT COALESCE(SUM(due.open_cnt), 0)
+            FROM task_category_due_counter AS due
+            WHERE due.user_id = task_counter.user_id
+              AND due.category_id = task_counter.category_id
+              AND due.due_date < ?) AS overdue
+    FROM task_counter
+    LEFT JOIN category ON category.id = task_counter.category_id
+    WHERE task_counter.user_id = ?
+      AND (task_counter.open_cnt > 0 OR task_counter.done_cnt > 0)
+    ORDER BY category.name IS NULL, category.name
+"""
+
+
+def get_user_counts(user_id, db_path=DB_PATH, today=None):
+    """
+    Statistik eines Users aus den Zählern:
+    {"open": n, "done": n, "overdue": n, "categories": [(name, open, done, overdue), ...]}
+    """
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    with connection(db_path) as con:
+        per_category = con.execute(_USER_CATEGORY_COUNTS, (today, user_id)).fetchall()
+
+    return {
+        "open": sum(row[1] for row in per_category),
+        "done": sum(row[2] for row in per_category),
+        "overdue": sum(row[3] for row in per_category),
+        "categories": per_category,
+    }
+
+
+def get_all_user_counts(db_path=DB_PATH, today=None):
+    """Admin-Übersicht: {user_id: (offen, erledigt, überfällig)} für alle User mit Tasks."""
+    today = today or datetime.now().strftime("%Y-%m-%d")
+    with connection(db_path) as con:
+        counts = {
+            uid: (open_cnt, done_cnt, 0)
+            for uid, open_cnt, done_cnt in con.execute("""
+                SELECT user_id, SUM(open_cnt), SUM(done_cnt)
+                FROM task_counter
+                GROUP BY user_id
+            """)
+        }
+        for uid, overdue in con.execute("""
+            SELECT user_id, SUM(open_cnt)
+            FROM task_category_due_counter
+            WHERE due_date < ?
+            GROUP BY user_id
+        """, (today,)):
+            open_cnt, done_cnt, _ = counts.get(uid, (0, 0, 0))
+            counts[uid] = (open_cnt, done_cnt, overdue)
+    return counts
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    only_check = "--check" in args
+    args = [a for a in args if a != "--check"]
+    path = args[0] if args else DB_PATH
+
+    if not only_check:
+        with connection(path) as con:
+            rebuild_counters(con)
+        print("Counters rebuilt.")
+
+    problems = check_counters(path)
+    for table, key, have, want in problems:
+        print(f"[DRIFT] {table} {key}: stored {have}, actual {want}")
+    if not problems:
+        print("Counters are consistent.")
+    sys.exit(1 if problems else 0)
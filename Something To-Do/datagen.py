@@ -0,0 +1,181 @@
+"""
+Synthetische Testdaten (User, Kategorien, Tasks) für Benchmarks und manuelle Tests.
+
+Aufruf:  python datagen.py DB [--tasks N] [--users N] [--categories N] [--seed S] [--today YYYY-MM-DD] [--force]
+- Gleicher Seed + gleiches Stichtag-Datum → identische Datenbank.
+- Verteilungen:
+  * Tasks je User und je Kategorie schief verteilt (Zipf-artig: wenige Vielnutzer,
+    wenige große Kategorien), ca. 15 % ohne Kategorie.
+  * Erstellt in den letzten 365 Tagen, jüngere Tasks häufiger.
+  * ca. 30 % ohne Fälligkeit; sonst meist 0–30 Tage nach Erstellung.
+  * Erledigt mit steigender Wahrscheinlichkeit, je älter der Task ist
+    und je länger die Fälligkeit zurückliegt → realistischer Anteil überfälliger Tasks.
+- Alle erzeugten User (bench0001, ...) haben das Passwort BENCH_PASSWORD; gehasht
+  wird einmal mit dem aktuellen Kostenfaktor (TODO_BCRYPT_ROUNDS).
+- Eingefügt wird blockweise mit executemany(); Trigger (FTS, Zähler) laufen mit.
+  Für große Mengen empfiehlt sich TODO_DB_PROFILE=fast.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from db import connection, init_db, close_pools
+from categories import invalidate_category_cache
+
+BENCH_PASSWORD = "bench-password"
+USER_PREFIX = "bench"
+
+# Zeilen pro Transaktion
+CHUNK_SIZE = 10000
+
+_VERBS = ["Write", "Review", "Fix", "Plan", "Call", "Buy", "Clean", "Prepare", "Update", "Check",
+          "Book", "Send", "Read", "Order", "Pay", "Organize", "Test", "Refactor", "Email", "Schedule"]
+_OBJECTS = ["report", "invoice", "groceries", "meeting notes", "dentist", "budget", "garage",
+            "presentation", "release", "newsletter", "tax return", "flight", "backup", "homework",
+            "birthday gift", "car service", "database migration", "team lunch", "contract", "website"]
+_DETAILS = ["before Friday", "with Anna", "for the customer", "asap", "next week", "if time permits",
+            "see mail", "(second try)", "for Q3", "together with the team"]
+_CATEGORY_NAMES = ["Work", "Private", "Shopping", "Health", "Finance", "Household", "Travel",
+                   "Learning", "Family", "Garden", "Car", "Sport", "Hobby", "Friends", "Admin"]
+
+
+def _zipf_weights(n, s=1.0):
+    return [1 / (rank + 1) ** s for rank in range(n)]
+
+
+def _category_names(count):
+    names = _CATEGORY_NAMES[:count]
+    names += [f"Project {i:03d}" for i in range(1, count - len(names) + 1)]
+    return names
+
+
+def _task_row(rng, today, user_id, category_id):
+    """Ein Task-Tupel (title, description, creation_date, completed, due_date, category_id, user_id)."""
+    # jüngere Tasks häufiger: Alter in Tagen, exponentiell mit Mittel 90, höchstens 365
+    age = min(int(rng.expovariate(1 / 90)), 365)
+    created = today - timedelta(days=age)
+
+    due = None
+    if rng.random() >= 0.3:
+        if rng.random() < 0.9:
+            due = created + timedelta(days=int(rng.expovariate(1 / 10)))
+        else:
+            due = created + timedelta(days=rng.randint(31, 180))     # langfristige Vorhaben
+
+    # Erledigt-Wahrscheinlichkeit: steigt mit dem Alter, hoch bei längst fälligen Tasks
+    p_done = min(0.95, 0.1 + age / 120)
+    if due is not None and due < today:
+        p_done = max(p_done, 0.85 if (today - due).days > 14 else 0.6)
+    completed = 1 if rng.random() < p_done else 0
+
+    title = f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+    if rng.random() < 0.3:
+        title += f" {rng.choice(_DETAILS)}"
+    description = None
+    if rng.random() < 0.5:
+        description = " ".join(rng.choices(_OBJECTS + _DETAILS, k=rng.randint(3, 12)))
+
+    return (title, description, created.isoformat(), completed,
+            due.isoformat() if due else None, category_id, user_id)
+
+
+def generate(db_path, tasks=10000, users=None, categories=None, seed=42, today=None, progress=None):
+    """
+    Befüllt db_path mit synthetischen Daten (Schema wird bei Bedarf angelegt).
+    users/categories: Standard abhängig von der Task-Anzahl (1 User je 500 Tasks, 5–2000;
+    20 Kategorien). progress(eingefügt) nach jedem Block.
+    Liefert {"users": [user_id, ...], "categories": [category_id, ...], "tasks": n, "seconds": s}.
+    """
+    # Lokaler Import: bcrypt nur für den einen Hash laden
+    from passwords import hash_pw
+
+    rng = random.Random(seed)
+    today = today or date.today()
+    users = users or max(5, min(2000, tasks // 500))
+    categories = categories if categories is not None else 20
+    started = time.perf_counter()
+
+    init_db(db_path)
+    pw_hash = hash_pw(BENCH_PASSWORD)
+    with connection(db_path) as con:
+        con.executemany(
+            "INSERT OR IGNORE INTO users (alias, password_hash, is_admin, locked, failed_attempts) "
+            "VALUES (?, ?, 0, 0, 0)",
+            ((f"{USER_PREFIX}{i:04d}", pw_hash) for i in range(1, users + 1)))
+        con.executemany("INSERT OR IGNORE INTO category (name) VALUES (?)",
+                        ((name,) for name in _category_names(categories)))
+        user_ids = [row[0] for row in con.execute(
+            "SELECT id FROM users WHERE alias LIKE ? ORDER BY alias", (USER_PREFIX + "%",))]
+        category_ids = [row[0] for row in con.execute(
+            "SELECT id FROM category WHERE name IN (SELECT value FROM json_each(?)) ORDER BY id",
+            (json.dumps(_category_names(categories)),))]
+    # Kategorien direkt eingefügt → gecachte Namen/IDs sind veraltet
+    invalidate_category_cache(db_path)
+
+    # Reihenfolge mischen, damit die Vielnutzer nicht immer die ersten IDs sind
+    user_order = user_ids[:]
+    rng.shuffle(user_order)
+    user_weights = _zipf_weights(len(user_order), 0.8)
+    category_weights = _zipf_weights(len(category_ids), 1.0)
+
+    inserted = 0
+    while inserted < tasks:
+        n = min(CHUNK_SIZE, tasks - inserted)
+        owners = rng.choices(user_order, user_weights, k=n)
+        rows = []
+        for owner in owners:
+            category_id = None
+            if category_ids and rng.random() >= 0.15:
+                category_id = rng.choices(category_ids, category_weights)[0]
+            rows.append(_task_row(rng, today, owner, category_id))
+        with connection(db_path) as con:
+            con.executemany("""
+                INSERT INTO task (title, description, creation_date, completed, due_date, category_id, user_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        inserted += n
+        if progress:
+            progress(inserted)
+
+    with connection(db_path) as con:
+        con.execute("ANALYZE")
+    return {"users": user_ids, "categories": category_ids, "tasks": inserted,
+            "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a database with reproducible synthetic tasks.")
+    parser.add_argument("db", help="target database file (created if missing)")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=None, help="default: one user per 500 tasks")
+    parser.add_argument("--categories", type=int, default=None, help="default: 20")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="reference date for creation/due dates (default: today)")
+    parser.add_argument("--force", action="store_true", help="delete an existing database first")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.db):
+        if not args.force:
+            print(f"{args.db} already exists (use --force to replace it).", file=sys.stderr)
+            return 1
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    def progress(done):
+        print(f"\r{done}/{args.tasks} tasks", end="", flush=True)
+
+    result = generate(args.db, args.tasks, args.users, args.categories, args.seed, args.today, progress)
+    close_pools()
+    print(f"\nCreated {len(result['users'])} users, {len(result['categories'])} categories "
+          f"and {result['tasks']} tasks in {result['seconds']:.1f} s "
+          f"(password for all users: '{BENCH_PASSWORD}').")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,64 +1,298 @@
+import atexit
 import os
+import queue
 import sqlite3
-import bcrypt
+import threading
+from contextlib import contextmanager
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "todo.db")
 
 
-def _hash_pw(plain: str) -> str:
-    """Lokale Passwort-Hash Funktion (vermeidet Zirkularimport mit auth.py)."""
-    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# Maximale Anzahl offener Verbindungen pro Datenbankdatei
+POOL_SIZE = int(os.getenv("TODO_DB_POOL_SIZE", "4"))
+# Wartezeit (Sekunden), bis eine freie Verbindung verfügbar sein muss
+POOL_TIMEOUT = float(os.getenv("TODO_DB_POOL_TIMEOUT", "30"))
+
+
+# Speicherprofile (PRAGMAs); Auswahl über TODO_DB_PROFILE
+STORAGE_PROFILES = {
+    # Standard: WAL, damit CLI und GUI parallel lesen/schreiben können
+    "default": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "cache_size": -16000,          # negativ = KiB, also ca. 16 MB
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "memory",
+        "busy_timeout": 5000,          # ms
+    },
+    # Maximale Haltbarkeit (fsync bei jedem Commit)
+    "durable": {
+        "journal_mode": "wal",
+        "synchronous": "full",
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "default",
+        "busy_timeout": 10000,
+    },
+    # Für Bulk-Importe/Benchmarks: schnell, aber ohne Absturzsicherheit
+    "fast": {
+        "journal_mode": "wal",
+        "synchronous": "off",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "memory",
+        "busy_timeout": 5000,
+    },
+    # Verhalten wie vor WAL (Rollback-Journal, SQLite-Defaults)
+    "legacy": {
+        "journal_mode": "delete",
+        "synchronous": "full",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "default",
+        "busy_timeout": 0,
+    },
+}
+
+# PRAGMA-Werte, die SQLite als Zahl zurückliefert
+_PRAGMA_NAMES = {
+    "synchronous": {0: "off", 1: "normal", 2: "full", 3: "extra"},
+    "temp_store": {0: "default", 1: "file", 2: "memory"},
+}
+
+
+def get_storage_profile(name=None):
+    """Liefert (name, pragmas) des gewählten Profils (Parameter > TODO_DB_PROFILE > 'default')."""
+    name = (name or os.getenv("TODO_DB_PROFILE") or "default").strip().lower()
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{name}'. Choose from: {', '.join(STORAGE_PROFILES)}.")
+    return name, STORAGE_PROFILES[name]
+
+
+def apply_storage_profile(con, profile=None, include_journal_mode=False):
+    """
+    Setzt die verbindungsbezogenen PRAGMAs eines Profils.
+    journal_mode ist dateibezogen und wird nur von init_db gesetzt.
+    """
+    _name, pragmas = get_storage_profile(profile)
+    for key, value in pragmas.items():
+        if key == "journal_mode" and not include_journal_mode:
+            continue
+        con.execute(f"PRAGMA {key} = {value}")
 
 
 def get_conn(db_path=DB_PATH):
-    return sqlite3.connect(db_path)
+    """Öffnet eine neue, rohe Verbindung (wird vom Pool verwendet)."""
+    con = sqlite3.connect(db_path, check_same_thread=False)
+    apply_storage_profile(con)
+    return con
+
+
+class ConnectionPool:
+    """
+    Hält langlebige Verbindungen zu einer Datenbankdatei offen.
+    - Höchstens `size` Verbindungen werden erzeugt, danach wird gewartet.
+    - Pro Thread wird eine bereits ausgeliehene Verbindung wiederverwendet,
+      verschachtelte `connection()`-Blöcke laufen also in derselben Transaktion
+      (je Block ein SAVEPOINT).
+    - `dedicated()` liefert eine eigene Verbindung außerhalb dieser Verschachtelung,
+      z.B. für Generatoren, die zwischen zwei Zeilenblöcken pausieren.
+    """
+
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        if size < 1:
+            raise ValueError("'size' must be at least 1.")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.size:
+                con = get_conn(self.db_path)
+                self._all.append(con)
+                return con
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No free database connection after {self.timeout}s (pool size {self.size}).")
+
+    def release(self, con):
+        self._idle.put(con)
+
+    @contextmanager
+    def connection(self):
+        """
+        Leiht eine Verbindung aus; Commit bei Erfolg, Rollback bei Fehler.
+        Ein verschachtelter Block ist ein SAVEPOINT in der Transaktion des äußeren:
+        bei einem Fehler werden nur seine Änderungen zurückgenommen, committet wird außen.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            con = self._local.con = self.acquire()
+        else:
+            con = self._local.con
+            # Ohne offene Transaktion würde RELEASE den Savepoint sofort committen
+            if not con.in_transaction:
+                con.execute("BEGIN")
+            savepoint = f"nested_{depth}"
+            con.execute(f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+        try:
+            yield con
+            if depth == 0:
+                con.commit()
+            elif con.in_transaction:
+                con.execute(f"RELEASE {savepoint}")
+        except BaseException:
+            if depth == 0:
+                con.rollback()
+            elif con.in_transaction:
+                con.execute(f"ROLLBACK TO {savepoint}")
+                con.execute(f"RELEASE {savepoint}")
+            raise
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                self._local.con = None
+                self.release(con)
+
+    @contextmanager
+    def dedicated(self):
+        """
+        Eigene Verbindung aus dem Pool, unabhängig von der des Threads:
+        Schreibzugriffe während eines pausierten Generators landen nicht in dessen Transaktion.
+        """
+        con = self.acquire()
+        try:
+            yield con
+            con.commit()
+        except BaseException:
+            con.rollback()
+            raise
+        finally:
+            self.release(con)
+
+    def close(self):
+        """Schließt alle Verbindungen des Pools."""
+        with self._lock:
+            for con in self._all:
+                con.close()
+            self._all.clear()
+            self._idle = queue.LifoQueue()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=DB_PATH):
+    """Liefert den (einmalig erzeugten) Pool für eine Datenbankdatei."""
+    key = os.path.abspath(db_path) if db_path != ":memory:" else db_path
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # Jede :memory:-Verbindung wäre eine eigene Datenbank → nur eine
+            size = 1 if db_path == ":memory:" else POOL_SIZE
+            pool = _pools[key] = ConnectionPool(db_path, size=size)
+        return pool
+
+
+def connection(db_path=DB_PATH):
+    """
+    Context-Manager für alle DB-Zugriffe:
+        with connection(db_path) as con:
+            con.execute(...)
+    """
+    return get_pool(db_path).connection()
+
+
+def dedicated_connection(db_path=DB_PATH):
+    """
+    Wie connection(), aber immer mit einer eigenen Verbindung (nicht verschachtelt).
+    Für Generatoren, die über mehrere yield hinweg lesen (Streaming).
+    """
+    return get_pool(db_path).dedicated()
+
+
+def close_pools():
+    """Schließt alle offenen Pools (z.B. beim Beenden oder in Skripten)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+atexit.register(close_pools)
+
+
+# Datenbanken, die in diesem Prozess schon initialisiert wurden
+_initialized = set()
+
+
+def _startup_state(con):
+    """
+    Ein Lesezugriff ohne Schreibsperre: (user_version, journal_mode, users_vorhanden).
+    Auf einer frischen Datei fehlt die users-Tabelle → None (langsamer Pfad).
+    """
+    try:
+        version, journal_mode, has_users = con.execute("""
+            SELECT v.user_version, j.journal_mode, EXISTS (SELECT 1 FROM users)
+            FROM pragma_user_version AS v, pragma_journal_mode AS j
+        """).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return version, journal_mode.lower(), bool(has_users)
 
 
 def init_db(db_path=DB_PATH):
-    con = get_conn(db_path)
-    cur = con.cursor()
+    """
+    Bringt Speicherprofil, Schema und Bootstrap-Admin auf Stand.
+    Schnellpfad: Schema-Version aktuell, journal_mode passt und es gibt User →
+    eine einzige Leseabfrage, keine DDL, kein Commit, keine Schreibsperre.
+    Pro Prozess und Datei wird nur einmal geprüft.
+    """
+    key = os.path.abspath(db_path) if db_path != ":memory:" else db_path
+    if key in _initialized:
+        return
 
-    # Tabellen erstellen
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            alias TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            is_admin INTEGER NOT NULL DEFAULT 0,
-            locked INTEGER NOT NULL DEFAULT 0,
-            failed_attempts INTEGER NOT NULL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-    """)
+    # Lokaler Import: migrations.py importiert selbst db.py
+    from migrations import migrate, latest_version
 
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS category (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL
-        );
-    """)
+    _name, pragmas = get_storage_profile()
+    bootstrap = os.getenv("AUTO_BOOTSTRAP_ADMIN", "1") == "1"
+    with connection(db_path) as con:
+        state = _startup_state(con)
+        if (state is not None and state[0] >= latest_version() and state[1] == pragmas["journal_mode"]
+                and (state[2] or not bootstrap)):
+            _initialized.add(key)
+            return
 
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS task (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            creation_date DATE NOT NULL,
-            completed INTEGER NOT NULL DEFAULT 0,
-            due_date DATE,
-            category_id INTEGER,
-            user_id INTEGER NOT NULL,
-            FOREIGN KEY (category_id) REFERENCES category(id),
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        );
-    """)
-
-    # Bootstrap Admin ggf. anlegen
-    ensure_bootstrap_admin(cur)
-
-    con.commit()
-    con.close()
+        # Speicherprofil (inkl. journal_mode=WAL) anwenden
+        if state is None or state[0] < latest_version() or state[1] != pragmas["journal_mode"]:
+            apply_storage_profile(con, include_journal_mode=True)
+
+    # Schema auf den neuesten Stand bringen (PRAGMA user_version);
+    # die Schritte committen selbst, daher außerhalb des Blocks
+    if state is None or state[0] < latest_version():
+        migrate(db_path)
+
+    with connection(db_path) as con:
+        # Bootstrap Admin ggf. anlegen
+        ensure_bootstrap_admin(con.cursor())
+    _initialized.add(key)
 
 
 def ensure_bootstrap_admin(cur):
@@ -66,17 +300,58 @@ def ensure_bootstrap_admin(cur):
     if os.getenv("AUTO_BOOTSTRAP_ADMIN", "1") != "1":
         return
 
-    cur.execute("SELECT COUNT(*) FROM users")
-    count = cur.fetchone()[0]
-    if count > 0:
+    if cur.execute("SELECT EXISTS (SELECT 1 FROM users)").fetchone()[0]:
         return
 
+    # Lokaler Import: bcrypt wird nur für den ersten Start gebraucht
+    from passwords import hash_pw
+
     alias = os.getenv("BOOTSTRAP_ALIAS", "admin")
     pw = os.getenv("BOOTSTRAP_PASSWORD", "admin")
 
+    # Startet ein zweiter Prozess gleichzeitig, legt nur einer den Admin an
     cur.execute("""
         INSERT INTO users (alias, password_hash, is_admin, locked, failed_attempts)
-        VALUES (?, ?, 1, 0, 0)
-    """, (alias, _hash_pw(pw)))
+        SELECT ?, ?, 1, 0, 0
+        WHERE NOT EXISTS (SELECT 1 FROM users)
+    """, (alias, hash_pw(pw)))
+    if cur.rowcount:
+        print(f"✅ Bootstrap-Admin angelegt: alias='{alias}', password='{pw}'")
+
+
+def check_storage_profile(db_path=DB_PATH, profile=None):
+    """
+    Vergleicht die tatsächlich aktiven PRAGMAs mit dem Profil.
+    Liefert eine Liste [(pragma, erwartet, aktuell, ok), ...].
+    """
+    _name, pragmas = get_storage_profile(profile)
+    result = []
+    with connection(db_path) as con:
+        for key, expected in pragmas.items():
+            actual = con.execute(f"PRAGMA {key}").fetchone()[0]
+            actual = _PRAGMA_NAMES.get(key, {}).get(actual, actual)
+            if isinstance(actual, str):
+                actual = actual.lower()
+            result.append((key, expected, actual, actual == expected))
+    return result
+
+
+def report_storage_profile(db_path=DB_PATH, profile=None):
+    """Gibt den Abgleich Profil ↔ Datenbank auf der Konsole aus; True, wenn alles passt."""
+    name, _pragmas = get_storage_profile(profile)
+    rows = check_storage_profile(db_path, name)
+    print(f"\n=== Storage profile '{name}' ({db_path}) ===")
+    for key, expected, actual, ok in rows:
+        mark = "OK " if ok else "!! "
+        print(f"{mark}{key:<13} expected: {expected:<12} actual: {actual}")
+    all_ok = all(ok for *_rest, ok in rows)
+    print("All settings active." if all_ok else "Some settings differ from the profile.")
+    print()
+    return all_ok
+
 
-    print(f"✅ Bootstrap-Admin angelegt: alias='{alias}', password='{pw}'")
+if __name__ == "__main__":
+    # Schnelle Prüfung einer ausgelieferten Datenbank: python db.py [pfad]
+    import sys
+    path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    sys.exit(0 if report_storage_profile(path) else 1)
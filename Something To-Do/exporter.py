@@ -0,0 +1,216 @@
+"""
+Streaming-Export von Aufgaben nach CSV, JSON Lines oder in ein kompaktes
+spaltenorientiertes Binärformat (ohne Parquet/pyarrow).
+
+Aufruf:  python exporter.py [--format csv|jsonl|columnar] [--user ALIAS]
+                            [--category NAME] [--completed 0|1]
+                            [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+                            [--date-field due_date|creation_date]
+                            [--gzip] [--db PFAD] DATEI
+- DATEI '-' schreibt nach stdout; Endung .gz (oder --gzip) komprimiert.
+- Die Zeilen werden blockweise gelesen und geschrieben → konstanter Speicher.
+
+Spaltenformat (.tcol), alle Zahlen little-endian:
+    b"TODOCOL1", uint32 Länge, JSON-Kopf {"columns": [...], "types": [...]}
+    je Block: uint32 Zeilenzahl n (0 = Ende), dann je Spalte uint32 Länge + Daten
+      int:  n × int64
+      str:  b"P", n Bytes Null-Flags, (n+1) × uint32 Offsets, UTF-8-Daten
+            oder b"D" (Wörterbuch, bei wenigen verschiedenen Werten wie Kategorie,
+            Datum, Owner): uint32 k, k Werte wie b"P" kodiert, n × uint16 Indizes
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import struct
+import sys
+from db import init_db, DB_PATH
+from importer import resolve_user
+from tasks import iter_export_chunks, EXPORT_COLUMNS, STREAM_CHUNK
+
+FORMATS = ("csv", "jsonl", "columnar")
+
+COLUMNAR_MAGIC = b"TODOCOL1"
+COLUMN_TYPES = {"id": "int", "completed": "int"}   # alle anderen: str
+
+
+# ----------------------------
+# Writer
+# ----------------------------
+def write_csv(chunks, f):
+    writer = csv.writer(f)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for rows in chunks:
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def write_jsonl(chunks, f):
+    count = 0
+    for rows in chunks:
+        f.write("".join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+                        for row in rows))
+        count += len(rows)
+    return count
+
+
+def _encode_strings(values):
+    n = len(values)
+    flags = bytes(1 if v is None else 0 for v in values)
+    encoded = [b"" if v is None else str(v).encode("utf-8") for v in values]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return flags + struct.pack(f"<{n + 1}I", *offsets) + b"".join(encoded)
+
+
+def _decode_strings(payload, n):
+    flags = payload[:n]
+    offsets = struct.unpack_from(f"<{n + 1}I", payload, n)
+    data = payload[n + 4 * (n + 1):offsets[n] + n + 4 * (n + 1)]
+    return [None if flags[i] else data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n)]
+
+
+def _encode_column(values, kind):
+    n = len(values)
+    if kind == "int":
+        return struct.pack(f"<{n}q", *values)
+    distinct = dict.fromkeys(values)
+    if len(distinct) <= min(n // 2, 0xFFFF):
+        index = {v: i for i, v in enumerate(distinct)}
+        return (b"D" + struct.pack("<I", len(distinct)) + _encode_strings(list(distinct))
+                + struct.pack(f"<{n}H", *(index[v] for v in values)))
+    return b"P" + _encode_strings(values)
+
+
+def _decode_column(payload, n, kind):
+    if kind == "int":
+        return list(struct.unpack(f"<{n}q", payload))
+    if payload[:1] == b"D":
+        (k,) = struct.unpack_from("<I", payload, 1)
+        words = _decode_strings(payload[5:], k)
+        return [words[i] for i in struct.unpack_from(f"<{n}H", payload, len(payload) - 2 * n)]
+    return _decode_strings(payload[1:], n)
+
+
+def write_columnar(chunks, f):
+    """Schreibt jeden Block als eigenen Spaltenblock (f binär)."""
+    types = [COLUMN_TYPES.get(c, "str") for c in EXPORT_COLUMNS]
+    header = json.dumps({"columns": list(EXPORT_COLUMNS), "types": types}).encode("utf-8")
+    f.write(COLUMNAR_MAGIC + struct.pack("<I", len(header)) + header)
+    count = 0
+    for rows in chunks:
+        parts = [struct.pack("<I", len(rows))]
+        for values, kind in zip(zip(*rows), types):
+            payload = _encode_column(values, kind)
+            parts.append(struct.pack("<I", len(payload)) + payload)
+        f.write(b"".join(parts))
+        count += len(rows)
+    f.write(struct.pack("<I", 0))
+    return count
+
+
+def read_columnar(f):
+    """Liest eine .tcol-Datei (f binär) zeilenweise: liefert Tupel in Spaltenreihenfolge."""
+    if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar task export.")
+    (size,) = struct.unpack("<I", f.read(4))
+    types = json.loads(f.read(size))["types"]
+    while True:
+        (n,) = struct.unpack("<I", f.read(4))
+        if n == 0:
+            return
+        columns = []
+        for kind in types:
+            (size,) = struct.unpack("<I", f.read(4))
+            columns.append(_decode_column(f.read(size), n, kind))
+        yield from zip(*columns)
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "columnar": write_columnar}
+
+
+# ----------------------------
+# Export
+# ----------------------------
+def guess_format(path):
+    name = str(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".tcol"):
+        return "columnar"
+    return "csv"
+
+
+def export_tasks(path, fmt=None, compress=None, db_path=DB_PATH, chunk_size=STREAM_CHUNK, **filters):
+    """
+    Exportiert Aufgaben nach `path` ('-' = stdout). Filter wie tasks.iter_export_chunks
+    (user_id, category, completed, date_from, date_to, date_field).
+    Liefert die Anzahl geschriebener Zeilen.
+    """
+    fmt = fmt or guess_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}' (use {', '.join(FORMATS)}).")
+    if compress is None:
+        compress = str(path).lower().endswith(".gz")
+
+    chunks = iter_export_chunks(db_path=db_path, chunk_size=chunk_size, **filters)
+    binary = sys.stdout.buffer if path == "-" else open(path, "wb")
+    try:
+        raw = gzip.GzipFile(fileobj=binary, mode="wb") if compress else binary
+        try:
+            if fmt == "columnar":
+                return WRITERS[fmt](chunks, raw)
+            text = io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=False)
+            try:
+                return WRITERS[fmt](chunks, text)
+            finally:
+                text.flush()
+                text.detach()
+        finally:
+            if compress:
+                raw.close()
+    finally:
+        if binary is sys.stdout.buffer:
+            binary.flush()
+        else:
+            binary.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export tasks to CSV, JSON Lines or a columnar file.")
+    parser.add_argument("file", help="output file ('-' = stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--user", help="only tasks of this alias or id")
+    parser.add_argument("--category", help="only tasks in this category")
+    parser.add_argument("--completed", type=int, choices=(0, 1), help="only open (0) or completed (1) tasks")
+    parser.add_argument("--from", dest="date_from", help="date range start (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--to", dest="date_to", help="date range end (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--date-field", choices=("due_date", "creation_date"), default="due_date")
+    parser.add_argument("--gzip", action="store_true", default=None, help="gzip the output")
+    parser.add_argument("--chunk", type=int, default=STREAM_CHUNK, help="rows per fetch/write block")
+    parser.add_argument("--db", default=DB_PATH, help="database path")
+    args = parser.parse_args(argv)
+
+    init_db(args.db)
+    user_id = None
+    if args.user:
+        user_id = resolve_user(args.user, args.db)
+        if user_id is None:
+            print(f"User '{args.user}' not found.", file=sys.stderr)
+            return 1
+
+    count = export_tasks(args.file, args.format, args.gzip, db_path=args.db, chunk_size=args.chunk,
+                         user_id=user_id, category=args.category, completed=args.completed,
+                         date_from=args.date_from, date_to=args.date_to, date_field=args.date_field)
+    print(f"Exported {count} tasks.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
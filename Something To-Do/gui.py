@@ -1,11 +1,105 @@
+import queue
+import sys
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk, font
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from auth import authenticate, get_logged_in_user, logout_user, hash_pw
-from tasks import get_tasks, create_task, complete_task, delete_task, update_task
+from auth import authenticate, get_logged_in_user, logout_user, login_with_token, register_user
+from tasks import (get_task, get_tasks_page, count_tasks, create_task, complete_task, delete_task, update_task,
+                   complete_tasks, delete_tasks, search_tasks, TaskQuery, SORT_KEYS,
+                   PAGE_SIZE, NO_DUE_DATE, HIGHLIGHT)
 from categories import get_categories, add_category, delete_category, get_or_create_category
-from db import init_db, get_conn
-from PIL import Image, ImageTk
+from db import init_db, connection
+from counters import get_all_user_counts
+from passwords import submit_hash, shutdown_executor
+from sessions import revoke_user_sessions, forget_cached_user
+
+
+class Worker:
+    """
+    Führt DB-/Hash-Aufrufe in Hintergrund-Threads aus, damit die GUI nicht einfriert.
+    Ergebnisse landen in einer Queue, die per after() im Tk-Thread abgearbeitet wird;
+    nur dort werden die Callbacks aufgerufen (Tk ist nicht threadsicher).
+    """
+    POLL_MS = 40
+
+    def __init__(self, root, max_workers=2, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy          # on_busy(True/False) für die Fortschrittsanzeige
+        self.pending = 0
+        self._results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="todo-worker")
+        self.root.after(self.POLL_MS, self._poll)
+
+    def submit(self, widget, fn, *args, on_done=None, on_error=None, **kwargs):
+        return self.watch(widget, self._executor.submit(fn, *args, **kwargs), on_done, on_error)
+
+    def watch(self, widget, future, on_done=None, on_error=None):
+        """Callbacks für ein beliebiges Future (z.B. aus dem Hash-Prozess-Pool) im Tk-Thread."""
+        self.pending += 1
+        if self.pending == 1 and self.on_busy:
+            self.on_busy(True)
+        future.add_done_callback(lambda f: self._results.put((widget, f, on_done, on_error)))
+        return future
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    item = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._deliver(*item)
+                except tk.TclError:
+                    pass  # Widget während des Callbacks zerstört
+                except Exception:
+                    # Ein fehlerhafter Callback darf die übrigen Ergebnisse nicht blockieren
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            try:
+                self.root.after(self.POLL_MS, self._poll)
+            except tk.TclError:
+                pass  # Hauptfenster bereits zerstört
+
+    def _deliver(self, widget, future, on_done, on_error):
+        self.pending -= 1
+        if self.pending == 0 and self.on_busy:
+            self.on_busy(False)
+        # Fenster inzwischen geschlossen → Ergebnis verwerfen
+        if widget is not None and not widget.winfo_exists():
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                messagebox.showerror("Error", str(error))
+        elif on_done:
+            on_done(future.result())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_background(widget, fn, *args, on_done=None, on_error=None, **kwargs):
+    """
+    fn(*args, **kwargs) im Worker der App ausführen; on_done(result) bzw.
+    on_error(exc) laufen danach im Tk-Thread (nur solange `widget` existiert).
+    """
+    return widget._root().worker.submit(widget, fn, *args, on_done=on_done, on_error=on_error, **kwargs)
+
+
+def run_future(widget, future, on_done=None, on_error=None):
+    """Wie run_in_background, aber für ein bereits laufendes Future."""
+    return widget._root().worker.watch(widget, future, on_done=on_done, on_error=on_error)
+
+
+def load_users():
+    """[(id, alias), ...] alphabetisch, z.B. für Owner-Auswahlfelder."""
+    with connection() as con:
+        return con.execute("SELECT id, alias FROM users ORDER BY alias COLLATE NOCASE").fetchall()
 
 
 class App(tk.Tk):
@@ -49,6 +143,10 @@ class App(tk.Tk):
         # Entry-Felder
         style.configure("TEntry", fieldbackground=SURFACE, foreground=FG, insertcolor=FG)
 
+        # Checkbuttons (z.B. Sortierrichtung)
+        style.configure("TCheckbutton", background=BG, foreground=FG)
+        style.map("TCheckbutton", background=[("active", BG)])
+
         # Scrollbars dunkel
         style.configure("Vertical.TScrollbar", background="#2a2a2a")
         style.map("Vertical.TScrollbar", background=[("active", "#3a3a3a")])
@@ -83,10 +181,44 @@ class App(tk.Tk):
         y = (self.winfo_screenheight() // 2) - (window_height // 2)
         self.geometry(f"{window_width}x{window_height}+{x}+{y}")
 
+        # Statusleiste mit Fortschrittsanzeige für Hintergrundarbeit
+        status = ttk.Frame(self)
+        status.pack(side="bottom", fill="x", padx=8, pady=(0, 4))
+        self.progress = ttk.Progressbar(status, mode="indeterminate", length=120)
+        self.progress.pack(side="right")
+        self.status_var = tk.StringVar()
+        ttk.Label(status, textvariable=self.status_var).pack(side="right", padx=6)
+
+        self.worker = Worker(self, on_busy=self._set_busy)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self.user = None
         self.login_frame = LoginFrame(self, on_success=self.on_login_success)
         self.login_frame.pack(fill="both", expand=True)
 
+        # Gemerkte Sitzung → direkt anmelden (kein bcrypt)
+        run_in_background(self.login_frame, login_with_token, on_done=self._token_login_done,
+                          on_error=lambda _e: None)
+
+    def _token_login_done(self, user):
+        if user and self.user is None:
+            self.on_login_success(user)
+
+    def _set_busy(self, busy):
+        if busy:
+            self.status_var.set("Working…")
+            self.progress.start(12)
+            self.config(cursor="watch")
+        else:
+            self.status_var.set("")
+            self.progress.stop()
+            self.config(cursor="")
+
+    def _on_close(self):
+        self.worker.shutdown()
+        shutdown_executor()
+        self.destroy()
+
     def on_login_success(self, user):
         self.user = user
         self.login_frame.pack_forget()
@@ -105,6 +237,8 @@ class LoginFrame(tk.Frame):
 
         # Logo groß, mittig
         try:
+            # Pillow erst hier laden: das Logo ist optional
+            from PIL import Image, ImageTk
             img = Image.open("logo.png")
             img = img.resize((240, 240))
             self._logo_img = ImageTk.PhotoImage(img)
@@ -118,21 +252,32 @@ class LoginFrame(tk.Frame):
 
         self.alias_var = tk.StringVar()
         self.pw_var = tk.StringVar()
+        self.remember_var = tk.BooleanVar(value=False)
 
         ttk.Entry(self, textvariable=self.alias_var, width=24).grid(row=offset+0, column=1, sticky="w", padx=10)
         ttk.Entry(self, textvariable=self.pw_var, show="*", width=24).grid(row=offset+1, column=1, sticky="w", padx=10)
 
+        ttk.Checkbutton(self, text="Stay signed in", variable=self.remember_var).grid(
+            row=offset+2, column=1, sticky="w", padx=10, pady=(6, 0))
+
         # Button-Reihe: Login (Primary) + Create Account
         btnrow = ttk.Frame(self)
-        btnrow.grid(row=offset+2, column=0, columnspan=2, pady=(18, 10))
-        ttk.Button(btnrow, text="Login", style="Primary.TButton", command=self.try_login).pack(side="left", padx=6)
+        btnrow.grid(row=offset+3, column=0, columnspan=2, pady=(18, 10))
+        self.login_btn = ttk.Button(btnrow, text="Login", style="Primary.TButton", command=self.try_login)
+        self.login_btn.pack(side="left", padx=6)
         ttk.Button(btnrow, text="Create account…", command=self.open_register).pack(side="left", padx=6)
 
     def try_login(self):
         alias = self.alias_var.get().strip()
         pw = self.pw_var.get()
 
-        ok = authenticate(alias, pw)
+        # bcrypt-Prüfung dauert → im Hintergrund
+        self.login_btn.config(state="disabled")
+        run_in_background(self, authenticate, alias, pw, remember=self.remember_var.get(),
+                          on_done=self._login_done, on_error=self._login_error)
+
+    def _login_done(self, ok):
+        self.login_btn.config(state="normal")
         if ok:
             user = get_logged_in_user()
             if user:
@@ -140,6 +285,10 @@ class LoginFrame(tk.Frame):
                 return
         messagebox.showerror("Login failed", "Alias oder Passwort falsch oder Account gesperrt.")
 
+    def _login_error(self, error):
+        self.login_btn.config(state="normal")
+        messagebox.showerror("Login failed", str(error))
+
     def open_register(self):
         RegisterDialog(self, on_success=lambda: None)
 
@@ -188,29 +337,306 @@ class RegisterDialog(tk.Toplevel):
             messagebox.showwarning("Input", "Passwords do not match.")
             return
 
-        con = get_conn()
-        cur = con.cursor()
+        # Gleiche Prüfung und Hashing wie bei CLI/API; None = Alias vergeben
+        run_in_background(self, register_user, alias, pw1,
+                          on_done=lambda user_id: self._created(alias, user_id))
 
-        # Alias muss einzigartig sein
-        cur.execute("SELECT 1 FROM users WHERE alias = ?", (alias,))
-        if cur.fetchone():
-            con.close()
+    def _created(self, alias, user_id):
+        if user_id is None:
             messagebox.showerror("Error", "Alias already exists.")
             return
 
-        cur.execute("INSERT INTO users (alias, password_hash) VALUES (?, ?)", (alias, hash_pw(pw1)))
-        con.commit()
-        con.close()
-
         messagebox.showinfo("Success", f"User '{alias}' created. You can now login.")
         self.on_success()
         self.destroy()
 
 
+class VirtualTaskList(tk.Frame):
+    """
+    Listbox, die nur die gerade sichtbaren Zeilen enthält.
+    - fetch_page(cursor, offset) -> (rows, next_cursor), Seitengröße PAGE_SIZE
+    - count_rows() -> Gesamtzahl (für die Scrollbar)
+    - format_row(row) -> Anzeigetext; row[0] ist die ID
+    - sort_key(row) -> Sortierschlüssel der Zeile (wie in der Abfrage)
+    Geladene Seiten liegen in einem kleinen LRU-Cache. Beim Weiterscrollen wird
+    per Cursor nachgeladen, beim Springen (Scrollbar ziehen) per Offset.
+    Nach Änderungen (update_row/remove_row/insert_row) werden nur die betroffenen
+    Seiten verworfen und nur geänderte Listbox-Zeilen neu geschrieben.
+    Seiten und Anzahl werden im Hintergrund geladen; bis dahin steht "…" da.
+    Mehrfachauswahl (Strg/Shift-Klick) wird über die IDs gemerkt und bleibt
+    daher auch beim Scrollen erhalten.
+    """
+    CACHE_PAGES = 20
+    LOADING = object()      # Platzhalter für Zeilen, deren Seite noch lädt
+
+    def __init__(self, master, fetch_page, count_rows, format_row, sort_key, empty_text=""):
+        super().__init__(master, bg="#121212")
+        self.fetch_page = fetch_page
+        self.count_rows = count_rows
+        self.format_row = format_row
+        self.sort_key = sort_key
+        self.empty_text = empty_text
+
+        self.listbox = tk.Listbox(self, bg="#1e1e1e", fg="#e8e8e8",
+                                  selectbackground="#3b6fd1", selectforeground="white",
+                                  highlightthickness=0, borderwidth=0, activestyle="none",
+                                  selectmode="extended")
+        self.listbox.pack(side="left", fill="both", expand=True)
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.total = 0          # Anzahl aller Zeilen
+        self.top = 0            # Index der obersten sichtbaren Zeile
+        self.visible = 1        # Anzahl sichtbarer Zeilen
+        self.selected_id = None         # zuletzt angeklickte Zeile (z.B. für den Editor)
+        self.selected_index = None
+        self.selected_ids = set()       # alle ausgewählten IDs (Mehrfachauswahl)
+        self._rows = []         # aktuell angezeigte Zeilen
+        self._texts = []        # aktuell angezeigte Listbox-Texte
+        self._pages = OrderedDict()   # Seitennummer -> (rows, next_cursor)
+        self._index = {}        # ID -> (Seite, Position) der gecachten Zeilen
+        self._loading = set()   # Seiten, die gerade geladen werden
+        self._generation = 0    # erhöht bei invalidate() → verspätete Seiten verwerfen
+        self._counting = False
+
+        linespace = font.Font(font=self.listbox.cget("font")).metrics("linespace")
+        self._line_height = linespace + 1 + 2 * int(self.listbox.cget("selectborderwidth"))
+
+        self.listbox.bind("<Configure>", self._on_resize)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_by(-3 if e.delta > 0 else 3))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self._move_selection(-self.visible))
+        self.listbox.bind("<Next>", lambda e: self._move_selection(self.visible))
+
+    # --- Daten ---
+
+    def _run(self, fn, *args, on_done=None):
+        run_in_background(self, fn, *args, on_done=on_done)
+
+    def reload(self):
+        """Verwirft den Cache und zeigt die aktuelle Position neu an."""
+        self.invalidate()
+        self._counting = True
+        self._run(self.count_rows, on_done=self._count_loaded)
+        self.render()
+
+    def _count_loaded(self, total):
+        self._counting = False
+        self.total = total
+        self.render()
+
+    def invalidate(self, from_index=0):
+        """Verwirft gecachte Seiten ab from_index; Seiten davor bleiben gültig."""
+        first = from_index // PAGE_SIZE
+        for page in [p for p in self._pages if p >= first]:
+            self._drop_page(page)
+        self._generation += 1
+        self._loading.clear()
+
+    def _drop_page(self, page):
+        rows, _cursor = self._pages.pop(page)
+        for row in rows:
+            self._index.pop(row[0], None)
+
+    def _page(self, page):
+        """Zeilen der Seite oder None, wenn sie (im Hintergrund) erst geladen wird."""
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page][0]
+        if page not in self._loading:
+            self._loading.add(page)
+            prev = self._pages.get(page - 1)
+            if prev is not None and prev[1] is not None:
+                args = (prev[1], 0)
+            else:
+                args = (None, page * PAGE_SIZE)
+            generation = self._generation
+            self._run(self.fetch_page, *args,
+                      on_done=lambda result: self._page_loaded(page, generation, result))
+        return self._pages[page][0] if page in self._pages else None
+
+    def _page_loaded(self, page, generation, result):
+        if generation != self._generation:
+            return  # Cache wurde inzwischen verworfen
+        self._loading.discard(page)
+        rows, next_cursor = result
+        rows = list(rows)
+        self._pages[page] = (rows, next_cursor)
+        for pos, row in enumerate(rows):
+            self._index[row[0]] = (page, pos)
+        while len(self._pages) > self.CACHE_PAGES:
+            self._drop_page(next(iter(self._pages)))
+        self.render()
+
+    def row_by_id(self, row_id):
+        loc = self._index.get(row_id)
+        if loc is None:
+            return None
+        page, pos = loc
+        return self._pages[page][0][pos]
+
+    def index_of(self, row_id):
+        loc = self._index.get(row_id)
+        return None if loc is None else loc[0] * PAGE_SIZE + loc[1]
+
+    # --- Änderungen nach Mutationen ---
+
+    def update_row(self, row):
+        """
+        Übernimmt eine geänderte Zeile. Bleibt der Sortierschlüssel gleich, wird
+        nur diese Zeile ersetzt; sonst werden die Seiten ab der alten (bzw. bei
+        Vorrücken ab der ersten) Position neu geladen.
+        """
+        old = self.row_by_id(row[0])
+        if old is None:
+            self.invalidate()
+        elif self.sort_key(old) == self.sort_key(row):
+            page, pos = self._index[row[0]]
+            self._pages[page][0][pos] = row
+        elif self.sort_key(row) > self.sort_key(old):
+            self.invalidate(self.index_of(row[0]))
+        else:
+            self.invalidate()
+        self.render()
+
+    def remove_row(self, row_id):
+        index = self.index_of(row_id)
+        self.invalidate(index or 0)
+        self.total = max(0, self.total - 1)
+        self.selected_ids.discard(row_id)
+        if self.selected_id == row_id:
+            self.selected_id = self.selected_index = None
+        self.render()
+
+    def insert_row(self, row_id=None):
+        """Neue Zeile (Position unbekannt) → Cache verwerfen, ggf. auswählen."""
+        self.invalidate()
+        self.total += 1
+        if row_id is not None:
+            self.selected_id, self.selected_index = row_id, None
+            self.selected_ids = {row_id}
+        self.render()
+
+    def clear_selection(self):
+        self.selected_id = self.selected_index = None
+        self.selected_ids = set()
+
+    def row_at(self, index):
+        page, pos = divmod(index, PAGE_SIZE)
+        rows = self._page(page)
+        if rows is None:
+            return self.LOADING
+        return rows[pos] if pos < len(rows) else None
+
+    # --- Anzeige ---
+
+    def render(self):
+        self.top = max(0, min(self.top, self.total - self.visible))
+        end = min(self.total, self.top + self.visible)
+        self._rows = [r for r in (self.row_at(i) for i in range(self.top, end)) if r is not None]
+
+        if self._rows:
+            texts = ["…" if r is self.LOADING else self.format_row(r) for r in self._rows]
+        elif self._counting:
+            texts = ["Loading…"]
+        else:
+            texts = [self.empty_text] if self.empty_text else []
+
+        # Nur geänderte Zeilen der Listbox anfassen
+        for i, text in enumerate(texts):
+            if i < len(self._texts) and self._texts[i] == text:
+                continue
+            if i < self.listbox.size():
+                self.listbox.delete(i)
+            self.listbox.insert(i, text)
+        if self.listbox.size() > len(texts):
+            self.listbox.delete(len(texts), tk.END)
+        self._texts = texts
+
+        self.listbox.selection_clear(0, tk.END)
+        for i, row in enumerate(self._rows):
+            if row is not self.LOADING and row[0] in self.selected_ids:
+                self.listbox.selection_set(i)
+                if row[0] == self.selected_id:
+                    self.selected_index = self.top + i
+        if self._rows:
+            self.scrollbar.set(self.top / self.total, end / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_by(self, lines):
+        self.top += lines
+        self.render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.top = int(float(amount) * self.total)
+            self.render()
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // self._line_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def _on_select(self, _event):
+        # Sichtbaren Teil der Auswahl übernehmen, unsichtbare IDs bleiben gemerkt
+        sel = set(self.listbox.curselection())
+        added = None
+        for i, row in enumerate(self._rows):
+            if row is self.LOADING:
+                continue
+            if i in sel:
+                if row[0] not in self.selected_ids:
+                    self.selected_ids.add(row[0])
+                    added = (row[0], self.top + i)
+            else:
+                self.selected_ids.discard(row[0])
+        if added is not None:
+            self.selected_id, self.selected_index = added
+        elif self.selected_id not in self.selected_ids:
+            self.selected_id = next(iter(self.selected_ids), None)
+            self.selected_index = self.index_of(self.selected_id) if self.selected_id is not None else None
+
+    def _move_selection(self, delta):
+        if not self.total:
+            return "break"
+        index = self.top if self.selected_index is None else self.selected_index + delta
+        index = max(0, min(index, self.total - 1))
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.visible:
+            self.top = index - self.visible + 1
+        row = self.row_at(index)
+        if row is not None and row is not self.LOADING:
+            self.selected_id, self.selected_index = row[0], index
+            self.selected_ids = {row[0]}
+        self.render()
+        return "break"
+
+
 class TasksFrame(tk.Frame):
+    SEARCH_DELAY_MS = 250   # Suche erst nach kurzer Tipp-Pause starten
+    SEARCH_LIMIT = 200
+
     def __init__(self, master, user):
         super().__init__(master, bg="#121212")
         self.user = user
+        self.search_query = ""      # aktive Suche ("" = normale Liste)
+        self.query = None           # aktiver TaskQuery aus den Filtern (None = Standardliste)
+        self._category_ids = {}     # Name -> ID für das Kategorie-Filterfeld
+        self._owner_ids = {}        # Alias -> ID für das Owner-Filterfeld (Admin)
+        self._search_rows = []
+        self._search_job = None
 
         # Header
         ttk.Label(self, text=f"Logged in as: {user['alias']}").pack(anchor="w", padx=8, pady=(8, 0))
@@ -229,18 +655,35 @@ class TasksFrame(tk.Frame):
             ttk.Button(btnbar, text="Admin…", command=self.open_admin).pack(side="left", padx=4)
         ttk.Button(btnbar, text="Logout", command=self.do_logout).pack(side="right", padx=4)
 
-        # Listbox + Scrollbar
-        list_wrap = tk.Frame(self, bg="#121212")
-        list_wrap.pack(fill="both", expand=True, padx=8, pady=(0, 8))
-
-        self.listbox = tk.Listbox(list_wrap, bg="#1e1e1e", fg="#e8e8e8",
-                                  selectbackground="#3b6fd1", selectforeground="white",
-                                  highlightthickness=0, borderwidth=0)
-        self.listbox.pack(side="left", fill="both", expand=True)
-
-        scrollbar = ttk.Scrollbar(list_wrap, orient="vertical", command=self.listbox.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.listbox.config(yscrollcommand=scrollbar.set)
+        # Suche (Volltext über Titel und Beschreibung)
+        searchbar = ttk.Frame(self)
+        searchbar.pack(fill="x", padx=8, pady=(0, 8))
+        ttk.Label(searchbar, text="Search:").pack(side="left", padx=(4, 6))
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(searchbar, textvariable=self.search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=(0, 4))
+        search_entry.bind("<KeyRelease>", self._on_search_key)
+        search_entry.bind("<Escape>", lambda e: (self.search_var.set(""), self._run_search()))
+
+        # Filter & Sortierung (werden als SQL ausgeführt, siehe tasks.TaskQuery)
+        filterbar = ttk.Frame(self)
+        filterbar.pack(fill="x", padx=8, pady=(0, 8))
+        self.status_filter = self._filter_combo(filterbar, "Show:", ["All", "Open", "Completed", "Overdue"], 11)
+        self.category_filter = self._filter_combo(filterbar, "Category:", ["All"], 16)
+        if self.user.get("is_admin"):
+            self.owner_filter = self._filter_combo(filterbar, "Owner:", ["All"], 14)
+        self.sort_filter = self._filter_combo(filterbar, "Sort:", list(SORT_KEYS), 10)
+        self.sort_desc = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filterbar, text="Desc", variable=self.sort_desc,
+                        command=self._on_filter_change).pack(side="left", padx=4)
+        self._load_filter_choices()
+
+        # Virtuelle Liste: nur sichtbare Zeilen, seitenweise aus der DB
+        self.task_list = VirtualTaskList(self, fetch_page=self._fetch_page, count_rows=self._count_rows,
+                                         format_row=self._format_row, sort_key=self._sort_key,
+                                         empty_text="No tasks found.")
+        self.task_list.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        self.listbox = self.task_list.listbox
 
         # Doppelklick öffnet Editor
         self.listbox.bind("<Double-Button-1>", lambda e: self.open_task_editor())
@@ -250,32 +693,169 @@ class TasksFrame(tk.Frame):
     # --- Helpers ---
 
     def refresh(self):
-        self.listbox.delete(0, tk.END)
-        rows = get_tasks(self.user['id'], is_admin=bool(self.user.get('is_admin')))
-        if not rows:
-            self.listbox.insert(tk.END, "No tasks found.")
+        if self.search_query:
+            self._run_search()
+        else:
+            self.task_list.reload()
+
+    def _incremental(self):
+        """Nur in der Standardliste lassen sich Änderungen zeilenweise einpflegen."""
+        return not self.search_query and self.query is None
+
+    def _fetch_page(self, cursor, offset):
+        if self.search_query:
+            # Suchtreffer liegen schon vollständig vor; Cursor = Startindex
+            rows = self._search_rows
+            start = offset if cursor is None else cursor
+            end = start + PAGE_SIZE
+            return rows[start:end], (end if end < len(rows) else None)
+        if self.query is not None:
+            # Gefiltert/sortiert: LIMIT/OFFSET, Cursor = nächster Offset
+            start = offset if cursor is None else cursor
+            rows = self.query.fetch(limit=PAGE_SIZE, offset=start)
+            return rows, (start + PAGE_SIZE if len(rows) == PAGE_SIZE else None)
+        return get_tasks_page(self.user['id'], cursor, PAGE_SIZE, offset=offset,
+                              is_admin=bool(self.user.get('is_admin')))
+
+    def _count_rows(self):
+        if self.search_query:
+            return len(self._search_rows)
+        if self.query is not None:
+            return self.query.count()
+        return count_tasks(self.user['id'], is_admin=bool(self.user.get('is_admin')))
+
+    # --- Filter ---
+
+    def _filter_combo(self, parent, label, values, width):
+        ttk.Label(parent, text=label).pack(side="left", padx=(4, 4))
+        combo = ttk.Combobox(parent, values=values, state="readonly", width=width, style="Dark.TCombobox")
+        combo.set(values[0])
+        combo.pack(side="left", padx=(0, 8))
+        combo.bind("<<ComboboxSelected>>", self._on_filter_change)
+        return combo
+
+    def _load_filter_choices(self):
+        run_in_background(self, get_categories, on_done=self._categories_loaded)
+        if self.user.get("is_admin"):
+            run_in_background(self, load_users, on_done=self._users_loaded)
+
+    def _categories_loaded(self, rows):
+        self._category_ids = {name: cid for (cid, name) in rows}
+        self.category_filter.configure(values=["All", "— none —"] + [name for (_cid, name) in rows])
+
+    def _users_loaded(self, rows):
+        self._owner_ids = {alias: uid for (uid, alias) in rows}
+        self.owner_filter.configure(values=["All"] + [alias for (_uid, alias) in rows])
+
+    def _build_query(self):
+        """TaskQuery aus den Filterfeldern; None, wenn nichts gefiltert/umsortiert ist."""
+        query = TaskQuery(self.user['id'], is_admin=bool(self.user.get('is_admin')))
+        status = self.status_filter.get()
+        if status == "Open":
+            query.open()
+        elif status == "Completed":
+            query.completed()
+        elif status == "Overdue":
+            query.overdue()
+
+        category = self.category_filter.get()
+        if category == "— none —":
+            query.category(None)
+        elif category in self._category_ids:
+            query.category(self._category_ids[category])
+
+        if self.user.get("is_admin") and self.owner_filter.get() in self._owner_ids:
+            query.owner(self._owner_ids[self.owner_filter.get()])
+
+        query.sort(self.sort_filter.get(), descending=self.sort_desc.get())
+        return None if query.is_default() else query
+
+    def _on_filter_change(self, _event=None):
+        self.query = self._build_query()
+        self.task_list.clear_selection()
+        self.task_list.top = 0
+        self.task_list.reload()
+
+    # --- Suche ---
+
+    def _on_search_key(self, _event=None):
+        # Debounce: jeder Tastendruck verschiebt die Suche
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(self.SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_job = None
+        query = self.search_var.get().strip()
+        if not query:
+            if self.search_query:
+                self.search_query, self._search_rows = "", []
+                self.task_list.top = 0
+                self.task_list.reload()
             return
-        for row in rows:
-            # Kompatibel, falls alte Daten ohne owner_alias auftauchen
-            if len(row) >= 8:
-                task_id, title, cat_name, desc, created, completed, due, owner_alias = row
-            else:
-                task_id, title, cat_name, desc, created, completed, due = row
-                owner_alias = None
-
-            status = "✓" if completed == 1 else "•"
-            cat_part = f"[{cat_name}] " if cat_name else ""
-            owner_part = ""
-            # Admin soll alle Owner sehen; optional: immer anzeigen -> entferne die if-Bedingung
-            if owner_alias:
-                if self.user.get("is_admin"):
-                    owner_part = f" — @{owner_alias}"
-                # Falls du es IMMER anzeigen willst, nutze stattdessen:
-                # owner_part = f" — @{owner_alias}"
-
-            due_part = f" | due: {due}" if due else ""
-            self.listbox.insert(tk.END, f"{status} {task_id}: {cat_part}{title}{owner_part}{due_part}")
+        run_in_background(self, search_tasks, query, self.user['id'],
+                          is_admin=bool(self.user.get('is_admin')), limit=self.SEARCH_LIMIT,
+                          on_done=lambda rows: self._search_done(query, rows))
+
+    def _search_done(self, query, rows):
+        if query != self.search_var.get().strip():
+            return  # inzwischen weitergetippt → veraltetes Ergebnis
+        if query != self.search_query:
+            self.task_list.top = 0
+        self.search_query, self._search_rows = query, rows
+        self.task_list.reload()
+
+    @staticmethod
+    def _sort_key(row):
+        # wie ORDER BY completed, COALESCE(due_date, '9999-12-31'), id
+        return (row[5], row[6] or NO_DUE_DATE, row[0])
+
+    def task_created(self, task_id):
+        if not self._incremental():
+            self.refresh()
+            return
+        self.task_list.insert_row(task_id)
 
+    def task_edited(self, task_id, title, description, due_date, completed):
+        """Übernimmt die Änderungen aus dem Editor in die (gecachte) Zeile."""
+        if not self._incremental():
+            self.refresh()  # Treffer/Filter/Sortierung können sich geändert haben
+            return
+        old = self.task_list.row_by_id(task_id)
+        if old is None:
+            self.task_list.invalidate()
+            self.task_list.render()
+            return
+        row = list(old)
+        row[1], row[3], row[5], row[6] = title, description, completed, due_date
+        self.task_list.update_row(tuple(row))
+
+    def _format_row(self, row):
+        # Kompatibel, falls alte Daten ohne owner_alias auftauchen
+        if len(row) >= 8:
+            task_id, title, cat_name, desc, created, completed, due, owner_alias = row[:8]
+        else:
+            task_id, title, cat_name, desc, created, completed, due = row
+            owner_alias = None
+
+        status = "✓" if completed == 1 else "•"
+        cat_part = f"[{cat_name}] " if cat_name else ""
+        owner_part = ""
+        # Admin soll alle Owner sehen; optional: immer anzeigen -> entferne die if-Bedingung
+        if owner_alias:
+            if self.user.get("is_admin"):
+                owner_part = f" — @{owner_alias}"
+            # Falls du es IMMER anzeigen willst, nutze stattdessen:
+            # owner_part = f" — @{owner_alias}"
+
+        due_part = f" | due: {due}" if due else ""
+        # Suchtreffer: Snippet zeigen, wenn der Treffer nicht (nur) im Titel liegt
+        match_part = ""
+        if len(row) >= 9 and row[8]:
+            plain = row[8].replace(HIGHLIGHT[0], "").replace(HIGHLIGHT[1], "")
+            if plain != title:
+                match_part = f"  ⟶ {row[8]}"
+        return f"{status} {task_id}: {cat_part}{title}{owner_part}{due_part}{match_part}"
 
     def open_categories(self):
         CategoryManager(self)
@@ -283,23 +863,24 @@ class TasksFrame(tk.Frame):
     def open_admin(self):
         AdminUsersWindow(self)
 
+    def _selected_task_ids(self):
+        """Alle ausgewählten IDs (Mehrfachauswahl, bleibt auch beim Scrollen erhalten)."""
+        ids = sorted(self.task_list.selected_ids)
+        if not ids:
+            messagebox.showinfo("Hinweis", "Bitte zuerst eine Aufgabe auswählen.")
+        return ids
+
+    def _batch_done(self, _changed):
+        # Viele Zeilen betroffen → Liste neu laden statt Zeile für Zeile anpassen
+        self.task_list.clear_selection()
+        self.refresh()
+
     def _selected_task_id(self):
-        """
-        Liest die aktuell selektierte Zeile und extrahiert die Task-ID aus:
-        '✓ 12: [Cat] Title | due: 2025-11-01'
-        """
-        sel = self.listbox.curselection()
-        if not sel:
+        """ID der ausgewählten Aufgabe (bleibt auch beim Scrollen erhalten)."""
+        tid = self.task_list.selected_id
+        if tid is None:
             messagebox.showinfo("Hinweis", "Bitte zuerst eine Aufgabe auswählen.")
-            return None
-        line = self.listbox.get(sel[0])
-        try:
-            after_status = line.split(" ", 1)[1]
-            id_str = after_status.split(":", 1)[0]
-            return int(id_str.strip())
-        except Exception:
-            messagebox.showerror("Fehler", "Konnte Task-ID nicht erkennen.")
-            return None
+        return tid
 
     # --- Button actions ---
 
@@ -310,24 +891,52 @@ class TasksFrame(tk.Frame):
         TaskEditor(self, self.user, tid)
 
     def complete_selected(self):
-        tid = self._selected_task_id()
-        if tid is None:
+        ids = self._selected_task_ids()
+        if not ids:
             return
         is_admin = bool(self.user.get('is_admin'))
-        complete_task(tid, self.user['id'], is_admin=is_admin)
-        self.refresh()
+        if len(ids) > 1:
+            run_in_background(self, complete_tasks, self.user['id'], ids, is_admin=is_admin,
+                              on_done=self._batch_done)
+            return
+        tid = ids[0]
+        run_in_background(self, complete_task, tid, self.user['id'], is_admin=is_admin,
+                          on_done=lambda changed: self._task_completed(tid, changed))
+
+    def _task_completed(self, tid, changed):
+        if not changed:
+            return
+        if not self._incremental():
+            self.refresh()
+            return
+        old = self.task_list.row_by_id(tid)
+        if old is not None:
+            self.task_list.update_row(old[:5] + (1,) + old[6:])
 
     def delete_selected(self):
-        tid = self._selected_task_id()
-        if tid is None:
+        ids = self._selected_task_ids()
+        if not ids:
+            return
+        is_admin = bool(self.user.get('is_admin'))
+        if len(ids) > 1:
+            if messagebox.askyesno("Delete", f"{len(ids)} Tasks wirklich löschen?"):
+                run_in_background(self, delete_tasks, self.user['id'], ids, is_admin=is_admin,
+                                  on_done=self._batch_done)
             return
+        tid = ids[0]
         if messagebox.askyesno("Delete", "Task wirklich löschen?"):
-            is_admin = bool(self.user.get('is_admin'))
-            delete_task(tid, self.user['id'], is_admin=is_admin)
+            run_in_background(self, delete_task, tid, self.user['id'], is_admin=is_admin,
+                              on_done=lambda changed: changed and self._task_deleted(tid))
+
+    def _task_deleted(self, tid):
+        if not self._incremental():
+            self.task_list.selected_ids.discard(tid)
             self.refresh()
+            return
+        self.task_list.remove_row(tid)
 
     def open_create_dialog(self):
-        CreateTaskDialog(self, self.user, on_created=self.refresh)
+        CreateTaskDialog(self, self.user, on_created=self.task_created)
 
     def do_logout(self):
         logout_user()
@@ -363,8 +972,10 @@ class CategoryManager(tk.Toplevel):
         self.refresh()
 
     def refresh(self):
+        run_in_background(self, get_categories, on_done=self._show_categories)
+
+    def _show_categories(self, rows):
         self.listbox.delete(0, tk.END)
-        rows = get_categories()
         if not rows:
             self.listbox.insert(tk.END, "No categories found.")
             return
@@ -394,12 +1005,12 @@ class CategoryManager(tk.Toplevel):
         desc = simpledialog.askstring("New Category", "Description (optional):")
         if desc is None:
             desc = ""
-        try:
-            add_category(name, desc or "")
-            messagebox.showinfo("Success", f"Category '{name}' created.")
-            self.refresh()
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        run_in_background(self, add_category, name, desc or "",
+                          on_done=lambda _res: self._category_added(name))
+
+    def _category_added(self, name):
+        messagebox.showinfo("Success", f"Category '{name}' created.")
+        self.refresh()
 
     def delete_selected(self):
         cid = self._selected_category_id()
@@ -408,19 +1019,20 @@ class CategoryManager(tk.Toplevel):
             return
         if not messagebox.askyesno("Delete", f"Delete category ID {cid}? (only if unused)"):
             return
-        try:
-            delete_category(cid)
-            self.refresh()
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-            self.refresh()
+        run_in_background(self, delete_category, cid,
+                          on_done=lambda _res: self.refresh(),
+                          on_error=self._delete_failed)
+
+    def _delete_failed(self, exc):
+        messagebox.showerror("Error", str(exc))
+        self.refresh()
 
 
 class AdminUsersWindow(tk.Toplevel):
     def __init__(self, master):
         super().__init__(master)
         self.title("Admin – Users")
-        self.geometry("560x420")
+        self.geometry("760x420")
         self.resizable(False, False)
         self.configure(bg="#121212")
 
@@ -457,14 +1069,18 @@ class AdminUsersWindow(tk.Toplevel):
             messagebox.showerror("Fehler", "Konnte User-ID nicht erkennen.")
             return None
 
+    @staticmethod
+    def _load_users():
+        with connection() as con:
+            rows = con.execute("SELECT id, alias, is_admin, locked, failed_attempts FROM users ORDER BY id").fetchall()
+        return rows, get_all_user_counts()
+
     def refresh(self):
-        self.listbox.delete(0, tk.END)
-        con = get_conn()
-        cur = con.cursor()
-        cur.execute("SELECT id, alias, is_admin, locked, failed_attempts FROM users ORDER BY id")
-        rows = cur.fetchall()
-        con.close()
+        run_in_background(self, self._load_users, on_done=self._show_users)
 
+    def _show_users(self, result):
+        rows, counts = result
+        self.listbox.delete(0, tk.END)
         if not rows:
             self.listbox.insert(tk.END, "Keine Benutzer gefunden.")
             return
@@ -472,7 +1088,9 @@ class AdminUsersWindow(tk.Toplevel):
         for (uid, alias, is_admin, locked, fails) in rows:
             role = "ADMIN" if is_admin else "USER"
             lk = "LOCKED" if locked else "OK"
-            self.listbox.insert(tk.END, f"{uid:>3} | {alias:<16} | {role:<5} | {lk:<6} | Fails:{fails}")
+            open_cnt, done_cnt, overdue = counts.get(uid, (0, 0, 0))
+            self.listbox.insert(tk.END, f"{uid:>3} | {alias:<16} | {role:<5} | {lk:<6} | Fails:{fails}"
+                                        f" | {open_cnt} open, {done_cnt} done, {overdue} overdue")
 
     # --- Actions ---
 
@@ -480,13 +1098,11 @@ class AdminUsersWindow(tk.Toplevel):
         uid = self._selected_user_id()
         if uid is None:
             return
-        con = get_conn()
-        cur = con.cursor()
-        cur.execute("UPDATE users SET locked=0, failed_attempts=0 WHERE id=?", (uid,))
-        con.commit()
-        con.close()
-        messagebox.showinfo("OK", "User entsperrt.")
-        self.refresh()
+        def unlock():
+            with connection() as con:
+                con.execute("UPDATE users SET locked=0, failed_attempts=0 WHERE id=?", (uid,))
+
+        run_in_background(self, unlock, on_done=lambda _res: self._done("User entsperrt."))
 
     def reset_pw_selected(self):
         uid = self._selected_user_id()
@@ -495,31 +1111,40 @@ class AdminUsersWindow(tk.Toplevel):
         new_pw = simpledialog.askstring("Reset Password", "Neues Passwort:", show="*")
         if new_pw is None or new_pw.strip() == "":
             return
-        con = get_conn()
-        cur = con.cursor()
-        cur.execute("UPDATE users SET password_hash=? WHERE id=?", (hash_pw(new_pw.strip()), uid))
-        con.commit()
-        con.close()
-        messagebox.showinfo("OK", "Passwort aktualisiert.")
-        self.refresh()
+        def save_pw(pw_hash):
+            with connection() as con:
+                con.execute("UPDATE users SET password_hash=? WHERE id=?", (pw_hash, uid))
+            revoke_user_sessions(uid)
+
+        # Hashen (bcrypt) im Prozess-Pool, außerhalb der Transaktion
+        run_future(self, submit_hash(new_pw.strip()),
+                   on_done=lambda pw_hash: run_in_background(
+                       self, save_pw, pw_hash, on_done=lambda _res: self._done("Passwort aktualisiert.")))
 
     def toggle_admin_selected(self):
         uid = self._selected_user_id()
         if uid is None:
             return
-        con = get_conn()
-        cur = con.cursor()
-        cur.execute("SELECT is_admin FROM users WHERE id=?", (uid,))
-        row = cur.fetchone()
-        if not row:
-            con.close()
+        def toggle():
+            with connection() as con:
+                row = con.execute("SELECT is_admin FROM users WHERE id=?", (uid,)).fetchone()
+                if not row:
+                    return None
+                new_flag = 0 if int(row[0]) == 1 else 1
+                con.execute("UPDATE users SET is_admin=? WHERE id=?", (new_flag, uid))
+            forget_cached_user(uid)
+            return new_flag
+
+        run_in_background(self, toggle, on_done=self._admin_toggled)
+
+    def _admin_toggled(self, new_flag):
+        if new_flag is None:
             messagebox.showerror("Fehler", "User nicht gefunden.")
             return
-        new_flag = 0 if int(row[0]) == 1 else 1
-        cur.execute("UPDATE users SET is_admin=? WHERE id=?", (new_flag, uid))
-        con.commit()
-        con.close()
-        messagebox.showinfo("OK", f"Admin-Recht {'gesetzt' if new_flag else 'entfernt'}.")
+        self._done(f"Admin-Recht {'gesetzt' if new_flag else 'entfernt'}.")
+
+    def _done(self, message):
+        messagebox.showinfo("OK", message)
         self.refresh()
 
 
@@ -536,23 +1161,10 @@ class CreateTaskDialog(tk.Toplevel):
         self.grid_columnconfigure(0, weight=0)
         self.grid_columnconfigure(1, weight=1)
 
-        # --- Admin: Owner-Auswahl laden ---
+        # --- Admin: Owner-Auswahl (wird im Hintergrund geladen) ---
         self.is_admin = bool(self.user.get("is_admin"))
         self.owner_choices = []   # [(alias, id)]
         self.owner_var = tk.StringVar()
-        if self.is_admin:
-            try:
-                con = get_conn()
-                cur = con.cursor()
-                cur.execute("SELECT id, alias FROM users ORDER BY alias COLLATE NOCASE")
-                rows = cur.fetchall()
-            finally:
-                con.close()
-            self.owner_choices = [(alias, uid) for (uid, alias) in rows]
-            # Default: aktueller User vorauswählen (falls vorhanden), sonst erster Eintrag
-            default_alias = self.user.get("alias")
-            default_alias = default_alias if any(a == default_alias for a, _ in self.owner_choices) else (self.owner_choices[0][0] if self.owner_choices else "")
-            self.owner_var.set(default_alias)
 
         # Title
         ttk.Label(self, text="Title *").grid(row=0, column=0, sticky="w", padx=10, pady=(12, 6))
@@ -573,19 +1185,19 @@ class CreateTaskDialog(tk.Toplevel):
 
         row_idx = 2
 
-        # Admin: Owner-Auswahl anzeigen
-        if self.is_admin and self.owner_choices:
+        # Admin: Owner-Auswahl anzeigen (Werte folgen nach dem Laden)
+        if self.is_admin:
             ttk.Label(self, text="Owner").grid(row=row_idx, column=0, sticky="w", padx=10, pady=6)
-            self.owner_combo = ttk.Combobox(self, values=[a for a, _ in self.owner_choices],
+            self.owner_combo = ttk.Combobox(self, values=[],
                                             textvariable=self.owner_var, state="readonly",
                                             width=42, style="Dark.TCombobox")
             self.owner_combo.grid(row=row_idx, column=1, sticky="w", padx=10, pady=6)
             row_idx += 1
+            run_in_background(self, load_users, on_done=self._owners_loaded)
 
         # Category
         ttk.Label(self, text="Category").grid(row=row_idx, column=0, sticky="w", padx=10, pady=6)
-        cats = get_categories()  # [(id, name)]
-        self.cat_choices = [("— none —", None)] + [(name, cid) for (cid, name) in cats]
+        self.cat_choices = [("— none —", None)]
         names_only = [name for (name, _cid) in self.cat_choices]
         self.cat_var = tk.StringVar(value=names_only[0])
         self.cat_combo = ttk.Combobox(self, values=names_only,
@@ -594,6 +1206,7 @@ class CreateTaskDialog(tk.Toplevel):
                                       style="Dark.TCombobox")
         self.cat_combo.grid(row=row_idx, column=1, sticky="w", padx=10, pady=6)
         row_idx += 1
+        run_in_background(self, get_categories, on_done=self._categories_loaded)
 
         # New category (optional)
         ttk.Label(self, text="New category (optional)").grid(row=row_idx, column=0, sticky="w", padx=10, pady=6)
@@ -619,11 +1232,25 @@ class CreateTaskDialog(tk.Toplevel):
         btns = ttk.Frame(self)
         btns.grid(row=row_idx, column=0, columnspan=2, pady=12, padx=10, sticky="e")
         ttk.Button(btns, text="Cancel", command=self.destroy).pack(side="right", padx=6)
-        ttk.Button(btns, text="Create", style="Primary.TButton", command=self._create).pack(side="right", padx=6)
+        self.create_btn = ttk.Button(btns, text="Create", style="Primary.TButton", command=self._create)
+        self.create_btn.pack(side="right", padx=6)
 
         # Description-Feld darf wachsen
         self.grid_rowconfigure(1, weight=1)
 
+    def _owners_loaded(self, rows):
+        self.owner_choices = [(alias, uid) for (uid, alias) in rows]
+        self.owner_combo.configure(values=[a for a, _ in self.owner_choices])
+        # Default: aktueller User vorauswählen (falls vorhanden), sonst erster Eintrag
+        default_alias = self.user.get("alias")
+        default_alias = default_alias if any(a == default_alias for a, _ in self.owner_choices) else (self.owner_choices[0][0] if self.owner_choices else "")
+        self.owner_var.set(default_alias)
+
+    def _categories_loaded(self, cats):
+        # cats: [(id, name)]; Auswahl bleibt erhalten, falls schon getroffen
+        self.cat_choices = [("— none —", None)] + [(name, cid) for (cid, name) in cats]
+        self.cat_combo.configure(values=[name for (name, _cid) in self.cat_choices])
+
     def _validate_date(self, val):
         if not val:
             return None
@@ -661,10 +1288,7 @@ class CreateTaskDialog(tk.Toplevel):
 
         # Kategorie: Dropdown oder neues Feld
         new_cat_name = (self.new_cat_var.get() or "").strip()
-        if new_cat_name:
-            category_id = get_or_create_category(new_cat_name)
-        else:
-            category_id = self._selected_category_id()
+        category_id = self._selected_category_id()
 
         due = self._validate_date((self.due_var.get() or "").strip())
         if due == "INVALID":
@@ -674,22 +1298,32 @@ class CreateTaskDialog(tk.Toplevel):
         completed = 0
         owner_user_id = self._owner_user_id()
 
-        try:
-            create_task(
-                title=title,
-                category_id=category_id,
-                description=description,
-                creation_date=creation_date,
-                completed=completed,
-                due_date=due,
-                user_id=owner_user_id
-            )
-            owner_hint = f" for @{self.owner_var.get()}" if self.is_admin else ""
-            messagebox.showinfo("Success", f"Task created{owner_hint}.")
-            self.on_created()
-            self.destroy()
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        def create():
+            # Neue Kategorie und Aufgabe in einer Transaktion anlegen
+            with connection():
+                cat_id = get_or_create_category(new_cat_name) if new_cat_name else category_id
+                return create_task(
+                    title=title,
+                    category_id=cat_id,
+                    description=description,
+                    creation_date=creation_date,
+                    completed=completed,
+                    due_date=due,
+                    user_id=owner_user_id
+                )
+
+        self.create_btn.state(["disabled"])
+        run_in_background(self, create, on_done=self._created, on_error=self._create_failed)
+
+    def _created(self, task_id):
+        owner_hint = f" for @{self.owner_var.get()}" if self.is_admin else ""
+        messagebox.showinfo("Success", f"Task created{owner_hint}.")
+        self.on_created(task_id)
+        self.destroy()
+
+    def _create_failed(self, exc):
+        self.create_btn.state(["!disabled"])
+        messagebox.showerror("Error", str(exc))
 
 
 
@@ -704,10 +1338,14 @@ class TaskEditor(tk.Toplevel):
         self.resizable(False, False)
         self.configure(bg="#121212")
 
-        # === Daten laden (Admin darf alle sehen) ===
-        rows = get_tasks(user['id'], is_admin=bool(user.get('is_admin')))
-        task = next((r for r in rows if r[0] == task_id), None)
+        # === Daten im Hintergrund laden (Admin darf alle sehen) ===
+        self.loading_label = ttk.Label(self, text="Loading…")
+        self.loading_label.pack(padx=8, pady=20)
+        run_in_background(self, get_task, task_id, user['id'],
+                          is_admin=bool(user.get('is_admin')), on_done=self._build)
 
+    def _build(self, task):
+        self.loading_label.destroy()
         if task is None:
             messagebox.showerror("Error", "Task not found.")
             self.destroy()
@@ -720,6 +1358,7 @@ class TaskEditor(tk.Toplevel):
             (_id, title, cat, desc, created, completed, due) = task
 
         self.initial_completed = int(completed)
+        self.initial_due = due
 
         # === UI Felder ===
         ttk.Label(self, text="Title:").pack(anchor="w", padx=8, pady=(10, 0))
@@ -744,7 +1383,8 @@ class TaskEditor(tk.Toplevel):
         # Buttons
         btn_bar = ttk.Frame(self)
         btn_bar.pack(fill="x", padx=8, pady=10)
-        ttk.Button(btn_bar, text="Save", style="Primary.TButton", command=self.save).pack(side="right", padx=8)
+        self.save_btn = ttk.Button(btn_bar, text="Save", style="Primary.TButton", command=self.save)
+        self.save_btn.pack(side="right", padx=8)
         ttk.Button(btn_bar, text="Cancel", command=self.destroy).pack(side="right", padx=8)
 
     def save(self):
@@ -759,23 +1399,39 @@ class TaskEditor(tk.Toplevel):
         new_completed = int(self.completed_var.get())
         is_admin = bool(self.user.get('is_admin'))
 
-        try:
-            update_task(
-                self.task_id,
-                self.user['id'],
-                title=new_title,
-                description=new_desc,
-                due_date=new_due,
-                is_admin=is_admin
-            )
-            if self.initial_completed == 0 and new_completed == 1:
-                complete_task(self.task_id, self.user['id'], is_admin=is_admin)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        def save():
+            with connection():
+                if not update_task(
+                    self.task_id,
+                    self.user['id'],
+                    title=new_title,
+                    description=new_desc,
+                    due_date=new_due,
+                    is_admin=is_admin
+                ):
+                    return False
+                if self.initial_completed == 0 and new_completed == 1:
+                    complete_task(self.task_id, self.user['id'], is_admin=is_admin)
+            return True
+
+        self.save_btn.state(["disabled"])
+        run_in_background(self, save,
+                          on_done=lambda ok: self._saved(ok, new_title, new_desc, new_due, new_completed),
+                          on_error=self._save_failed)
+
+    def _save_failed(self, exc):
+        self.save_btn.state(["!disabled"])
+        messagebox.showerror("Error", str(exc))
+
+    def _saved(self, ok, new_title, new_desc, new_due, new_completed):
+        if not ok:
+            self.save_btn.state(["!disabled"])
+            messagebox.showerror("Error", "Task could not be updated.")
             return
 
         messagebox.showinfo("Saved", "Task updated.")
-        self.master.refresh()
+        completed = 1 if new_completed == 1 else self.initial_completed
+        self.master.task_edited(self.task_id, new_title, new_desc, new_due or self.initial_due, completed)
         self.destroy()
 
 
@@ -0,0 +1,75 @@
+"""
+Bulk-Import von Aufgaben aus CSV oder JSON Lines.
+
+Aufruf:  python importer.py --user ALIAS [--format csv|jsonl] [--chunk N]
+                            [--rejects DATEI] [--db PFAD] DATEI
+- DATEI '-' liest von stdin.
+- Ungültige Zeilen landen (mit Zeilennummer und Fehler) als JSON Lines in
+  der Reject-Datei, der Rest wird blockweise importiert.
+"""
+import json
+import sys
+import time
+from db import connection, init_db, DB_PATH
+from tasks import import_tasks, read_import_file, IMPORT_CHUNK
+
+
+def resolve_user(alias_or_id, db_path=DB_PATH):
+    """User-ID zu einem Alias (oder einer numerischen ID); None, wenn unbekannt."""
+    with connection(db_path) as con:
+        row = con.execute("SELECT id FROM users WHERE alias = ?", (alias_or_id,)).fetchone()
+        if row is None and str(alias_or_id).isdigit():
+            row = con.execute("SELECT id FROM users WHERE id = ?", (int(alias_or_id),)).fetchone()
+    return row[0] if row else None
+
+
+def main(argv=None):
+    # Lokaler Import: main.py/exporter.py brauchen nur resolve_user
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import tasks from CSV or JSON Lines.")
+    parser.add_argument("file", help="input file ('-' = stdin)")
+    parser.add_argument("--user", required=True, help="alias or id of the task owner")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--chunk", type=int, default=IMPORT_CHUNK, help="rows per transaction")
+    parser.add_argument("--rejects", help="write rejected rows to this file (JSON Lines)")
+    parser.add_argument("--db", default=DB_PATH, help="database path")
+    args = parser.parse_args(argv)
+
+    init_db(args.db)
+    user_id = resolve_user(args.user, args.db)
+    if user_id is None:
+        print(f"User '{args.user}' not found.")
+        return 1
+
+    reject_file = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+    started = time.perf_counter()
+
+    def on_reject(line_no, record, error):
+        if reject_file:
+            reject_file.write(json.dumps({"line": line_no, "error": error, "record": record},
+                                         ensure_ascii=False) + "\n")
+        else:
+            print(f"Line {line_no}: {error}", file=sys.stderr)
+
+    def progress(imported, rejected):
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        print(f"\r{imported} imported, {rejected} rejected ({rate:,.0f} rows/s)", end="", flush=True)
+
+    try:
+        imported, rejected = import_tasks(
+            read_import_file(args.file, args.format), user_id, db_path=args.db,
+            chunk_size=args.chunk, on_reject=on_reject, progress=progress,
+        )
+    finally:
+        if reject_file:
+            reject_file.close()
+
+    print(f"\nDone: {imported} tasks imported, {rejected} rejected"
+          f"{f' (see {args.rejects})' if rejected and args.rejects else ''}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
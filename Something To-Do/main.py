@@ -1,11 +1,133 @@
+import sys
 from datetime import datetime
 from db import init_db
-from auth import login_user, register_user, get_logged_in_user, logout_user
+from auth import login_user, register_user, get_logged_in_user, logout_user, login_with_token
 from admin import admin_handle_choice
-from tasks import create_task, list_tasks, delete_task, complete_task, update_task
+from tasks import (create_task, list_tasks, delete_task, complete_task, update_task, PAGE_SIZE,
+                   complete_tasks, delete_tasks, update_tasks, search_tasks, TaskQuery, SORT_KEYS)
+from importer import resolve_user
 from categories import add_category, get_or_create_category, list_categories
 from profile import profile_menu
-from utils import input_nonempty, input_date_or_empty, is_back
+from utils import input_nonempty, input_date_or_empty, is_back, parse_id_list
+
+
+def _batch_selection():
+    """Fragt IDs oder Filter ab → (ids, filters) oder None bei 'zurück'."""
+    mode = input("Select by 1) ID list  2) Filter (0 = back): ").strip()
+    if mode == "1":
+        raw = input("Task IDs, e.g. 1,4,7-9 (0 = back): ").strip()
+        if is_back(raw):
+            return None
+        try:
+            ids = parse_id_list(raw)
+        except ValueError:
+            print("Invalid ID list.")
+            return None
+        if not ids:
+            print("No IDs given.")
+            return None
+        return ids, {}
+    if mode == "2":
+        filters = {}
+        category = input("Category name (empty = any): ").strip()
+        if category:
+            filters["category"] = category
+        due_before = input_date_or_empty("Due before")
+        if due_before == "BACK":
+            return None
+        if due_before:
+            filters["due_before"] = due_before
+        if input("Only open tasks? (y/n): ").strip().lower() == "y":
+            filters["completed"] = 0
+        if not filters:
+            print("Please set at least one filter.")
+            return None
+        return None, filters
+    return None
+
+
+def _ask_task_query(user, is_admin):
+    """Fragt Filter und Sortierung ab → TaskQuery oder None bei 'zurück'."""
+    query = TaskQuery(user['id'], is_admin=is_admin)
+
+    status = input("Show 1) all  2) open  3) completed  4) overdue (0 = back): ").strip()
+    if is_back(status):
+        return None
+    if status == "2":
+        query.open()
+    elif status == "3":
+        query.completed()
+    elif status == "4":
+        query.overdue()
+
+    category = input("Category name (empty = any): ").strip()
+    if category:
+        query.category(category)
+
+    if is_admin:
+        owner = input("Owner alias (empty = all): ").strip()
+        if owner:
+            owner_id = resolve_user(owner)
+            if owner_id is None:
+                print(f"User '{owner}' not found.")
+                return None
+            query.owner(owner_id)
+
+    due_from = input_date_or_empty("Due from")
+    if due_from == "BACK":
+        return None
+    due_to = input_date_or_empty("Due until")
+    if due_to == "BACK":
+        return None
+    if due_from or due_to:
+        query.due_between(due_from, due_to)
+
+    sort = input(f"Sort by ({', '.join(SORT_KEYS)}; empty = default): ").strip().lower() or "default"
+    if sort not in SORT_KEYS:
+        print("Unknown sort key, using default.")
+        sort = "default"
+    descending = input("Descending? (y/n): ").strip().lower() == "y"
+    return query.sort(sort, descending)
+
+
+def batch_menu(user, is_admin):
+    print("\n--- Batch actions ---")
+    print("1) Complete tasks")
+    print("2) Delete tasks")
+    print("3) Update tasks (category / due date)")
+    action = input("Choice (0 = back): ").strip()
+    if action not in ("1", "2", "3"):
+        return
+
+    selection = _batch_selection()
+    if selection is None:
+        return
+    ids, filters = selection
+
+    try:
+        if action == "1":
+            complete_tasks(user['id'], ids, is_admin=is_admin, **filters)
+        elif action == "2":
+            if input("Really delete the selected tasks? (y/n): ").strip().lower() == "y":
+                delete_tasks(user['id'], ids, is_admin=is_admin, **filters)
+        else:
+            new_category_name = input("New category name (empty = unchanged): ").strip()
+            new_category = get_or_create_category(new_category_name) if new_category_name else None
+            new_due_date = input_date_or_empty("New due date")
+            if new_due_date == "BACK":
+                return
+            update_tasks(user['id'], ids, category_id=new_category, due_date=new_due_date,
+                         is_admin=is_admin, **filters)
+    except ValueError as e:
+        print("Error:", e)
+
+
+def _list_page_size():
+    """
+    Seitenweise nur im Terminal; ist stdout umgeleitet (Datei, Pipe), wird die Liste
+    gestreamt – sonst würden die Blätter-Abfragen Zeilen aus einem Eingabe-Skript lesen.
+    """
+    return PAGE_SIZE if sys.stdout.isatty() else None
 
 
 def main_menu():
@@ -26,6 +148,9 @@ def main_menu():
         print("9) Logout")
         print("10) Register new user")
         print("11) Profile")
+        print("12) Batch actions (complete / delete / update many)")
+        print("13) Search tasks")
+        print("14) Show tasks (filter / sort)")
 
         # Admin-Menü (nur sichtbar für Admins)
         if user and user.get('is_admin'):
@@ -33,13 +158,14 @@ def main_menu():
             print("A) Show user list")
             print("B) Unlock account")
             print("C) Reset user password")
+            print("D) Provision users from file")
 
         print("0) Exit")
 
         choice = input("Choice: ").strip()
 
-        # Aktionen 1–5 und 11 nur mit Login
-        if choice in ["1", "2", "3", "4", "5", "11"] and not user:
+        # Aktionen 1–5 und 11–14 nur mit Login
+        if choice in ["1", "2", "3", "4", "5", "11", "12", "13", "14"] and not user:
             print("Please login first!\n")
             continue
 
@@ -80,7 +206,7 @@ def main_menu():
 
         elif choice == "2":
             # Show tasks (Admin sieht alle)
-            list_tasks(user['id'], is_admin=is_admin)
+            list_tasks(user['id'], is_admin=is_admin, page_size=_list_page_size())
 
         elif choice == "3":
             # Mark completed
@@ -182,8 +308,38 @@ def main_menu():
             profile_menu()
             continue
 
-        # Admin actions (A/B/C)
-        elif (user := get_logged_in_user()) and user.get('is_admin') and choice.upper() in ("A", "B", "C"):
+        elif choice == "12":
+            # Batch-Aktionen (IDs oder Filter, eine Transaktion)
+            batch_menu(user, is_admin)
+
+        elif choice == "13":
+            # Volltextsuche über Titel und Beschreibung
+            query = input("Search (0 = back): ").strip()
+            if is_back(query) or query == "":
+                continue
+            rows = search_tasks(query, user['id'], is_admin=is_admin)
+            if not rows:
+                print("No matching tasks.\n")
+                continue
+            print(f"\n=== Search: {query} ===")
+            for (task_id, title, cat_name, _desc, _created, completed, due, owner, snippet) in rows:
+                status = "✓" if completed == 1 else "•"
+                cat_part = f"[{cat_name}] " if cat_name else ""
+                owner_part = f" — @{owner}" if is_admin and owner else ""
+                due_part = f" | due: {due}" if due else ""
+                print(f"{status} {task_id}: {cat_part}{title}{owner_part}{due_part}")
+                print(f"    {snippet}")
+            print()
+
+        elif choice == "14":
+            # Gefilterte/sortierte Liste (SQL über TaskQuery)
+            query = _ask_task_query(user, is_admin)
+            if query is None:
+                continue
+            list_tasks(user['id'], is_admin=is_admin, page_size=_list_page_size(), query=query)
+
+        # Admin actions (A–D)
+        elif (user := get_logged_in_user()) and user.get('is_admin') and choice.upper() in ("A", "B", "C", "D"):
             admin_handle_choice(choice)
             continue
 
@@ -197,4 +353,7 @@ def main_menu():
 
 if __name__ == "__main__":
     init_db()
+    # Gemerkte Sitzung ("Stay signed in") → ohne Passwort weiter
+    if (user := login_with_token()):
+        print(f"Welcome back, {user['alias']}!")
     main_menu()
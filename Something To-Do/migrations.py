@@ -0,0 +1,485 @@
+"""
+Versionierte Schema-Migrationen für todo.db (über PRAGMA user_version).
+
+Aufruf:  python migrations.py [--dry-run] [pfad-zur-db]
+- Jeder Schritt läuft in einer eigenen Transaktion zusammen mit dem
+  Hochsetzen von user_version (Abbruch = Rollback, Version bleibt).
+- Schritte mit `backfill` füllen große Tabellen blockweise über den rowid-Bereich
+  nach, jeder Block in einer eigenen kurzen Transaktion; andere Sitzungen werden
+  so nur kurz blockiert. Der Fortschritt steht in migration_backfill, ein
+  abgebrochener Lauf setzt beim nächsten Block fort. Die Trigger des Schritts
+  greifen bis zum Abschluss nur für bereits nachgefüllte Zeilen.
+- --dry-run zeigt ausstehende Schritte mit geschätzter Zeilenzahl.
+"""
+import os
+import sqlite3
+import sys
+from db import connection, DB_PATH
+
+# Zeilen pro Block beim Nachfüllen großer Tabellen
+BATCH_SIZE = int(os.getenv("TODO_MIGRATION_BATCH", "5000"))
+
+MIGRATIONS = []
+
+
+class Migration:
+    def __init__(self, version, description, apply, estimate=None, triggers=(), backfill=None,
+                 finish=None, table="task"):
+        self.version = version
+        self.description = description
+        self.apply = apply
+        self.estimate = estimate
+        self.triggers = triggers
+        self.backfill = backfill
+        self.finish = finish
+        self.table = table
+
+
+def migration(version, description, estimate=None, triggers=(), backfill=None, finish=None, table="task"):
+    """
+    Dekorator: registriert eine Funktion apply(con) als Migrationsschritt.
+    - triggers: [(name, ereignis, rumpf)], z.B. ("t_ai", "AFTER INSERT ON task", "...;")
+    - backfill(con, lo, hi): füllt die Zeilen lo..hi (rowid von `table`) nach
+    - finish(con): läuft nach dem Nachfüllen in der abschließenden Transaktion
+    Liefert apply False (z.B. SQLite ohne FTS5), werden Trigger und Nachfüllen übersprungen.
+    """
+    def register(fn):
+        if any(m.version == version for m in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}.")
+        MIGRATIONS.append(Migration(version, description, fn, estimate, triggers, backfill, finish, table))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+
+# ----------------------------
+# Helfer
+# ----------------------------
+def get_schema_version(con):
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def latest_version():
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def table_exists(con, table):
+    row = con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+
+def column_exists(con, table, column):
+    return any(row[1] == column for row in con.execute(f"PRAGMA table_info({table})"))
+
+
+def estimate_rows(con, table):
+    """Schnelle Schätzung über den rowid-Bereich (ohne Full-Scan wie COUNT(*))."""
+    if not table_exists(con, table):
+        return 0
+    lo, hi = con.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+    return 0 if lo is None else hi - lo + 1
+
+
+def create_triggers(con, triggers, backfill_version=None):
+    """
+    Legt Trigger [(name, ereignis, rumpf)] an. Mit backfill_version greifen sie nur für
+    Zeilen, die das Nachfüllen schon erfasst hat (rowid <= done_id); neuere erfasst der nächste Block.
+    """
+    for name, event, body in triggers:
+        guard = ""
+        if backfill_version is not None:
+            row = "new" if "INSERT" in event.split() else "old"
+            guard = (f"WHEN {row}.rowid <= "
+                     f"(SELECT done_id FROM migration_backfill WHERE version = {int(backfill_version)})")
+        con.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} {guard} BEGIN {body} END;")
+
+
+def drop_triggers(con, triggers):
+    for name, _event, _body in triggers:
+        con.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+# ----------------------------
+# Migrationsschritte (nur anhängen, nie bestehende ändern!)
+# ----------------------------
+@migration(1, "Base tables users, category, task")
+def _m001_base_tables(con):
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alias TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            is_admin INTEGER NOT NULL DEFAULT 0,
+            locked INTEGER NOT NULL DEFAULT 0,
+            failed_attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS category (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        );
+    """)
+
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS task (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            creation_date DATE NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            due_date DATE,
+            category_id INTEGER,
+            user_id INTEGER NOT NULL,
+            FOREIGN KEY (category_id) REFERENCES category(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+    """)
+
+
+@migration(2, "Column category.description")
+def _m002_category_description(con):
+    # Ältere Datenbanken haben die Spalte bereits (add_category nutzt sie)
+    if not column_exists(con, "category", "description"):
+        con.execute("ALTER TABLE category ADD COLUMN description TEXT")
+
+
+@migration(3, "Indexes for task lists and category counts",
+           estimate=lambda con: estimate_rows(con, "task"))
+def _m003_task_indexes(con):
+    # Filter user_id, Sortierung completed, COALESCE(due_date, ...), id
+    con.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_user_order
+        ON task (user_id, completed, COALESCE(due_date, '9999-12-31'));
+    """)
+
+    con.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_order
+        ON task (completed, COALESCE(due_date, '9999-12-31'));
+    """)
+
+    con.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_category
+        ON task (category_id);
+    """)
+
+
+_FTS_TRIGGERS = [
+    ("task_fts_ai", "AFTER INSERT ON task", """
+        INSERT INTO task_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    """),
+    ("task_fts_ad", "AFTER DELETE ON task", """
+        INSERT INTO task_fts (task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    """),
+    # Nur bei Änderung der Texte (nicht z.B. beim Erledigen)
+    ("task_fts_au", "AFTER UPDATE OF title, description ON task", """
+        INSERT INTO task_fts (task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    """),
+]
+
+
+def _m004_backfill(con, lo, hi):
+    # Bestehende Tasks indexieren
+    con.execute("""
+        INSERT INTO task_fts (rowid, title, description)
+        SELECT id, title, description FROM task WHERE id BETWEEN ? AND ?
+    """, (lo, hi))
+
+
+@migration(4, "Full-text search table task_fts with sync triggers",
+           estimate=lambda con: estimate_rows(con, "task"), triggers=_FTS_TRIGGERS, backfill=_m004_backfill)
+def _m004_task_fts(con):
+    # External-Content-Tabelle: speichert nur den Index, Texte bleiben in task
+    try:
+        con.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+                title, description,
+                content='task', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite ohne FTS5: search_tasks fällt auf LIKE zurück
+        print(f"Full-text search not available ({e}).")
+        return False
+
+
+_COUNTER_ADD_NEW = """
+    INSERT INTO task_counter (user_id, category_id, open_cnt, done_cnt)
+    VALUES (new.user_id, COALESCE(new.category_id, 0), new.completed = 0, new.completed <> 0)
+    ON CONFLICT (user_id, category_id) DO UPDATE
+        SET open_cnt = open_cnt + excluded.open_cnt,
+            done_cnt = done_cnt + excluded.done_cnt;
+"""
+
+_DUE_COUNTER_ADD_NEW = """
+    INSERT INTO task_due_counter (user_id, due_date, open_cnt)
+    SELECT new.user_id, new.due_date, 1
+    WHERE new.completed = 0 AND new.due_date IS NOT NULL
+    ON CONFLICT (user_id, due_date) DO UPDATE SET open_cnt = open_cnt + 1;
+"""
+
+_COUNTER_REMOVE_OLD = """
+    UPDATE task_counter
+        SET open_cnt = open_cnt - (old.completed = 0),
+            done_cnt = done_cnt - (old.completed <> 0)
+        WHERE user_id = old.user_id AND category_id = COALESCE(old.category_id, 0);
+"""
+
+_DUE_COUNTER_REMOVE_OLD = """
+    UPDATE task_due_counter
+        SET open_cnt = open_cnt - 1
+        WHERE old.completed = 0 AND user_id = old.user_id AND due_date = old.due_date;
+    DELETE FROM task_due_counter
+        WHERE user_id = old.user_id AND due_date = old.due_date AND open_cnt <= 0;
+"""
+
+_COUNTER_TRIGGERS = [
+    ("task_counter_ai", "AFTER INSERT ON task", _COUNTER_ADD_NEW + _DUE_COUNTER_ADD_NEW),
+    ("task_counter_ad", "AFTER DELETE ON task", _COUNTER_REMOVE_OLD + _DUE_COUNTER_REMOVE_OLD),
+    # Nur wenn sich zählrelevante Spalten ändern (nicht bei Titel/Beschreibung)
+    ("task_counter_au", "AFTER UPDATE OF completed, category_id, user_id, due_date ON task",
+     _COUNTER_REMOVE_OLD + _DUE_COUNTER_REMOVE_OLD + _COUNTER_ADD_NEW + _DUE_COUNTER_ADD_NEW),
+]
+
+
+def _m005_backfill(con, lo, hi):
+    # Eigene SQL statt counters.py: der Schritt muss zum Schema von Version 5 passen
+    con.execute("""
+        INSERT INTO task_counter (user_id, category_id, open_cnt, done_cnt)
+        SELECT user_id, COALESCE(category_id, 0), SUM(completed = 0), SUM(completed <> 0)
+        FROM task
+        WHERE id BETWEEN ? AND ?
+        GROUP BY user_id, COALESCE(category_id, 0)
+        ON CONFLICT (user_id, category_id) DO UPDATE
+            SET open_cnt = open_cnt + excluded.open_cnt,
+                done_cnt = done_cnt + excluded.done_cnt
+    """, (lo, hi))
+    con.execute("""
+        INSERT INTO task_due_counter (user_id, due_date, open_cnt)
+        SELECT user_id, due_date, COUNT(*)
+        FROM task
+        WHERE id BETWEEN ? AND ? AND completed = 0 AND due_date IS NOT NULL
+        GROUP BY user_id, due_date
+        ON CONFLICT (user_id, due_date) DO UPDATE SET open_cnt = open_cnt + excluded.open_cnt
+    """, (lo, hi))
+
+
+@migration(5, "Task counter tables maintained by triggers",
+           estimate=lambda con: estimate_rows(con, "task"), triggers=_COUNTER_TRIGGERS, backfill=_m005_backfill)
+def _m005_task_counters(con):
+    # Offen/erledigt je User und Kategorie (0 = ohne Kategorie)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS task_counter (
+            user_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL DEFAULT 0,
+            open_cnt INTEGER NOT NULL DEFAULT 0,
+            done_cnt INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, category_id)
+        ) WITHOUT ROWID;
+    """)
+
+    # Offene Tasks je User und Fälligkeitstag → "überfällig" = Summe über due_date < heute
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS task_due_counter (
+            user_id INTEGER NOT NULL,
+            due_date TEXT NOT NULL,
+            open_cnt INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, due_date)
+        ) WITHOUT ROWID;
+    """)
+
+
+@migration(6, "Session table for remembered logins")
+def _m006_sessions(con):
+    # Gespeichert wird nur der HMAC des Tokens, nie das Token selbst
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS session (
+            token_hash TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_session_user ON session(user_id);")
+
+
+# task_counter ohne den Teil für task_due_counter (ersetzt durch Migration 7)
+_COUNTER_TRIGGERS_V7 = [
+    ("task_counter_ai", "AFTER INSERT ON task", _COUNTER_ADD_NEW),
+    ("task_counter_ad", "AFTER DELETE ON task", _COUNTER_REMOVE_OLD),
+    ("task_counter_au", "AFTER UPDATE OF completed, category_id, user_id ON task",
+     _COUNTER_REMOVE_OLD + _COUNTER_ADD_NEW),
+]
+
+_CATEGORY_DUE_ADD_NEW = """
+    INSERT INTO task_category_due_counter (user_id, category_id, due_date, open_cnt)
+    SELECT new.user_id, COALESCE(new.category_id, 0), new.due_date, 1
+    WHERE new.completed = 0 AND new.due_date IS NOT NULL
+    ON CONFLICT (user_id, category_id, due_date) DO UPDATE SET open_cnt = open_cnt + 1;
+"""
+
+_CATEGORY_DUE_REMOVE_OLD = """
+    UPDATE task_category_due_counter
+        SET open_cnt = open_cnt - 1
+        WHERE old.completed = 0 AND user_id = old.user_id
+          AND category_id = COALESCE(old.category_id, 0) AND due_date = old.due_date;
+    DELETE FROM task_category_due_counter
+        WHERE user_id = old.user_id AND category_id = COALESCE(old.category_id, 0)
+          AND due_date = old.due_date AND open_cnt <= 0;
+"""
+
+_CATEGORY_DUE_TRIGGERS = [
+    ("task_category_due_ai", "AFTER INSERT ON task", _CATEGORY_DUE_ADD_NEW),
+    ("task_category_due_ad", "AFTER DELETE ON task", _CATEGORY_DUE_REMOVE_OLD),
+    ("task_category_due_au", "AFTER UPDATE OF completed, category_id, user_id, due_date ON task",
+     _CATEGORY_DUE_REMOVE_OLD + _CATEGORY_DUE_ADD_NEW),
+]
+
+
+def _m007_backfill(con, lo, hi):
+    con.execute("""
+        INSERT INTO task_category_due_counter (user_id, category_id, due_date, open_cnt)
+        SELECT user_id, COALESCE(category_id, 0), due_date, COUNT(*)
+        FROM task
+        WHERE id BETWEEN ? AND ? AND completed = 0 AND due_date IS NOT NULL
+        GROUP BY user_id, COALESCE(category_id, 0), due_date
+        ON CONFLICT (user_id, category_id, due_date) DO UPDATE SET open_cnt = open_cnt + excluded.open_cnt
+    """, (lo, hi))
+
+
+def _m007_finish(con):
+    # Bis hierher pflegen die alten Trigger task_due_counter weiter (für laufende ältere Programme)
+    drop_triggers(con, _COUNTER_TRIGGERS)
+    create_triggers(con, _COUNTER_TRIGGERS_V7)
+    con.execute("DROP TABLE IF EXISTS task_due_counter")
+
+
+@migration(7, "Overdue counter per category (replaces task_due_counter)",
+           estimate=lambda con: estimate_rows(con, "task"), triggers=_CATEGORY_DUE_TRIGGERS,
+           backfill=_m007_backfill, finish=_m007_finish)
+def _m007_category_due_counter(con):
+    # Offene Tasks je User, Kategorie und Fälligkeitstag → "überfällig" auch je Kategorie
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS task_category_due_counter (
+            user_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL DEFAULT 0,
+            due_date TEXT NOT NULL,
+            open_cnt INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, category_id, due_date)
+        ) WITHOUT ROWID;
+    """)
+
+
+# ----------------------------
+# Ausführung
+# ----------------------------
+def pending_migrations(con, target=None):
+    current = get_schema_version(con)
+    target = latest_version() if target is None else target
+    return [m for m in MIGRATIONS if current < m.version <= target]
+
+
+def _fill_blocks(con, step):
+    """
+    Füllt blockweise nach (je Block eine Transaktion). Liefert True mit offener
+    Transaktion, sobald alles erfasst ist, False, wenn ein anderer Prozess den
+    Schritt inzwischen abgeschlossen hat.
+    """
+    while True:
+        con.execute("BEGIN IMMEDIATE")
+        if get_schema_version(con) >= step.version:
+            con.rollback()
+            return False
+        done = con.execute("SELECT done_id FROM migration_backfill WHERE version = ?",
+                           (step.version,)).fetchone()[0]
+        last = con.execute(f"SELECT MAX(rowid) FROM {step.table}").fetchone()[0] or 0
+        if done >= last:
+            return True
+        try:
+            step.backfill(con, done + 1, done + BATCH_SIZE)
+            con.execute("UPDATE migration_backfill SET done_id = ? WHERE version = ?",
+                        (done + BATCH_SIZE, step.version))
+        except Exception:
+            con.rollback()
+            raise
+        con.commit()
+
+
+def migrate(db_path=DB_PATH, dry_run=False, target=None):
+    """
+    Bringt die Datenbank auf `target` (Standard: neueste Version).
+    Liefert [(version, beschreibung, geschätzte_zeilen), ...] der ausstehenden
+    bzw. ausgeführten Schritte. dry_run=True ändert nichts.
+    Die Schritte committen selbst; eine offene Transaktion des Aufrufers ist ein Fehler.
+    """
+    report = []
+    with connection(db_path) as con:
+        if con.in_transaction and not dry_run:
+            raise RuntimeError("migrate() cannot run inside an open transaction; commit it first.")
+        for step in pending_migrations(con, target):
+            estimated = step.estimate(con) if step.estimate else 0
+            report.append((step.version, step.description, estimated))
+            if dry_run:
+                continue
+
+            con.execute("BEGIN IMMEDIATE")
+            # Ein anderer Prozess könnte den Schritt inzwischen ausgeführt haben
+            if get_schema_version(con) >= step.version:
+                con.rollback()
+                continue
+            try:
+                applied = step.apply(con) is not False
+                if applied and step.backfill:
+                    # Schema und (eingeschränkte) Trigger sofort committen, dann blockweise nachfüllen
+                    con.execute("""
+                        CREATE TABLE IF NOT EXISTS migration_backfill (
+                            version INTEGER PRIMARY KEY,
+                            done_id INTEGER NOT NULL
+                        )
+                    """)
+                    con.execute("INSERT OR IGNORE INTO migration_backfill (version, done_id) VALUES (?, 0)",
+                                (step.version,))
+                    create_triggers(con, step.triggers, step.version)
+                    con.commit()
+                    if not _fill_blocks(con, step):
+                        continue
+                    drop_triggers(con, step.triggers)
+                    if step.finish:
+                        step.finish(con)
+                    con.execute("DELETE FROM migration_backfill WHERE version = ?", (step.version,))
+                if applied:
+                    create_triggers(con, step.triggers)
+            except Exception:
+                con.rollback()
+                raise
+            con.execute(f"PRAGMA user_version = {int(step.version)}")
+            con.commit()
+    return report
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    dry = "--dry-run" in args
+    args = [a for a in args if a != "--dry-run"]
+    path = args[0] if args else DB_PATH
+
+    with connection(path) as con:
+        current = get_schema_version(con)
+    steps = migrate(path, dry_run=dry)
+
+    print(f"\n=== Migrations ({path}) ===")
+    print(f"Schema version: {current} -> {current if dry or not steps else steps[-1][0]} (latest: {latest_version()})")
+    if not steps:
+        print("Nothing to do.")
+    for version, description, estimated in steps:
+        prefix = "would apply" if dry else "applied"
+        print(f"{prefix} v{version}: {description} (~{estimated} rows)")
+    print()
@@ -0,0 +1,101 @@
+"""
+Passwort-Hashing (bcrypt) an einer Stelle.
+
+- Kostenfaktor über TODO_BCRYPT_ROUNDS (Standard 12 = bcrypt-Default).
+- Einzelne Hashes laufen direkt (in der GUI ohnehin im Worker-Thread).
+- Viele Hashes (z.B. Benutzer-Import) verteilt `hash_many` auf einen
+  Prozess-Pool (TODO_HASH_WORKERS, Standard: Anzahl CPUs), weil bcrypt
+  CPU-gebunden ist. `submit_hash`/`submit_check` liefern Futures.
+- `needs_rehash` erkennt Hashes mit anderem Kostenfaktor; auth.py erneuert
+  sie beim nächsten erfolgreichen Login.
+
+Diese Datei importiert nichts aus dem Projekt (wird von db.py und auth.py genutzt
+und in den Pool-Prozessen geladen). bcrypt und multiprocessing werden erst beim
+ersten Hash bzw. Pool-Start importiert, damit Skript-Aufrufe schnell starten.
+"""
+import atexit
+import os
+import threading
+
+BCRYPT_ROUNDS = int(os.getenv("TODO_BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("TODO_HASH_WORKERS", "0")) or os.cpu_count() or 1
+
+# Darunter lohnt sich der Prozess-Pool nicht (Start der Prozesse)
+_POOL_MIN = 4
+
+
+def hash_pw(plain: str, rounds=None) -> str:
+    import bcrypt
+    rounds = rounds or BCRYPT_ROUNDS
+    return bcrypt.hashpw(plain.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def check_pw(plain: str, hashed: str) -> bool:
+    import bcrypt
+    try:
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def hash_rounds(hashed: str):
+    """Kostenfaktor eines bcrypt-Hashes ('$2b$12$...' → 12); None, wenn unlesbar."""
+    parts = (hashed or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed: str, rounds=None) -> bool:
+    return hash_rounds(hashed) != (rounds or BCRYPT_ROUNDS)
+
+
+# ----------------------------
+# Prozess-Pool
+# ----------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Liefert den (einmalig gestarteten) Prozess-Pool für Hash-Aufträge."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # 'spawn': keine Kopie von GUI-/DB-Threads und offenen Verbindungen
+            _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown_executor)
+
+
+def submit_hash(plain: str, rounds=None):
+    """hash_pw im Prozess-Pool; liefert ein concurrent.futures.Future."""
+    return get_executor().submit(hash_pw, plain, rounds or BCRYPT_ROUNDS)
+
+
+def submit_check(plain: str, hashed: str):
+    """check_pw im Prozess-Pool; liefert ein concurrent.futures.Future."""
+    return get_executor().submit(check_pw, plain, hashed)
+
+
+def hash_many(passwords, rounds=None):
+    """Hasht viele Passwörter parallel; Ergebnis in derselben Reihenfolge."""
+    passwords = list(passwords)
+    rounds = rounds or BCRYPT_ROUNDS
+    if len(passwords) < _POOL_MIN or HASH_WORKERS == 1:
+        return [hash_pw(pw, rounds) for pw in passwords]
+    chunk = max(1, len(passwords) // (HASH_WORKERS * 4))
+    return list(get_executor().map(hash_pw, passwords, [rounds] * len(passwords), chunksize=chunk))
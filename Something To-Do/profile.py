@@ -1,6 +1,8 @@
-from db import get_conn, DB_PATH
+from db import connection, DB_PATH
 from auth import get_logged_in_user, set_logged_in_user, check_pw, hash_pw
 from utils import is_back
+from counters import get_user_counts
+from sessions import forget_cached_user, revoke_user_sessions, clear_remembered_token
 
 def show_my_profile(db_path=DB_PATH):
     user = get_logged_in_user()
@@ -9,34 +11,24 @@ def show_my_profile(db_path=DB_PATH):
         return
     uid = user['id']
 
-    con = get_conn(db_path)
-    cur = con.cursor()
-
-    # User-Info
-    cur.execute("""
-        SELECT alias, is_admin, locked, failed_attempts, created_at
-        FROM users
-        WHERE id = ?
-    """, (uid,))
-    row = cur.fetchone()
-
-    # Task Statistik
-    cur.execute("""
-        SELECT SUM(CASE WHEN completed = 0 THEN 1 ELSE 0 END) AS open_cnt,
-               SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END) AS done_cnt
-        FROM task
-        WHERE user_id = ?
-    """, (uid,))
-    tstats = cur.fetchone()
-    con.close()
+    with connection(db_path) as con:
+        cur = con.cursor()
+
+        # User-Info
+        cur.execute("""
+            SELECT alias, is_admin, locked, failed_attempts, created_at
+            FROM users
+            WHERE id = ?
+        """, (uid,))
+        row = cur.fetchone()
 
     if not row:
         print("User not found.")
         return
 
+    # Task Statistik (aus den per Trigger gepflegten Zählern)
+    stats = get_user_counts(uid, db_path)
     alias, is_admin, locked, fails, created_at = row
-    open_cnt = tstats[0] or 0
-    done_cnt = tstats[1] or 0
 
     print("\n=== My Profile ===")
     print(f"Alias:         {alias}")
@@ -44,7 +36,9 @@ def show_my_profile(db_path=DB_PATH):
     print(f"Locked:        {'Yes' if locked else 'No'}")
     print(f"Failed tries:  {fails}")
     print(f"Created at:    {created_at}")
-    print(f"Tasks:         {open_cnt} open / {done_cnt} done")
+    print(f"Tasks:         {stats['open']} open / {stats['done']} done / {stats['overdue']} overdue")
+    for name, open_cnt, done_cnt, overdue in stats["categories"]:
+        print(f"  {name or '(no category)':<20} {open_cnt} open / {done_cnt} done / {overdue} overdue")
     print()
 
 
@@ -61,18 +55,14 @@ def change_alias(db_path=DB_PATH):
         print("Alias cannot be empty.")
         return
 
-    con = get_conn(db_path)
-    cur = con.cursor()
-    cur.execute("SELECT 1 FROM users WHERE alias = ?", (new_alias,))
-    if cur.fetchone():
-        con.close()
-        print("Alias already exists.")
-        return
+    with connection(db_path) as con:
+        if con.execute("SELECT 1 FROM users WHERE alias = ?", (new_alias,)).fetchone():
+            print("Alias already exists.")
+            return
 
-    cur.execute("UPDATE users SET alias = ? WHERE id = ?", (new_alias, user['id']))
-    con.commit()
-    con.close()
+        con.execute("UPDATE users SET alias = ? WHERE id = ?", (new_alias, user['id']))
 
+    forget_cached_user(user['id'])
     set_logged_in_user({**user, "alias": new_alias})
     print("Alias updated.")
 
@@ -87,33 +77,29 @@ def change_password(db_path=DB_PATH):
     if is_back(current):
         return
 
-    con = get_conn(db_path)
-    cur = con.cursor()
-    cur.execute("SELECT password_hash FROM users WHERE id = ?", (user['id'],))
-    row = cur.fetchone()
+    with connection(db_path) as con:
+        row = con.execute("SELECT password_hash FROM users WHERE id = ?", (user['id'],)).fetchone()
     if not row:
-        con.close()
         print("User not found.")
         return
     if not check_pw(current, row[0]):
-        con.close()
         print("Wrong current password.")
         return
 
     new1 = input("New password: ").strip()
     new2 = input("Repeat new password: ").strip()
     if new1 == "" or new2 == "":
-        con.close()
         print("Password cannot be empty.")
         return
     if new1 != new2:
-        con.close()
         print("Passwords do not match.")
         return
 
-    cur.execute("UPDATE users SET password_hash = ? WHERE id = ?", (hash_pw(new1), user['id']))
-    con.commit()
-    con.close()
+    with connection(db_path) as con:
+        con.execute("UPDATE users SET password_hash = ? WHERE id = ?", (hash_pw(new1), user['id']))
+    # Gemerkte Sitzungen (auch auf anderen Rechnern) gelten nicht mehr
+    revoke_user_sessions(user['id'], db_path)
+    clear_remembered_token()
     print("Password updated.")
 
 
@@ -133,18 +119,16 @@ def delete_own_account(db_path=DB_PATH):
         return
 
     pw = input("Enter your password to confirm: ").strip()
-    con = get_conn(db_path)
-    cur = con.cursor()
-    cur.execute("SELECT password_hash FROM users WHERE id = ?", (user['id'],))
-    row = cur.fetchone()
+    with connection(db_path) as con:
+        row = con.execute("SELECT password_hash FROM users WHERE id = ?", (user['id'],)).fetchone()
     if not row or not check_pw(pw, row[0]):
-        con.close()
         print("Password check failed. Canceled.")
         return
 
-    cur.execute("DELETE FROM users WHERE id = ?", (user['id'],))
-    con.commit()
-    con.close()
+    with connection(db_path) as con:
+        con.execute("DELETE FROM users WHERE id = ?", (user['id'],))
+    revoke_user_sessions(user['id'], db_path)
+    clear_remembered_token()
 
     set_logged_in_user(None)
     print("Your account has been deleted. Goodbye!")
@@ -0,0 +1,510 @@
+"""
+Lokaler HTTP/JSON-Server (asyncio, nur Standardbibliothek) über tasks, categories,
+auth und admin – mehrere Clients teilen sich einen Prozess mit warmen Caches
+(Verbindungs-Pool, Kategorie-Cache, Sitzungs-LRU).
+
+Aufruf:  python server.py [--host 127.0.0.1] [--port 8765] [--workers N] [--db PFAD]
+
+- HTTP/1.1 mit Keep-Alive (Leerlauf-Timeout TODO_API_KEEPALIVE, Standard 15 s).
+- DB-Arbeit läuft in einem begrenzten Thread-Pool (TODO_API_WORKERS bzw. --workers,
+  höchstens TODO_DB_POOL_SIZE), damit jeder Worker eine Pool-Verbindung bekommt.
+- Jede Antwort trägt die Bearbeitungszeit (Header Server-Timing); GET /stats
+  liefert Anzahl und Zeiten je Route.
+- Anmeldung: POST /login liefert ein Sitzungs-Token, danach
+  "Authorization: Bearer TOKEN".
+
+Endpunkte:
+    POST   /login                  {"alias", "password"}
+    POST   /logout
+    GET    /me                     eigene Zähler (offen/erledigt/überfällig)
+    GET    /tasks                  ?status=open|completed&category=&owner=&from=&to=
+                                   &overdue=1&sort=&desc=1&limit=&offset=
+    POST   /tasks                  {"title", "category", "description", "due_date"}
+    GET    /tasks/ID
+    PATCH  /tasks/ID               {"title", "category", "description", "due_date"}
+    DELETE /tasks/ID
+    POST   /tasks/ID/complete
+    POST   /tasks/batch            {"action": "complete"|"delete"|"update", "ids": [...], ...felder}
+    GET    /search                 ?q=&limit=
+    GET    /categories | POST /categories {"name", "description"} | DELETE /categories/ID
+    POST   /users                  {"alias", "password"} (Registrierung)
+    GET    /users                  (Admin)
+    POST   /users/ID/unlock        (Admin)
+    POST   /users/ID/password      {"password"} (Admin)
+    GET    /stats
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+from db import init_db, DB_PATH, POOL_SIZE
+from auth import authenticate, register_user
+from admin import get_users, admin_unlock_user, admin_reset_password
+from categories import add_category, delete_category, get_categories, get_or_create_category, \
+    category_cache_stats
+from counters import get_user_counts, get_all_user_counts
+from importer import resolve_user
+from sessions import create_session, validate_session, revoke_session
+from tasks import (create_task, get_task, search_tasks, complete_tasks, delete_tasks, update_tasks,
+                   TaskQuery, SEARCH_LIMIT)
+
+HOST = os.getenv("TODO_API_HOST", "127.0.0.1")
+PORT = int(os.getenv("TODO_API_PORT", "8765"))
+WORKERS = min(int(os.getenv("TODO_API_WORKERS", "0")) or POOL_SIZE, POOL_SIZE)
+KEEPALIVE = float(os.getenv("TODO_API_KEEPALIVE", "15"))
+MAX_BODY = 1024 * 1024
+MAX_HEADERS = 100
+
+TASK_FIELDS = ("id", "title", "category", "description", "creation_date", "completed", "due_date", "owner")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body, db_path):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.db_path = db_path
+        self.params = ()
+        self.user = None
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError as e:
+            raise ApiError(400, f"Invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise ApiError(400, "JSON body must be an object.")
+        return data
+
+    def token(self):
+        auth = self.headers.get("authorization", "")
+        return auth[7:].strip() if auth.lower().startswith("bearer ") else None
+
+    def int_param(self, name, default=None):
+        value = self.query.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ApiError(400, f"'{name}' must be a number.")
+
+
+def _task_dict(row):
+    return dict(zip(TASK_FIELDS, row))
+
+
+def _is_admin(req):
+    return bool(req.user["is_admin"])
+
+
+def _string(data, name, required=False):
+    """Textfeld eines Requests (None = fehlt); 400 bei anderem JSON-Typ oder leerem Pflichtfeld."""
+    value = data.get(name)
+    if value is not None and not isinstance(value, str):
+        raise ApiError(400, f"'{name}' must be a string.")
+    if required and value is None:
+        raise ApiError(400, f"'{name}' is required.")
+    if required and not value.strip():
+        raise ApiError(400, f"'{name}' cannot be empty.")
+    return value
+
+
+def _task_fields(data, require_title=False):
+    """
+    Prüft die Task-Felder eines Requests, bevor etwas geschrieben wird (400 bei Fehlern).
+    Liefert {"title", "category", "description", "due_date"}; fehlende Felder sind None.
+    """
+    fields = {name: _string(data, name) for name in ("title", "category", "description", "due_date")}
+    if fields["title"] is not None and not fields["title"].strip():
+        raise ApiError(400, "'title' cannot be empty.")
+    if require_title and fields["title"] is None:
+        raise ApiError(400, "'title' is required.")
+    if fields["due_date"] is not None:
+        try:
+            datetime.strptime(fields["due_date"], "%Y-%m-%d")
+        except ValueError:
+            raise ApiError(400, "'due_date' must be in the format YYYY-MM-DD.")
+    return fields
+
+
+# ----------------------------
+# Handler (laufen im Thread-Pool)
+# ----------------------------
+def login(req):
+    data = req.json()
+    user = authenticate(_string(data, "alias") or "", _string(data, "password") or "", req.db_path)
+    if user is None:
+        raise ApiError(401, "Wrong alias or password, or account locked.")
+    return 200, {"user": user, "token": create_session(user["id"], req.db_path)}
+
+
+def logout(req):
+    revoke_session(req.token(), req.db_path)
+    return 200, {}
+
+
+def me(req):
+    counts = get_user_counts(req.user["id"], req.db_path)
+    counts["categories"] = [{"name": name, "open": o, "done": d, "overdue": late}
+                            for name, o, d, late in counts["categories"]]
+    return 200, {"user": req.user, **counts}
+
+
+def list_tasks(req):
+    query = TaskQuery(req.user["id"], is_admin=_is_admin(req))
+    status = req.query.get("status")
+    if status == "open":
+        query.open()
+    elif status == "completed":
+        query.completed()
+    elif status:
+        raise ApiError(400, "'status' must be open or completed.")
+    if req.query.get("category"):
+        query.category(req.query["category"])
+    if req.query.get("owner"):
+        owner_id = resolve_user(req.query["owner"], req.db_path)
+        if owner_id is None:
+            raise ApiError(404, f"User '{req.query['owner']}' not found.")
+        query.owner(owner_id)
+    if req.query.get("from") or req.query.get("to"):
+        query.due_between(req.query.get("from") or None, req.query.get("to") or None)
+    if req.query.get("overdue") == "1":
+        query.overdue()
+    query.sort(req.query.get("sort", "default"), req.query.get("desc") == "1")
+    rows = query.fetch(req.db_path, limit=req.int_param("limit"), offset=req.int_param("offset", 0))
+    return 200, {"count": len(rows), "tasks": [_task_dict(row) for row in rows]}
+
+
+def create(req):
+    data = _task_fields(req.json(), require_title=True)
+    category = data["category"]
+    category_id = get_or_create_category(category, req.db_path) if category else None
+    task_id = create_task(data["title"], category_id, data["description"],
+                          datetime.now().strftime("%Y-%m-%d"), 0, data["due_date"],
+                          req.user["id"], db_path=req.db_path)
+    return 201, {"id": task_id}
+
+
+def get_one(req):
+    row = get_task(int(req.params[0]), req.user["id"], is_admin=_is_admin(req), db_path=req.db_path)
+    if row is None:
+        raise ApiError(404, "Task not found.")
+    return 200, {"task": _task_dict(row)}
+
+
+def _batch(req, action, ids, data):
+    if action == "complete":
+        return complete_tasks(req.user["id"], ids, db_path=req.db_path, is_admin=_is_admin(req))
+    if action == "delete":
+        return delete_tasks(req.user["id"], ids, db_path=req.db_path, is_admin=_is_admin(req))
+    if action == "update":
+        fields = _task_fields(data)
+        if all(value is None for value in fields.values()):
+            raise ApiError(400, "Nothing to update (give title, category, description or due_date).")
+        category = fields["category"]
+        category_id = get_or_create_category(category, req.db_path) if category else None
+        return update_tasks(req.user["id"], ids, title=fields["title"], category_id=category_id,
+                            description=fields["description"], due_date=fields["due_date"],
+                            db_path=req.db_path, is_admin=_is_admin(req))
+    raise ApiError(400, "'action' must be complete, delete or update.")
+
+
+def _single(action):
+    def handler(req):
+        data = req.json() if action == "update" else {}
+        if not _batch(req, action, [int(req.params[0])], data):
+            raise ApiError(404, "Task not found or not yours.")
+        return 200, {"id": int(req.params[0])}
+    return handler
+
+
+def batch(req):
+    data = req.json()
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        raise ApiError(400, "'ids' must be a non-empty list of task ids.")
+    return 200, {"changed": _batch(req, data.get("action"), ids, data), "requested": len(set(ids))}
+
+
+def search(req):
+    rows = search_tasks(req.query.get("q", ""), req.user["id"], is_admin=_is_admin(req),
+                        limit=req.int_param("limit", SEARCH_LIMIT), db_path=req.db_path)
+    return 200, {"count": len(rows), "tasks": [{**_task_dict(row[:8]), "snippet": row[8]} for row in rows]}
+
+
+def categories(req):
+    return 200, {"categories": [{"id": cid, "name": name} for cid, name in get_categories(req.db_path)]}
+
+
+def create_category(req):
+    data = req.json()
+    name = _string(data, "name", required=True)
+    description = _string(data, "description") or ""
+    return 201, {"id": add_category(name, description, db_path=req.db_path)}
+
+
+def remove_category(req):
+    if not delete_category(int(req.params[0]), db_path=req.db_path):
+        raise ApiError(409, "Category not found or still in use.")
+    return 200, {"id": int(req.params[0])}
+
+
+def register(req):
+    data = req.json()
+    user_id = register_user(_string(data, "alias") or "", _string(data, "password") or "", req.db_path)
+    if user_id is None:
+        raise ApiError(409, "Alias empty or already taken.")
+    return 201, {"id": user_id}
+
+
+def users(req):
+    counts = get_all_user_counts(req.db_path)
+    result = []
+    for uid, alias, locked, fails, is_admin in get_users(req.db_path):
+        open_cnt, done_cnt, overdue = counts.get(uid, (0, 0, 0))
+        result.append({"id": uid, "alias": alias, "is_admin": bool(is_admin), "locked": bool(locked),
+                       "failed_attempts": fails, "open": open_cnt, "done": done_cnt, "overdue": overdue})
+    return 200, {"users": result}
+
+
+def unlock(req):
+    if not admin_unlock_user(int(req.params[0]), db_path=req.db_path):
+        raise ApiError(404, "User not found.")
+    return 200, {"id": int(req.params[0])}
+
+
+def reset_password(req):
+    password = str(req.json().get("password") or "")
+    if not password:
+        raise ApiError(400, "'password' cannot be empty.")
+    if not admin_reset_password(int(req.params[0]), password, db_path=req.db_path):
+        raise ApiError(404, "User not found.")
+    return 200, {"id": int(req.params[0])}
+
+
+# Zugriff: None = offen, "user" = angemeldet, "admin" = nur Admins
+ROUTES = [
+    ("POST", r"/login", login, None),
+    ("POST", r"/logout", logout, "user"),
+    ("GET", r"/me", me, "user"),
+    ("GET", r"/tasks", list_tasks, "user"),
+    ("POST", r"/tasks", create, "user"),
+    ("POST", r"/tasks/batch", batch, "user"),
+    ("GET", r"/tasks/(\d+)", get_one, "user"),
+    ("PATCH", r"/tasks/(\d+)", _single("update"), "user"),
+    ("DELETE", r"/tasks/(\d+)", _single("delete"), "user"),
+    ("POST", r"/tasks/(\d+)/complete", _single("complete"), "user"),
+    ("GET", r"/search", search, "user"),
+    ("GET", r"/categories", categories, "user"),
+    ("POST", r"/categories", create_category, "user"),
+    ("DELETE", r"/categories/(\d+)", remove_category, "user"),
+    ("POST", r"/users", register, None),
+    ("GET", r"/users", users, "admin"),
+    ("POST", r"/users/(\d+)/unlock", unlock, "admin"),
+    ("POST", r"/users/(\d+)/password", reset_password, "admin"),
+]
+_COMPILED = [(method, re.compile(pattern + r"/?"), pattern, handler, access)
+             for method, pattern, handler, access in ROUTES]
+
+
+def dispatch(req):
+    """Route finden, Anmeldung prüfen, Handler ausführen → (status, dict, routen-name)."""
+    allowed = []
+    for method, regex, pattern, handler, access in _COMPILED:
+        match = regex.fullmatch(req.path)
+        if not match:
+            continue
+        if method != req.method:
+            allowed.append(method)
+            continue
+        route = f"{method} {pattern}"
+        if access:
+            req.user = validate_session(req.token(), req.db_path)
+            if req.user is None:
+                raise ApiError(401, "Missing or invalid session token.")
+            if access == "admin" and not _is_admin(req):
+                raise ApiError(403, "Admins only.")
+        req.params = match.groups()
+        return (*handler(req), route)
+    if allowed:
+        raise ApiError(405, f"Method not allowed (use {', '.join(allowed)}).")
+    raise ApiError(404, "Not found.")
+
+
+# ----------------------------
+# HTTP-Server
+# ----------------------------
+class ApiServer:
+    def __init__(self, db_path=DB_PATH, workers=WORKERS, keepalive=KEEPALIVE):
+        self.db_path = db_path
+        self.keepalive = keepalive
+        # Mehr Threads als Pool-Verbindungen würden nur auf eine Verbindung warten
+        workers = max(1, min(workers or POOL_SIZE, POOL_SIZE))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="todo-api")
+        self.stats = {}         # route -> [anzahl, summe_ms, max_ms]
+        self.started = time.time()
+
+    def _record(self, route, ms):
+        entry = self.stats.setdefault(route, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+
+    def stats_report(self):
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "routes": {route: {"count": n, "avg_ms": round(total / n, 2), "max_ms": round(peak, 2)}
+                       for route, (n, total, peak) in sorted(self.stats.items())},
+            "category_cache": category_cache_stats(self.db_path),
+        }
+
+    def _handle(self, req):
+        """Läuft im Thread-Pool: (status, dict, route)."""
+        try:
+            return dispatch(req)
+        except ApiError as e:
+            return e.status, {"error": str(e)}, None
+        except ValueError as e:
+            return 400, {"error": str(e)}, None
+        except sqlite3.IntegrityError as e:
+            return 409, {"error": str(e)}, None
+        except Exception as e:
+            print(f"[ERROR] {req.method} {req.path}: {e!r}", file=sys.stderr)
+            return 500, {"error": "Internal server error."}, None
+
+    async def _read_request(self, reader):
+        """Liest eine Anfrage; None bei geschlossener/leerlaufender Verbindung."""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.keepalive)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise ApiError(400, "Malformed request line.")
+        method, target, version = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise ApiError(431, "Too many headers.")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise ApiError(411, "Chunked request bodies are not supported; send Content-Length.")
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        return method.upper(), url.path, dict(parse_qsl(url.query)), headers, version, body
+
+    def _response(self, status, payload, keep_alive, ms):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            f"Server-Timing: app;dur={ms:.2f}",
+        ]
+        if keep_alive:
+            head.append(f"Keep-Alive: timeout={int(self.keepalive)}")
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    request = await self._read_request(reader)
+                except (ApiError, ValueError, asyncio.IncompleteReadError) as e:
+                    status = e.status if isinstance(e, ApiError) else 400
+                    writer.write(self._response(status, {"error": str(e) or "Bad request."}, False, 0))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, query, headers, version, body = request
+                connection_header = headers.get("connection", "").lower()
+                keep_alive = (connection_header != "close" if version == "HTTP/1.1"
+                              else connection_header == "keep-alive")
+
+                if method == "GET" and path.rstrip("/") == "/stats":
+                    status, payload, route = 200, self.stats_report(), "GET /stats"
+                else:
+                    req = Request(method, path, query, headers, body, self.db_path)
+                    status, payload, route = await loop.run_in_executor(self.executor, self._handle, req)
+
+                ms = (time.perf_counter() - started) * 1000
+                self._record(route or f"{status}", ms)
+                print(f"{method} {path} {status} {ms:.1f}ms", file=sys.stderr)
+                writer.write(self._response(status, payload, keep_alive, ms))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving on {addresses} ({self.executor._max_workers} DB workers)", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the task database as a local HTTP/JSON API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"threads for database work (at most {POOL_SIZE})")
+    parser.add_argument("--db", default=DB_PATH, help="database path")
+    args = parser.parse_args(argv)
+
+    # Meldungen der Bibliotheksfunktionen (print) landen im Log auf stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        init_db(args.db)
+        server = ApiServer(args.db, workers=args.workers)
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.executor.shutdown(wait=False, cancel_futures=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Sitzungs-Tokens für "Angemeldet bleiben" (Tabelle session aus Migration 6).
+
+- Das Token (32 Zufallsbytes, URL-sicher) bekommt nur der Client; in der DB
+  steht ausschließlich HMAC-SHA256(Schlüssel, Token). Der Schlüssel liegt
+  außerhalb der DB: TODO_SESSION_SECRET oder die Datei .session_secret.
+- Prüfung ohne bcrypt: HMAC berechnen → Lookup über den Primärschlüssel →
+  hmac.compare_digest. Gültige Sitzungen merkt sich ein LRU-Cache im Prozess
+  (TODO_SESSION_CACHE Einträge, je höchstens TODO_SESSION_CACHE_TTL Sekunden).
+- Laufzeit einer Sitzung: TODO_SESSION_DAYS (Standard 30).
+- Das gemerkte Token des Clients liegt in TODO_SESSION_FILE
+  (Standard ~/.something_todo_session).
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from db import connection, BASE_DIR, DB_PATH
+
+SESSION_DAYS = int(os.getenv("TODO_SESSION_DAYS", "30"))
+SESSION_CACHE_SIZE = int(os.getenv("TODO_SESSION_CACHE", "256"))
+# So lange (Sekunden) gilt ein Cache-Eintrag, danach wird wieder in der DB geprüft
+SESSION_CACHE_TTL = float(os.getenv("TODO_SESSION_CACHE_TTL", "300"))
+SECRET_FILE = os.getenv("TODO_SESSION_SECRET_FILE") or os.path.join(BASE_DIR, ".session_secret")
+TOKEN_FILE = os.getenv("TODO_SESSION_FILE") or os.path.join(os.path.expanduser("~"), ".something_todo_session")
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# ----------------------------
+# Schlüssel & Token-Hash
+# ----------------------------
+_secret = None
+_secret_lock = threading.Lock()
+
+
+def _get_secret():
+    """HMAC-Schlüssel; wird beim ersten Bedarf erzeugt (Datei nur für den Besitzer lesbar)."""
+    global _secret
+    with _secret_lock:
+        if _secret is None:
+            env = os.getenv("TODO_SESSION_SECRET")
+            if env:
+                _secret = env.encode("utf-8")
+            else:
+                try:
+                    fd = os.open(SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                except FileExistsError:
+                    with open(SECRET_FILE, "rb") as f:
+                        _secret = f.read()
+                else:
+                    _secret = secrets.token_bytes(32)
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(_secret)
+        return _secret
+
+
+def token_hash(token: str) -> str:
+    return hmac.new(_get_secret(), token.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+# ----------------------------
+# LRU-Cache gültiger Sitzungen
+# ----------------------------
+_cache = OrderedDict()      # (db, token_hash) -> (user, expires_at, cached_at)
+_cache_lock = threading.Lock()
+
+
+def _cache_key(db_path, hashed):
+    return (os.path.abspath(db_path) if db_path != ":memory:" else db_path, hashed)
+
+
+def _cache_get(key, now):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        user, expires_at, cached_at = entry
+        if expires_at <= now.strftime(_TIME_FORMAT) or time.monotonic() - cached_at > SESSION_CACHE_TTL:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return dict(user)
+
+
+def _cache_put(key, user, expires_at):
+    with _cache_lock:
+        _cache[key] = (dict(user), expires_at, time.monotonic())
+        _cache.move_to_end(key)
+        while len(_cache) > SESSION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def forget_cached_user(user_id):
+    """Cache-Einträge eines Users verwerfen (z.B. nach Alias- oder Rollenänderung)."""
+    with _cache_lock:
+        for key in [k for k, (user, *_rest) in _cache.items() if user["id"] == user_id]:
+            del _cache[key]
+
+
+# ----------------------------
+# Sitzungen
+# ----------------------------
+def create_session(user_id, db_path=DB_PATH, days=None):
+    """Legt eine Sitzung an und liefert das (nur hier sichtbare) Token."""
+    token = secrets.token_urlsafe(32)
+    now = datetime.now()
+    expires_at = (now + timedelta(days=days or SESSION_DAYS)).strftime(_TIME_FORMAT)
+    with connection(db_path) as con:
+        # Abgelaufene Sitzungen bei der Gelegenheit aufräumen
+        con.execute("DELETE FROM session WHERE expires_at <= ?", (now.strftime(_TIME_FORMAT),))
+        con.execute("INSERT INTO session (token_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (token_hash(token), user_id, now.strftime(_TIME_FORMAT), expires_at))
+    return token
+
+
+def validate_session(token, db_path=DB_PATH):
+    """User-Dict {"id", "alias", "is_admin"} zu einem gültigen Token, sonst None."""
+    if not token:
+        return None
+    hashed = token_hash(token)
+    key = _cache_key(db_path, hashed)
+    now = datetime.now()
+    user = _cache_get(key, now)
+    if user is not None:
+        return user
+
+    with connection(db_path) as con:
+        row = con.execute("""
+            SELECT session.token_hash, session.expires_at, users.id, users.alias, users.is_admin, users.locked
+            FROM session
+            JOIN users ON users.id = session.user_id
+            WHERE session.token_hash = ?
+        """, (hashed,)).fetchone()
+        if row is None or not hmac.compare_digest(row[0], hashed):
+            return None
+        stored_hash, expires_at, uid, alias, is_admin, locked = row
+        if expires_at <= now.strftime(_TIME_FORMAT):
+            con.execute("DELETE FROM session WHERE token_hash = ?", (stored_hash,))
+            return None
+    if locked:
+        return None
+
+    user = {"id": uid, "alias": alias, "is_admin": int(is_admin)}
+    _cache_put(key, user, expires_at)
+    return dict(user)
+
+
+def revoke_session(token, db_path=DB_PATH):
+    hashed = token_hash(token)
+    with _cache_lock:
+        _cache.pop(_cache_key(db_path, hashed), None)
+    with connection(db_path) as con:
+        con.execute("DELETE FROM session WHERE token_hash = ?", (hashed,))
+
+
+def revoke_user_sessions(user_id, db_path=DB_PATH):
+    """Alle Sitzungen eines Users beenden (Passwortwechsel, Reset, Löschen)."""
+    forget_cached_user(user_id)
+    with connection(db_path) as con:
+        con.execute("DELETE FROM session WHERE user_id = ?", (user_id,))
+
+
+# ----------------------------
+# Gemerktes Token des Clients
+# ----------------------------
+def load_remembered_token():
+    try:
+        with open(TOKEN_FILE, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def save_remembered_token(token):
+    fd = os.open(TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def clear_remembered_token():
+    try:
+        os.remove(TOKEN_FILE)
+    except FileNotFoundError:
+        pass
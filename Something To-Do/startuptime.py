@@ -0,0 +1,132 @@
+"""
+Startzeit-Prüfung der Einstiegspunkte über `python -X importtime`.
+
+Aufruf:  python startuptime.py [--runs N] [--budget MS] [--baseline DATEI] [--record DATEI] [--verbose]
+- Importiert jedes Modul aus ENTRY_POINTS in einem frischen Interpreter
+  (N Läufe; verglichen wird der schnellste Lauf, er schwankt am wenigsten).
+- Schwere Abhängigkeiten (bcrypt, Pillow, tkinter, multiprocessing) dürfen
+  beim Start der Kommandozeilen noch nicht geladen sein; sie werden erst im
+  jeweiligen Code-Pfad importiert. Das ist die eigentliche Prüfung.
+- Zeiten schwanken je nach Rechner und Last stark. Daher:
+  * absolute Budgets nur als Obergrenze mit viel Reserve
+    (--budget bzw. TODO_IMPORT_BUDGET_MS gilt für alle),
+  * Regressionen relativ zu einer auf demselben Rechner aufgezeichneten Basis:
+    --record DATEI speichert sie, --baseline DATEI (bzw. TODO_STARTUP_BASELINE) vergleicht;
+    Fehler erst ab REGRESSION_FACTOR und mindestens REGRESSION_MIN_MS langsamer.
+- Exit-Code 1 bei schwerem Import, überschrittenem Budget oder Regression.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Einstiegspunkt → Obergrenze (ms, kumulierte Importzeit), ca. 3× der üblichen Werte
+ENTRY_POINTS = {
+    "main": 250,
+    "cli": 250,
+    "server": 500,
+}
+
+HEAVY_MODULES = ("bcrypt", "PIL", "tkinter", "multiprocessing")
+
+# Regression gegenüber der Basis: mehr als 50 % und mehr als 25 ms langsamer
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_MS = 25
+
+
+def measure_import(module):
+    """Importiert `module` in einem neuen Prozess → (kumulierte µs, {geladene Module})."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip()}")
+    total, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative.isdigit():
+            continue    # Kopfzeile
+        loaded.add(name)
+        if name == module:
+            total = int(cumulative)
+    return total, loaded
+
+
+def is_regression(best_ms, baseline_ms):
+    return (baseline_ms is not None and best_ms > baseline_ms * REGRESSION_FACTOR
+            and best_ms - baseline_ms > REGRESSION_MIN_MS)
+
+
+def check_startup(runs=5, budget_ms=None, verbose=False, baseline=None):
+    """
+    baseline: {modul: ms} aus --record.
+    Liefert [(modul, bester_ms, median_ms, budget_ms, basis_ms, schwere_module, probleme), ...].
+    """
+    baseline = baseline or {}
+    results = []
+    for module, default_budget in ENTRY_POINTS.items():
+        budget = budget_ms or default_budget
+        measure_import(module)      # einmal vorab: .pyc-Dateien erzeugen
+        times, heavy = [], set()
+        for _ in range(runs):
+            total, loaded = measure_import(module)
+            times.append(total / 1000)
+            heavy |= {m for m in loaded if m.split(".")[0] in HEAVY_MODULES}
+            if verbose:
+                print(f"  {module}: {total / 1000:.1f} ms")
+        best, median = min(times), statistics.median(times)
+        roots = sorted({m.split(".")[0] for m in heavy})
+        base = baseline.get(module)
+        problems = []
+        if roots:
+            problems.append(f"heavy imports: {', '.join(roots)}")
+        if best > budget:
+            problems.append(f"over budget {budget:.0f} ms")
+        if is_regression(best, base):
+            problems.append(f"regression vs. baseline {base:.1f} ms")
+        results.append((module, best, median, budget, base, roots, problems))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check entry point import time against a budget.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("TODO_IMPORT_BUDGET_MS", "0")) or None,
+                        help="budget in ms for every entry point (default: per entry point)")
+    parser.add_argument("--baseline", default=os.getenv("TODO_STARTUP_BASELINE"),
+                        help="baseline file from --record to check for regressions")
+    parser.add_argument("--record", help="write the measured times as a new baseline file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = check_startup(args.runs, args.budget, args.verbose, baseline)
+    print(f"\n=== Startup import time (best / median of {args.runs}) ===")
+    for module, best, median, budget, base, _heavy, problems in results:
+        mark = "!! " if problems else "OK "
+        note = f"  baseline {base:.1f} ms" if base is not None else ""
+        if problems:
+            note += "  " + "; ".join(problems)
+        print(f"{mark}{module:<8} {best:7.1f} / {median:7.1f} ms  (budget {budget:.0f} ms){note}")
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            json.dump({module: round(best, 1) for module, best, *_rest in results}, f, indent=2)
+        print(f"Baseline written to {args.record}")
+
+    all_ok = not any(problems for *_rest, problems in results)
+    print("All entry points OK." if all_ok else "Startup check failed.")
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
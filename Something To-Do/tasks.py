@@ -1,5 +1,26 @@
-from datetime import datetime
-from db import get_conn, DB_PATH
+import csv
+import json
+import os
+import re
+import sys
+from datetime import date, datetime
+from db import connection, dedicated_connection, DB_PATH
+from categories import invalidate_category_cache
+
+# Zeilen pro Seite für get_tasks_page / die seitenweise CLI-Ausgabe
+PAGE_SIZE = 50
+
+# Zeilen pro fetchmany() / Schreibblock beim Streamen der CLI-Liste
+STREAM_CHUNK = 500
+
+# Ersatzwert für fehlendes Fälligkeitsdatum (Sortierung: ohne Datum ans Ende)
+NO_DUE_DATE = "9999-12-31"
+
+# IDs pro Statement bei Batch-Änderungen (complete_tasks/delete_tasks/update_tasks)
+BATCH_SIZE = int(os.getenv("TODO_BATCH_SIZE", "500"))
+
+# Zeilen pro Transaktion beim Bulk-Import (import_tasks)
+IMPORT_CHUNK = int(os.getenv("TODO_IMPORT_CHUNK", "5000"))
 
 
 # ----------------------------
@@ -7,7 +28,7 @@ from db import get_conn, DB_PATH
 # ----------------------------
 def create_task(title, category_id, description, creation_date, completed,
                 due_date, user_id, db_path=DB_PATH):
-    """Erstellt eine Aufgabe für einen User."""
+    """Erstellt eine Aufgabe für einen User; liefert die neue Task-ID."""
     if title is None or str(title).strip() == "":
         raise ValueError("'title' cannot be empty.")
     title = title.strip()
@@ -39,92 +60,504 @@ def create_task(title, category_id, description, creation_date, completed,
         if completed_val not in (0, 1):
             raise ValueError("'completed' must be 0 or 1.")
 
-    con = get_conn(db_path)
-    cur = con.cursor()
-    try:
-        cur.execute(
+    with connection(db_path) as con:
+        cur = con.execute(
             """
             INSERT INTO task (title, description, creation_date, completed, due_date, category_id, user_id)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """,
             (title, description, creation_date, completed_val, due_date, category_id, user_id),
         )
-        con.commit()
+    return cur.lastrowid
+
+
+# ----------------------------
+# Bulk-Import (CSV / JSON Lines)
+# ----------------------------
+_TRUE_VALUES = {"1", "true", "yes", "y", "x", "done"}
+_FALSE_VALUES = {"", "0", "false", "no", "n", "open"}
+
+
+def read_import_file(path, fmt=None):
+    """
+    Liest Import-Datensätze als Stream: liefert (zeilennummer, dict).
+    fmt: "csv" oder "jsonl" (Standard: aus der Dateiendung, '-' = stdin als CSV).
+    CSV braucht eine Kopfzeile; erkannte Spalten: title, description, category,
+    creation_date, completed, due_date.
+    """
+    if fmt is None:
+        fmt = "jsonl" if str(path).lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        elif fmt == "jsonl":
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {"_raw": line.rstrip("\n"), "_error": f"invalid JSON: {e}"}
+                yield line_no, record
+        else:
+            raise ValueError(f"Unknown import format '{fmt}' (use csv or jsonl).")
     finally:
-        con.close()
+        if f is not sys.stdin:
+            f.close()
+
+
+def _check_date(value, field, seen):
+    """Prüft YYYY-MM-DD; schon geprüfte Werte werden nicht erneut geparst."""
+    if value in seen:
+        return value
+    if len(value) != 10 or value[4] != "-" or value[7] != "-":
+        raise ValueError(f"'{field}' must be in the format YYYY-MM-DD.")
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{field}' must be in the format YYYY-MM-DD.")
+    seen.add(value)
+    return value
+
+
+def _import_row(record, today, seen_dates):
+    """Validiert einen Datensatz → (title, description, creation_date, completed, due_date, category_name)."""
+    if not isinstance(record, dict):
+        raise ValueError("record must be an object")
+    if "_error" in record:
+        raise ValueError(record["_error"])
+
+    title = str(record.get("title") or "").strip()
+    if not title:
+        raise ValueError("'title' cannot be empty.")
+
+    description = record.get("description")
+    description = str(description) if description not in (None, "") else None
+
+    creation_date = str(record.get("creation_date") or "").strip() or today
+    _check_date(creation_date, "creation_date", seen_dates)
+
+    due_date = str(record.get("due_date") or "").strip() or None
+    if due_date is not None:
+        _check_date(due_date, "due_date", seen_dates)
+
+    completed = record.get("completed")
+    if isinstance(completed, bool):
+        completed = int(completed)
+    else:
+        flag = str(completed if completed is not None else "").strip().lower()
+        if flag in _TRUE_VALUES:
+            completed = 1
+        elif flag in _FALSE_VALUES:
+            completed = 0
+        else:
+            raise ValueError("'completed' must be 0/1 or true/false.")
+
+    category = str(record.get("category") or "").strip() or None
+    return title, description, creation_date, completed, due_date, category
+
+
+def import_tasks(records, user_id, db_path=DB_PATH, chunk_size=None, on_reject=None, progress=None):
+    """
+    Bulk-Import von Aufgaben für einen User.
+    - records: iterierbar aus (zeilennummer, dict), z.B. read_import_file().
+    - Je chunk_size Zeilen eine Transaktion mit executemany() statt Commit pro Task.
+    - Kategorien werden über eine Map name → id aufgelöst (wie get_or_create_category);
+      unbekannte Namen werden in derselben Transaktion angelegt.
+    - Ungültige Zeilen werden übersprungen und an on_reject(zeile, record, fehler) gemeldet.
+    - progress(importiert, abgelehnt) wird nach jedem Block aufgerufen.
+    Liefert (importiert, abgelehnt).
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK
+    today = datetime.now().strftime("%Y-%m-%d")
+    seen_dates = set()
+    imported = rejected = 0
+
+    with connection(db_path) as con:
+        categories = {name: cid for cid, name in con.execute("SELECT id, name FROM category")}
+
+    def flush(batch):
+        new_categories = {}
+        with connection(db_path) as con:
+            params = []
+            for title, description, creation_date, completed, due_date, category in batch:
+                category_id = None
+                if category is not None:
+                    category_id = categories.get(category) or new_categories.get(category)
+                    if category_id is None:
+                        category_id = con.execute("INSERT INTO category (name) VALUES (?)", (category,)).lastrowid
+                        new_categories[category] = category_id
+                params.append((title, description, creation_date, completed, due_date, category_id, user_id))
+            con.executemany(
+                """
+                INSERT INTO task (title, description, creation_date, completed, due_date, category_id, user_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                params,
+            )
+        # erst nach erfolgreichem Commit übernehmen (bei Rollback wären die IDs ungültig)
+        categories.update(new_categories)
+        if new_categories:
+            # Schreiben auf derselben Pool-Verbindung ändert PRAGMA data_version nicht
+            invalidate_category_cache(db_path)
+
+    batch = []
+    for line_no, record in records:
+        try:
+            batch.append(_import_row(record, today, seen_dates))
+        except ValueError as e:
+            rejected += 1
+            if on_reject:
+                on_reject(line_no, record, str(e))
+            continue
+        if len(batch) >= chunk_size:
+            flush(batch)
+            imported += len(batch)
+            batch = []
+            if progress:
+                progress(imported, rejected)
+
+    if batch:
+        flush(batch)
+        imported += len(batch)
+    if progress:
+        progress(imported, rejected)
+    return imported, rejected
 
 
 # ----------------------------
-# Read (CLI Ausgabe)
+# Abfrage-Builder (Filter & Sortierung)
 # ----------------------------
-def list_tasks(user_id, db_path=DB_PATH, is_admin=False):
+# Sortierschlüssel → ORDER BY; "default" entspricht get_tasks und läuft über die Indizes
+SORT_KEYS = {
+    "default": ("task.completed", "COALESCE(task.due_date, '9999-12-31')", "task.id"),
+    "due": ("COALESCE(task.due_date, '9999-12-31')", "task.id"),
+    "created": ("task.creation_date", "task.id"),
+    "title": ("task.title COLLATE NOCASE", "task.id"),
+    "category": ("category.name COLLATE NOCASE", "task.id"),
+    "id": ("task.id",),
+}
+
+
+class TaskQuery:
     """
-    Gibt Aufgaben auf der Konsole aus.
-    - Normale User sehen nur eigene Tasks.
-    - Admins sehen alle Tasks.
+    Baut eine parametrisierte Task-Abfrage (Zeilen wie get_tasks) aus Filtern und Sortierung:
+
+        TaskQuery(user_id).open().category("Work").due_between(None, "2025-06-30").sort("due")
+
+    Normale User sehen immer nur eigene Tasks; owner() wirkt nur für Admins.
+    Die Datumsfilter vergleichen COALESCE(due_date, '9999-12-31') wie die Indizes
+    idx_task_user_order / idx_task_order, damit SQLite sie nutzen kann.
     """
-    con = get_conn(db_path)
-    cur = con.cursor()
 
-    if is_admin:
-        cur.execute(
-            """
+    def __init__(self, user_id, is_admin=False):
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.where = []
+        self.params = []
+        self.sort_key = "default"
+        self.descending = False
+        # Datumsfilter ohne Statusfilter → completed IN (0, 1) ergänzen (siehe _where_sql)
+        self.status_filtered = False
+        self.due_filtered = False
+        self.single = False
+
+    def _add(self, clause, *params):
+        self.where.append(clause)
+        self.params.extend(params)
+        return self
+
+    # --- Filter ---
+
+    def completed(self, flag=True):
+        self.status_filtered = True
+        return self._add("task.completed = ?", 1 if flag else 0)
+
+    def open(self):
+        return self.completed(False)
+
+    def category(self, category):
+        """Kategorie per ID oder Name; None = ohne Kategorie."""
+        if category is None:
+            return self._add("task.category_id IS NULL")
+        if isinstance(category, int):
+            return self._add("task.category_id = ?", category)
+        return self._add("task.category_id = (SELECT id FROM category WHERE name = ?)", category.strip())
+
+    def task_id(self, task_id):
+        """Genau ein Task (Primärschlüssel); die Abfrage bekommt dann kein ORDER BY."""
+        self.single = True
+        return self._add("task.id = ?", task_id)
+
+    def owner(self, owner_id):
+        if self.is_admin:
+            self._add("task.user_id = ?", owner_id)
+        return self
+
+    def due_between(self, start=None, end=None):
+        """Fälligkeit im Bereich [start, end] (YYYY-MM-DD, beide optional); Tasks ohne Datum fallen raus."""
+        for value in (start, end):
+            if value is not None:
+                datetime.strptime(value, "%Y-%m-%d")
+        self.due_filtered = True
+        self._add(f"COALESCE(task.due_date, '{NO_DUE_DATE}') < '{NO_DUE_DATE}'")
+        if start is not None:
+            self._add(f"COALESCE(task.due_date, '{NO_DUE_DATE}') >= ?", start)
+        if end is not None:
+            self._add(f"COALESCE(task.due_date, '{NO_DUE_DATE}') <= ?", end)
+        return self
+
+    def overdue(self, today=None):
+        """Offen und Fälligkeit vor heute."""
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        self.open()
+        return self._add(f"COALESCE(task.due_date, '{NO_DUE_DATE}') < ?", today)
+
+    def sort(self, key="default", descending=False):
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{key}' (use {', '.join(SORT_KEYS)}).")
+        self.sort_key = key
+        self.descending = descending
+        return self
+
+    def is_default(self):
+        """True, wenn die Abfrage genau get_tasks entspricht (keine Filter, Standardsortierung)."""
+        return not self.where and self.sort_key == "default" and not self.descending
+
+    # --- SQL ---
+
+    def _where_sql(self):
+        where, params = list(self.where), list(self.params)
+        if self.due_filtered and not self.status_filtered:
+            # completed ist die Spalte vor dem Datum in beiden Indizes: ohne Gleichheit
+            # darauf sucht SQLite den Datumsbereich nicht, sondern liest den ganzen Index
+            where.insert(0, "task.completed IN (0, 1)")
+        if not self.is_admin:
+            where.insert(0, "task.user_id = ?")
+            params.insert(0, self.user_id)
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def sql(self, limit=None, offset=0):
+        where, params = self._where_sql()
+        direction = " DESC" if self.descending else ""
+        order = ", ".join(term + direction for term in SORT_KEYS[self.sort_key])
+        sql = f"""
             SELECT task.id,
                    task.title,
                    category.name,
                    task.description,
                    task.creation_date,
                    task.completed,
-                   task.due_date
+                   task.due_date,
+                   users.alias AS owner_alias
             FROM task
             LEFT JOIN category ON task.category_id = category.id
-            ORDER BY task.completed,
-                     COALESCE(task.due_date, '9999-12-31'),
-                     task.id
-            """
-        )
+            LEFT JOIN users    ON task.user_id     = users.id
+            {where}
+        """
+        if not self.single:
+            sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        return sql, params
+
+    def count_sql(self):
+        where, params = self._where_sql()
+        return f"SELECT COUNT(*) FROM task{where}", params
+
+    # --- Ausführen ---
+
+    def fetch(self, db_path=DB_PATH, limit=None, offset=0):
+        sql, params = self.sql(limit, offset)
+        with connection(db_path) as con:
+            return con.execute(sql, params).fetchall()
+
+    def iter(self, db_path=DB_PATH, chunk_size=STREAM_CHUNK):
+        sql, params = self.sql()
+        # Eigene Verbindung: der Generator pausiert zwischen den Blöcken
+        with dedicated_connection(db_path) as con:
+            cur = con.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def count(self, db_path=DB_PATH):
+        sql, params = self.count_sql()
+        with connection(db_path) as con:
+            return con.execute(sql, params).fetchone()[0]
+
+
+# ----------------------------
+# Read (CLI Ausgabe)
+# ----------------------------
+def list_tasks(user_id, db_path=DB_PATH, is_admin=False, page_size=None, out=None, query=None):
+    """
+    Gibt Aufgaben auf der Konsole aus.
+    - Normale User sehen nur eigene Tasks.
+    - Admins sehen alle Tasks.
+    - page_size: seitenweise Ausgabe über get_tasks_page (Enter = nächste Seite).
+    - sonst wird gestreamt (iter_tasks): die erste Zeile erscheint sofort,
+      auch bei sehr vielen Tasks; Abbruch durch 'head' o.ä. ist kein Fehler.
+    - query: optionaler TaskQuery für Filter/Sortierung.
+    """
+    if page_size:
+        _list_tasks_paged(user_id, db_path, is_admin, page_size, query)
+        return
+
+    out = out or sys.stdout
+    rows = query.iter(db_path) if query is not None else iter_tasks(user_id, db_path, is_admin)
+    try:
+        _write_tasks(rows, out)
+    except BrokenPipeError:
+        # Leser (z.B. head/less) hat die Pipe geschlossen → still beenden.
+        # stdout umbiegen, damit der Flush beim Beenden nicht erneut scheitert.
+        if out is sys.stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+
+
+def iter_tasks(user_id, db_path=DB_PATH, is_admin=False, chunk_size=STREAM_CHUNK):
+    """
+    Generator über die Task-Zeilen der CLI-Liste (Format wie get_tasks).
+    Holt blockweise per fetchmany() statt alles mit fetchall() → konstanter Speicher.
+    """
+    return TaskQuery(user_id, is_admin).iter(db_path, chunk_size)
+
+
+# Spalten der Export-Zeilen (iter_export_chunks)
+EXPORT_COLUMNS = ("id", "title", "category", "description", "creation_date", "completed", "due_date", "owner")
+
+
+def iter_export_chunks(user_id=None, category=None, completed=None, date_from=None, date_to=None,
+                       date_field="due_date", db_path=DB_PATH, chunk_size=STREAM_CHUNK):
+    """
+    Generator für Exporte: liefert Listen von bis zu chunk_size Zeilen (Spalten: EXPORT_COLUMNS),
+    sortiert nach task.id. Alle Filter sind optional:
+    - user_id, category (Name), completed (0/1)
+    - date_from / date_to (inklusive, YYYY-MM-DD) auf date_field ("due_date" oder "creation_date")
+    Liest über einen Cursor mit fetchmany() → konstanter Speicher, egal wie groß die Tabelle ist.
+    """
+    if date_field not in ("due_date", "creation_date"):
+        raise ValueError("'date_field' must be 'due_date' or 'creation_date'.")
+
+    where, params = [], []
+    if user_id is not None:
+        # "+" verhindert den Index idx_task_user_order: dessen Reihenfolge passt nicht
+        # zu ORDER BY task.id und würde eine Sortierung über alle Zeilen erzwingen.
+        where.append("+task.user_id = ?")
+        params.append(user_id)
+    if category is not None:
+        where.append("category.name = ?")
+        params.append(category)
+    if completed is not None:
+        where.append("task.completed = ?")
+        params.append(int(completed))
+    if date_from is not None:
+        where.append(f"task.{date_field} >= ?")
+        params.append(date_from)
+    if date_to is not None:
+        where.append(f"task.{date_field} <= ?")
+        params.append(date_to)
+
+    sql = """
+        SELECT task.id,
+               task.title,
+               category.name,
+               task.description,
+               task.creation_date,
+               task.completed,
+               task.due_date,
+               users.alias
+        FROM task
+        LEFT JOIN category ON task.category_id = category.id
+        LEFT JOIN users    ON task.user_id     = users.id
+    """
+    if where:
+        sql += "WHERE " + " AND ".join(where) + "\n"
+    sql += "ORDER BY task.id"
+
+    with dedicated_connection(db_path) as con:
+        cur = con.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+
+def _write_tasks(rows, out, chunk_size=STREAM_CHUNK):
+    """Schreibt formatierte Zeilen blockweise nach `out` (ein write/flush pro Block)."""
+    buf = []
+    first = True
+    for row in rows:
+        buf.append(_format_task(row))
+        # ersten Block sofort ausgeben (schnelle erste Zeile), danach gesammelt
+        if first or len(buf) >= chunk_size:
+            if first:
+                buf.insert(0, "\n=== Task List ===\n")
+                first = False
+            out.write("".join(buf))
+            out.flush()
+            buf.clear()
+
+    if first:
+        out.write("\nNo tasks found.\n\n")
     else:
-        cur.execute(
-            """
-            SELECT task.id,
-                   task.title,
-                   category.name,
-                   task.description,
-                   task.creation_date,
-                   task.completed,
-                   task.due_date
-            FROM task
-            LEFT JOIN category ON task.category_id = category.id
-            WHERE task.user_id = ?
-            ORDER BY task.completed,
-                     COALESCE(task.due_date, '9999-12-31'),
-                     task.id
-            """,
-            (user_id,),
-        )
+        buf.append("\n")
+        out.write("".join(buf))
+    out.flush()
+
 
-    rows = cur.fetchall()
-    con.close()
+def _list_tasks_paged(user_id, db_path, is_admin, page_size, query=None):
+    if query is not None:
+        # Gefilterte/sortierte Liste: seitenweise per LIMIT/OFFSET
+        def fetch(offset):
+            rows = query.fetch(db_path, limit=page_size + 1, offset=offset)
+            return rows[:page_size], (offset + page_size if len(rows) > page_size else None)
+    else:
+        def fetch(cursor):
+            return get_tasks_page(user_id, cursor, page_size, db_path=db_path, is_admin=is_admin)
 
+    rows, cursor = fetch(0 if query is not None else None)
     if not rows:
         print("\nNo tasks found.\n")
         return
 
     print("\n=== Task List ===")
-    for (task_id, title, category_name, description, creation_date, completed, due_date) in rows:
-        status = "Done" if completed == 1 else "Open"
-        line = f"{task_id}: {title}"
-        if category_name:
-            line += f" [{category_name}]"
-        line += f" - {status} (created: {creation_date})"
-        if due_date:
-            line += f" | due: {due_date}"
-        print(line)
-        if description:
-            print("   Description:", description)
+    while True:
+        for row in rows:
+            print(_format_task(row), end="")
+        if cursor is None:
+            break
+        more = input("--- Enter = next page, 0 = back ---").strip()
+        if more == "0":
+            break
+        rows, cursor = fetch(cursor)
     print()
 
 
+def _format_task(row):
+    (task_id, title, category_name, description, creation_date, completed, due_date) = row[:7]
+    status = "Done" if completed == 1 else "Open"
+    line = f"{task_id}: {title}"
+    if category_name:
+        line += f" [{category_name}]"
+    line += f" - {status} (created: {creation_date})"
+    if due_date:
+        line += f" | due: {due_date}"
+    line += "\n"
+    if description:
+        line += f"   Description: {description}\n"
+    return line
+
+
 # ----------------------------
 # Delete
 # ----------------------------
@@ -133,19 +566,15 @@ def delete_task(task_id, user_id, db_path=DB_PATH, is_admin=False):
     Löscht eine Aufgabe.
     - Normale User: nur eigene Tasks.
     - Admins: beliebige Task-ID.
+    Liefert True, wenn die Aufgabe geändert wurde.
     """
-    con = get_conn(db_path)
-    cur = con.cursor()
-
-    if is_admin:
-        cur.execute("DELETE FROM task WHERE id = ?", (task_id,))
-    else:
-        # Besitz prüfen und löschen
-        cur.execute("DELETE FROM task WHERE id = ? AND user_id = ?", (task_id, user_id))
-
-    con.commit()
-    deleted = cur.rowcount
-    con.close()
+    with connection(db_path) as con:
+        if is_admin:
+            cur = con.execute("DELETE FROM task WHERE id = ?", (task_id,))
+        else:
+            # Besitz prüfen und löschen
+            cur = con.execute("DELETE FROM task WHERE id = ? AND user_id = ?", (task_id, user_id))
+        deleted = cur.rowcount
 
     if deleted == 0 and not is_admin:
         print("You cannot delete tasks that are not yours.")
@@ -153,6 +582,7 @@ def delete_task(task_id, user_id, db_path=DB_PATH, is_admin=False):
         print("Task not found.")
     else:
         print("Task deleted.")
+    return deleted > 0
 
 
 # ----------------------------
@@ -163,18 +593,14 @@ def complete_task(task_id, user_id, db_path=DB_PATH, is_admin=False):
     Markiert eine Aufgabe als erledigt.
     - Normale User: nur eigene Tasks.
     - Admins: beliebige Task-ID.
+    Liefert True, wenn die Aufgabe geändert wurde.
     """
-    con = get_conn(db_path)
-    cur = con.cursor()
-
-    if is_admin:
-        cur.execute("UPDATE task SET completed = 1 WHERE id = ?", (task_id,))
-    else:
-        cur.execute("UPDATE task SET completed = 1 WHERE id = ? AND user_id = ?", (task_id, user_id))
-
-    con.commit()
-    updated = cur.rowcount
-    con.close()
+    with connection(db_path) as con:
+        if is_admin:
+            cur = con.execute("UPDATE task SET completed = 1 WHERE id = ?", (task_id,))
+        else:
+            cur = con.execute("UPDATE task SET completed = 1 WHERE id = ? AND user_id = ?", (task_id, user_id))
+        updated = cur.rowcount
 
     if updated == 0 and not is_admin:
         print("Task not found or not owned by you.")
@@ -182,6 +608,7 @@ def complete_task(task_id, user_id, db_path=DB_PATH, is_admin=False):
         print("Task not found.")
     else:
         print("Task marked as completed.")
+    return updated > 0
 
 
 # ----------------------------
@@ -193,95 +620,125 @@ def update_task(task_id, user_id, title=None, category_id=None, description=None
     Aktualisiert Felder einer Aufgabe.
     - Normale User: nur eigene Tasks.
     - Admins: beliebige Task-ID.
+    Liefert True, wenn die Aufgabe geändert wurde, sonst False
+    (nicht gefunden / nicht eigene, ungültiges Datum, keine Änderung).
     """
-    con = get_conn(db_path)
-    cur = con.cursor()
+    with connection(db_path) as con:
+        # Besitzerprüfung nur für Nicht-Admins
+        if not is_admin:
+            row = con.execute("SELECT id FROM task WHERE id = ? AND user_id = ?", (task_id, user_id)).fetchone()
+            if row is None:
+                print("You cannot edit tasks that are not yours.")
+                return False
+
+        updates, values = [], []
+
+        if title is not None:
+            updates.append("title = ?")
+            values.append(title.strip())
+
+        if category_id is not None:
+            updates.append("category_id = ?")
+            values.append(category_id)
+
+        if description is not None:
+            updates.append("description = ?")
+            values.append((description or "").strip())
+
+        if due_date is not None:
+            # validieren
+            try:
+                datetime.strptime(due_date, "%Y-%m-%d")
+            except ValueError:
+                print("Please enter the date in the format YYYY-MM-DD.")
+                return False
+            updates.append("due_date = ?")
+            values.append(due_date)
+
+        if not updates:
+            print("No changes applied.")
+            return False
+
+        # WHERE-Bedingung abhängig von Admin/Nutzer
+        if is_admin:
+            sql = f"UPDATE task SET {', '.join(updates)} WHERE id = ?"
+            values.append(task_id)
+        else:
+            sql = f"UPDATE task SET {', '.join(updates)} WHERE id = ? AND user_id = ?"
+            values.extend([task_id, user_id])
+
+        updated = con.execute(sql, values).rowcount
+
+    if updated == 0:
+        print("Task not found.")
+        return False
+    print(f"Task {task_id} has been updated.")
+    return True
 
-    # Besitzerprüfung nur für Nicht-Admins
-    if not is_admin:
-        cur.execute("SELECT id FROM task WHERE id = ? AND user_id = ?", (task_id, user_id))
-        if cur.fetchone() is None:
-            con.close()
-            print("You cannot edit tasks that are not yours.")
-            return
 
-    updates, values = [], []
+# ----------------------------
+# Read for GUI
+# ----------------------------
+def get_tasks(user_id, db_path=DB_PATH, is_admin=False, query=None):
+    """
+    Liefert Task-Zeilen für die GUI:
+    (task.id, task.title, category.name, task.description, task.creation_date, task.completed, task.due_date, owner_alias)
+    Admin: sieht alle Tasks (inkl. owner_alias); bei normalen Usern ist owner_alias ihr eigener Alias.
+    query: optionaler TaskQuery für Filter/Sortierung.
+    """
+    return (query or TaskQuery(user_id, is_admin)).fetch(db_path)
 
-    if title is not None:
-        updates.append("title = ?")
-        values.append(title.strip())
 
-    if category_id is not None:
-        updates.append("category_id = ?")
-        values.append(category_id)
+def get_task(task_id, user_id, is_admin=False, db_path=DB_PATH):
+    """
+    Liefert eine einzelne Task-Zeile (gleiches Format wie get_tasks) oder None.
+    Lookup über den Primärschlüssel; normale User sehen nur eigene Tasks.
+    """
+    rows = TaskQuery(user_id, is_admin).task_id(task_id).fetch(db_path)
+    return rows[0] if rows else None
 
-    if description is not None:
-        updates.append("description = ?")
-        values.append((description or "").strip())
 
-    if due_date is not None:
-        # validieren
-        try:
-            datetime.strptime(due_date, "%Y-%m-%d")
-        except ValueError:
-            print("Please enter the date in the format YYYY-MM-DD.")
-            con.close()
-            return
-        updates.append("due_date = ?")
-        values.append(due_date)
+# ----------------------------
+# Volltextsuche (FTS5, Tabelle task_fts aus Migration 4)
+# ----------------------------
+SEARCH_LIMIT = 50
 
-    if not updates:
-        print("No changes applied.")
-        con.close()
-        return
+# Markierung der Treffer im Snippet
+HIGHLIGHT = ("«", "»")
 
-    # WHERE-Bedingung abhängig von Admin/Nutzer
-    if is_admin:
-        sql = f"UPDATE task SET {', '.join(updates)} WHERE id = ?"
-        values.append(task_id)
-    else:
-        sql = f"UPDATE task SET {', '.join(updates)} WHERE id = ? AND user_id = ?"
-        values.extend([task_id, user_id])
 
-    cur.execute(sql, values)
-    con.commit()
-    con.close()
-    print(f"Task {task_id} has been updated.")
+def _fts_query(text):
+    """
+    Macht aus freier Eingabe eine sichere FTS5-Abfrage: jedes Wort in Anführungszeichen
+    (keine Operatoren/Syntaxfehler), das letzte als Präfix → Suche beim Tippen.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
 
 
-# ----------------------------
-# Read for GUI
-# ----------------------------
-def get_tasks(user_id, db_path=DB_PATH, is_admin=False):
+def search_tasks(query, user_id, is_admin=False, limit=SEARCH_LIMIT, db_path=DB_PATH):
     """
-    Liefert Task-Zeilen für die GUI:
-    (task.id, task.title, category.name, task.description, task.creation_date, task.completed, task.due_date, owner_alias)
-    Admin: sieht alle Tasks (inkl. owner_alias); bei normalen Usern ist owner_alias ihr eigener Alias.
+    Volltextsuche über Titel und Beschreibung, beste Treffer zuerst (bm25, Titel zählt mehr).
+    Liefert Zeilen wie get_tasks plus Snippet mit «markierten» Treffern:
+    (id, title, category, description, creation_date, completed, due_date, owner_alias, snippet)
+    Normale User finden nur eigene Tasks.
     """
-    con = get_conn(db_path)
-    cur = con.cursor()
-
-    if is_admin:
-        cur.execute(
-            """
-            SELECT task.id,
-                   task.title,
-                   category.name,
-                   task.description,
-                   task.creation_date,
-                   task.completed,
-                   task.due_date,
-                   users.alias AS owner_alias
-            FROM task
-            LEFT JOIN category ON task.category_id = category.id
-            LEFT JOIN users    ON task.user_id     = users.id
-            ORDER BY task.completed,
-                     COALESCE(task.due_date, '9999-12-31'),
-                     task.id
-            """
-        )
-    else:
-        cur.execute(
+    match = _fts_query(query or "")
+    if match is None:
+        return []
+
+    with connection(db_path) as con:
+        has_fts = con.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+        ).fetchone()
+        if not has_fts:
+            return _search_tasks_like(con, query, user_id, is_admin, limit)
+
+        return con.execute(
             """
             SELECT task.id,
                    task.title,
@@ -290,18 +747,259 @@ def get_tasks(user_id, db_path=DB_PATH, is_admin=False):
                    task.creation_date,
                    task.completed,
                    task.due_date,
-                   users.alias AS owner_alias
-            FROM task
+                   users.alias AS owner_alias,
+                   snippet(task_fts, -1, ?, ?, '…', 10)
+            FROM task_fts
+            JOIN task          ON task.id = task_fts.rowid
             LEFT JOIN category ON task.category_id = category.id
             LEFT JOIN users    ON task.user_id     = users.id
-            WHERE task.user_id = ?
-            ORDER BY task.completed,
-                     COALESCE(task.due_date, '9999-12-31'),
-                     task.id
+            WHERE task_fts MATCH ?
+              AND (? OR task.user_id = ?)
+            ORDER BY bm25(task_fts, 10.0, 1.0)
+            LIMIT ?
             """,
-            (user_id,),
-        )
+            (*HIGHLIGHT, match, 1 if is_admin else 0, user_id, limit),
+        ).fetchall()
+
+
+def _search_tasks_like(con, query, user_id, is_admin, limit):
+    """Ersatz ohne FTS5 (langsamer, ohne Ranking): Titel/Beschreibung enthalten den Text."""
+    pattern = "%" + query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return con.execute(
+        """
+        SELECT task.id,
+               task.title,
+               category.name,
+               task.description,
+               task.creation_date,
+               task.completed,
+               task.due_date,
+               users.alias AS owner_alias,
+               COALESCE(task.description, '')
+        FROM task
+        LEFT JOIN category ON task.category_id = category.id
+        LEFT JOIN users    ON task.user_id     = users.id
+        WHERE (task.title LIKE :p ESCAPE '\\' OR task.description LIKE :p ESCAPE '\\')
+          AND (:admin OR task.user_id = :uid)
+        ORDER BY task.id
+        LIMIT :limit
+        """,
+        {"p": pattern, "admin": 1 if is_admin else 0, "uid": user_id, "limit": limit},
+    ).fetchall()
+
 
-    rows = cur.fetchall()
-    con.close()
-    return rows
+# ----------------------------
+# Read seitenweise (Keyset-Pagination)
+# ----------------------------
+def _page_sql(is_admin, jump=False):
+    """
+    SQL einer Seite für get_tasks_page (benannte Parameter :user_id, :limit, ...).
+    jump=True: Sprung per OFFSET; sonst Keyset-Suche ab (:completed, :due_key, :last_id).
+    """
+    select = """
+        SELECT task.id,
+               task.title,
+               category.name,
+               task.description,
+               task.creation_date,
+               task.completed,
+               task.due_date,
+               users.alias AS owner_alias
+        FROM task
+        LEFT JOIN category ON task.category_id = category.id
+        LEFT JOIN users    ON task.user_id     = users.id
+    """
+    order = """
+        ORDER BY task.completed,
+                 COALESCE(task.due_date, '9999-12-31'),
+                 task.id
+    """
+    if jump:
+        owner_where = "" if is_admin else "WHERE task.user_id = :user_id"
+        return select + owner_where + order + "LIMIT :limit OFFSET :offset"
+
+    # Pro completed-Gruppe suchen: so nutzt SQLite den Index auch für das
+    # Datum (Row-Value-Vergleiche über alle drei Spalten nutzen nur 'completed')
+    owner_filter = "" if is_admin else "task.user_id = :user_id AND"
+    return select + f"""
+        WHERE {owner_filter}
+              task.completed = :completed
+          AND COALESCE(task.due_date, '9999-12-31') >= :due_key
+          AND (COALESCE(task.due_date, '9999-12-31') > :due_key OR task.id > :last_id)
+    """ + order + "LIMIT :limit"
+
+
+def get_tasks_page(user_id, cursor=None, page_size=PAGE_SIZE, db_path=DB_PATH, is_admin=False,
+                   offset=0):
+    """
+    Liefert eine Seite Task-Zeilen (Format wie get_tasks) und den Cursor der nächsten Seite:
+        rows, next_cursor = get_tasks_page(uid)
+        rows, next_cursor = get_tasks_page(uid, next_cursor)
+    cursor = (completed, due_date, id) der letzten Zeile der Vorseite; None = erste Seite.
+    next_cursor ist None, wenn keine weiteren Tasks folgen.
+    Statt OFFSET wird ab dem Cursor im Index gesucht → jede Seite kostet gleich viel.
+    offset (nur ohne cursor): direkter Sprung an eine Position, z.B. beim Ziehen
+    der Scrollbar; danach kann mit dem gelieferten Cursor weitergeblättert werden.
+    """
+    if page_size < 1:
+        raise ValueError("'page_size' must be at least 1.")
+
+    if cursor is None:
+        completed, due_key, last_id = 0, "", 0
+    else:
+        completed, due_date, last_id = cursor
+        due_key = due_date if due_date is not None else NO_DUE_DATE
+
+    params = {"user_id": user_id}
+    rows = []
+    with connection(db_path) as con:
+        if cursor is None and offset > 0:
+            rows = con.execute(_page_sql(is_admin, jump=True),
+                               {**params, "limit": page_size + 1, "offset": offset}).fetchall()
+        else:
+            sql = _page_sql(is_admin)
+            for group in (0, 1):
+                if group < completed:
+                    continue
+                if group > completed:
+                    due_key, last_id = "", 0
+                # eine Zeile mehr holen, um zu erkennen, ob noch etwas folgt
+                rows += con.execute(sql, {
+                    **params, "completed": group, "due_key": due_key,
+                    "last_id": last_id, "limit": page_size + 1 - len(rows),
+                }).fetchall()
+                if len(rows) > page_size:
+                    break
+
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, (last[5], last[6], last[0])
+
+
+def count_tasks(user_id, db_path=DB_PATH, is_admin=False):
+    """Anzahl der sichtbaren Tasks (alle für Admins), z.B. für die Scrollbar der GUI."""
+    return TaskQuery(user_id, is_admin).count(db_path)
+
+
+# ----------------------------
+# Batch (viele Tasks in einer Transaktion)
+# ----------------------------
+def _batch_filter(user_id, is_admin, category=None, category_id=None, completed=None,
+                  due_before=None, due_after=None):
+    """WHERE-Teil + Parameter für filterbasierte Batch-Änderungen (inkl. Besitzerprüfung)."""
+    where, params = [], []
+    if category is not None:
+        where.append("category_id IN (SELECT id FROM category WHERE name = ?)")
+        params.append(category.strip())
+    if category_id is not None:
+        where.append("category_id = ?")
+        params.append(int(category_id))
+    if completed is not None:
+        where.append("completed = ?")
+        params.append(int(completed))
+    if due_before is not None:
+        where.append("due_date < ?")
+        params.append(due_before)
+    if due_after is not None:
+        where.append("due_date > ?")
+        params.append(due_after)
+    if not where:
+        raise ValueError("No tasks selected (give ids or at least one filter).")
+    if not is_admin:
+        where.append("user_id = ?")
+        params.append(user_id)
+    return " AND ".join(where), params
+
+
+def _unique_ids(ids):
+    """IDs als int ohne Duplikate (Reihenfolge bleibt); None = Auswahl über Filter."""
+    return None if ids is None else list(dict.fromkeys(int(i) for i in ids))
+
+
+def _run_batch(con, sql, user_id, is_admin, ids=None, filters=None, values=()):
+    """
+    Führt `sql` ("UPDATE ... WHERE {where}" bzw. "DELETE ... WHERE {where}") aus:
+    - ids (aus _unique_ids): ein Statement je BATCH_SIZE IDs (id IN (...) AND user_id = ?)
+    - sonst: ein Statement mit den Filtern
+    Liefert die Anzahl betroffener Zeilen.
+    """
+    if ids is None:
+        where, params = _batch_filter(user_id, is_admin, **(filters or {}))
+        return con.execute(sql.format(where=where), (*values, *params)).rowcount
+
+    owner = "" if is_admin else " AND user_id = ?"
+    owner_params = () if is_admin else (user_id,)
+    changed = 0
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        where = f"id IN ({', '.join('?' * len(batch))}){owner}"
+        changed += con.execute(sql.format(where=where), (*values, *batch, *owner_params)).rowcount
+    return changed
+
+
+def _report_batch(changed, ids, verb):
+    skipped = len(ids) - changed if ids is not None else 0
+    note = f" ({skipped} not found or not yours)" if skipped > 0 else ""
+    print(f"{changed} task(s) {verb}.{note}")
+
+
+def complete_tasks(user_id, ids=None, db_path=DB_PATH, is_admin=False, **filters):
+    """
+    Markiert viele Aufgaben in einer Transaktion als erledigt.
+    Auswahl über ids (Liste) oder Filter: category, category_id, completed, due_before, due_after.
+    Normale User ändern nur eigene Tasks. Liefert die Anzahl geänderter Tasks.
+    """
+    ids = _unique_ids(ids)
+    with connection(db_path) as con:
+        changed = _run_batch(con, "UPDATE task SET completed = 1 WHERE {where}",
+                             user_id, is_admin, ids, filters)
+    _report_batch(changed, ids, "marked as completed")
+    return changed
+
+
+def delete_tasks(user_id, ids=None, db_path=DB_PATH, is_admin=False, **filters):
+    """Löscht viele Aufgaben in einer Transaktion (Auswahl wie complete_tasks)."""
+    ids = _unique_ids(ids)
+    with connection(db_path) as con:
+        changed = _run_batch(con, "DELETE FROM task WHERE {where}", user_id, is_admin, ids, filters)
+    _report_batch(changed, ids, "deleted")
+    return changed
+
+
+def update_tasks(user_id, ids=None, title=None, category_id=None, description=None, due_date=None,
+                 db_path=DB_PATH, is_admin=False, **filters):
+    """
+    Setzt dieselben Felder für viele Aufgaben in einer Transaktion (Auswahl wie complete_tasks).
+    None = Feld nicht ändern. Liefert die Anzahl geänderter Tasks.
+    """
+    updates, values = [], []
+    if title is not None:
+        if not title.strip():
+            raise ValueError("'title' cannot be empty.")
+        updates.append("title = ?")
+        values.append(title.strip())
+    if category_id is not None:
+        updates.append("category_id = ?")
+        values.append(category_id)
+    if description is not None:
+        updates.append("description = ?")
+        values.append(description.strip())
+    if due_date is not None:
+        try:
+            datetime.strptime(due_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("'due_date' must be in the format YYYY-MM-DD.")
+        updates.append("due_date = ?")
+        values.append(due_date)
+    if not updates:
+        print("No changes applied.")
+        return 0
+
+    ids = _unique_ids(ids)
+    with connection(db_path) as con:
+        changed = _run_batch(con, f"UPDATE task SET {', '.join(updates)} WHERE {{where}}",
+                             user_id, is_admin, ids, filters, values)
+    _report_batch(changed, ids, "updated")
+    return changed
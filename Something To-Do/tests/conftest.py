@@ -0,0 +1,28 @@
+"""
+Gemeinsame Fixtures: jede Test-Datenbank liegt in tmp_path und wird mit init_db angelegt.
+Die Module liegen flach im Projektordner; bcrypt läuft mit minimalem Kostenfaktor.
+"""
+import os
+import sys
+
+os.environ.setdefault("TODO_BCRYPT_ROUNDS", "4")
+os.environ.setdefault("TODO_HASH_WORKERS", "1")
+os.environ.setdefault("TODO_SESSION_SECRET", "test-secret")
+os.environ.setdefault("BOOTSTRAP_PASSWORD", "admin")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    import auth
+    import db
+    import sessions
+    monkeypatch.setattr(sessions, "TOKEN_FILE", str(tmp_path / "session"))
+    path = str(tmp_path / "todo.db")
+    db.init_db(path)
+    yield path
+    auth.set_logged_in_user(None)
+    db.close_pools()
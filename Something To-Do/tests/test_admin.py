@@ -0,0 +1,21 @@
+from admin import get_users, provision_users
+from tasks import read_import_file
+
+
+def test_provision_users_counts_non_object_lines_as_invalid(db_path, tmp_path):
+    path = tmp_path / "users.jsonl"
+    path.write_text("\n".join([
+        '{"alias": "anna", "password": "pw1"}',
+        '[1, 2]',
+        '"x"',
+        '42',
+        '{not json',
+        '{"alias": "anna", "password": "pw2"}',
+        '{"alias": "ben", "password": "pw3", "is_admin": true}',
+    ]) + "\n", encoding="utf-8")
+
+    report = provision_users(read_import_file(str(path)), db_path)
+
+    assert (report["created"], report["duplicate"], report["invalid"]) == (2, 1, 4)
+    aliases = {user[1] for user in get_users(db_path)}
+    assert {"anna", "ben"} <= aliases
@@ -0,0 +1,34 @@
+from datetime import date
+
+import benchmark
+import categories
+import datagen
+from db import connection
+
+
+def test_measure_returns_none_when_input_runs_out_in_memory_run():
+    assert benchmark.measure(benchmark._draw([]), min_time=0) is None
+
+
+def test_measure_stops_when_input_runs_out():
+    stats = benchmark.measure(benchmark._draw(range(4)), min_time=10)
+    assert stats["calls"] == 3
+
+
+def test_datagen_with_fixed_date_is_reproducible(tmp_path):
+    today = date(2025, 6, 30)
+    dumps = []
+    for name in ("a.db", "b.db"):
+        path = str(tmp_path / name)
+        datagen.generate(path, tasks=300, seed=7, today=today)
+        with connection(path) as con:
+            dumps.append(con.execute(
+                "SELECT title, creation_date, completed, due_date FROM task ORDER BY id").fetchall())
+    assert dumps[0] == dumps[1]
+    assert max(row[1] for row in dumps[0]) <= today.isoformat()
+
+
+def test_datagen_refreshes_category_cache(db_path):
+    assert categories.get_categories(db_path) == []      # Cache gefüllt (leer)
+    datagen.generate(db_path, tasks=10, categories=3, seed=1)
+    assert [name for _id, name in categories.get_categories(db_path)] == ["Private", "Shopping", "Work"]
@@ -0,0 +1,14 @@
+import tasks
+from categories import get_categories, get_or_create_category
+
+
+def test_import_tasks_refreshes_category_cache(db_path):
+    get_or_create_category("Work", db_path)
+    assert [name for _id, name in get_categories(db_path)] == ["Work"]     # Cache gefüllt
+
+    records = [(1, {"title": "Water plants", "category": "Home"}),
+               (2, {"title": "Prepare slides", "category": "Work"})]
+    assert tasks.import_tasks(records, 1, db_path) == (2, 0)
+
+    assert [name for _id, name in get_categories(db_path)] == ["Home", "Work"]
+    assert get_or_create_category("Home", db_path) == dict((n, i) for i, n in get_categories(db_path))["Home"]
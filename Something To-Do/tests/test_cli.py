@@ -0,0 +1,79 @@
+import io
+import json
+
+import cli
+from admin import get_users
+
+
+def _run(monkeypatch, capsys, argv, stdin=""):
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    code = cli.main(argv)
+    return code, json.loads(capsys.readouterr().out)
+
+
+def _failed_attempts(db_path, alias):
+    return {row[1]: (row[3], row[2]) for row in get_users(db_path)}[alias]
+
+
+def test_batch_with_wrong_password_counts_failed_attempts(db_path, monkeypatch, capsys):
+    monkeypatch.setenv("TODO_PASSWORD", "wrong")
+    for attempt in (1, 2):
+        code, result = _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "batch"], "task list\n")
+        assert code == cli.EXIT_AUTH and result["committed"] is False
+        assert _failed_attempts(db_path, "admin") == (attempt, 0)
+
+    _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "batch"], "task list\n")
+    assert _failed_attempts(db_path, "admin") == (3, 1)         # gesperrt
+
+
+def test_batch_rolls_back_commands_but_keeps_login(db_path, monkeypatch, capsys):
+    monkeypatch.setenv("TODO_PASSWORD", "admin")
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "batch"],
+                        "task add 'Kept?'\ntask get 9999\n")
+    assert code == cli.EXIT_NOT_FOUND and result["committed"] is False
+
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "task", "list"])
+    assert code == cli.EXIT_OK and result["tasks"] == []
+
+
+def test_user_add_reads_the_password_from_stdin(db_path, monkeypatch, capsys):
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "user", "add", "bob", "--password-stdin"],
+                        "s3cret pw\n")
+    assert code == cli.EXIT_OK
+    assert cli.authenticate("bob", "s3cret pw", db_path)["id"] == result["id"]
+
+
+def test_password_is_not_accepted_on_the_command_line(db_path, monkeypatch, capsys):
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "user", "add", "bob", "--password", "pw"])
+    assert code == cli.EXIT_USAGE and result["ok"] is False
+
+
+def test_reset_password_from_environment(db_path, monkeypatch, capsys):
+    monkeypatch.setenv("TODO_PASSWORD", "admin")
+    monkeypatch.setenv("TODO_NEW_PASSWORD", "changed")
+    code, _result = _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "user", "reset-password", "1"])
+    assert code == cli.EXIT_OK
+    assert cli.authenticate("admin", "changed", db_path) is not None
+
+
+def test_batch_password_stdin_conflicts_with_commands_on_stdin(db_path, monkeypatch, capsys):
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "batch"], "user add bob --password-stdin\n")
+    assert code == cli.EXIT_USAGE and result["committed"] is False
+
+
+def test_batch_help_and_bad_quotes_become_json_errors(db_path, monkeypatch, capsys):
+    monkeypatch.setenv("TODO_PASSWORD", "admin")
+    for line in ("task add 'Kept?'\ntask add --help\n", "task add 'Kept?'\ntask add 'open\n"):
+        code, result = _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "batch"], line)
+        assert code == cli.EXIT_USAGE and result["committed"] is False
+        assert [r["ok"] for r in result["results"]] == [True, False]
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "--user", "admin", "task", "list"])
+    assert result["tasks"] == []
+
+
+def test_unexpected_errors_are_reported_as_json(db_path, monkeypatch, capsys):
+    def broken(_db_path):
+        raise KeyError("boom")
+    monkeypatch.setattr(cli, "get_categories", broken)
+    code, result = _run(monkeypatch, capsys, ["--db", db_path, "category", "list"])
+    assert code == cli.EXIT_ERROR and result == {"ok": False, "error": "KeyError: 'boom'"}
@@ -0,0 +1,26 @@
+import tasks
+from categories import get_or_create_category
+from counters import check_counters, get_all_user_counts, get_user_counts
+
+
+def test_user_counts_include_overdue_per_category(db_path):
+    work = get_or_create_category("Work", db_path)
+    for due, completed, category in [("2025-01-10", 0, work), ("2025-03-01", 0, work),
+                                     ("2025-01-05", 1, work), ("2025-01-02", 0, None), (None, 0, None)]:
+        tasks.create_task("Task", category, None, "2025-01-01", completed, due, 1, db_path)
+
+    counts = get_user_counts(1, db_path, today="2025-02-01")
+    assert counts["categories"] == [("Work", 2, 1, 1), (None, 2, 0, 1)]
+    assert (counts["open"], counts["done"], counts["overdue"]) == (4, 1, 2)
+    assert get_all_user_counts(db_path, today="2025-02-01") == {1: (4, 1, 2)}
+
+
+def test_counters_follow_moves_between_categories(db_path):
+    work = get_or_create_category("Work", db_path)
+    home = get_or_create_category("Home", db_path)
+    task_id = tasks.create_task("Task", work, None, "2025-01-01", 0, "2025-01-10", 1, db_path)
+    tasks.update_task(task_id, 1, category_id=home, db_path=db_path)
+
+    counts = get_user_counts(1, db_path, today="2025-02-01")
+    assert counts["categories"] == [("Home", 1, 0, 1)]
+    assert check_counters(db_path) == []
@@ -0,0 +1,66 @@
+import sqlite3
+
+import pytest
+
+import tasks
+from db import connection, get_pool
+
+
+def _titles(db_path):
+    # Eigene Verbindung außerhalb des Pools: sieht nur Committetes
+    con = sqlite3.connect(db_path)
+    try:
+        return [row[0] for row in con.execute("SELECT title FROM task ORDER BY id")]
+    finally:
+        con.close()
+
+
+def _add(db_path, title):
+    return tasks.create_task(title, None, None, "2025-01-01", 0, None, 1, db_path)
+
+
+def test_writes_while_streaming_are_committed_at_once(db_path):
+    for i in range(5):
+        _add(db_path, f"Task {i}")
+    rows = tasks.iter_tasks(1, db_path, chunk_size=2)
+    next(rows)
+    _add(db_path, "Written while streaming")
+    assert "Written while streaming" in _titles(db_path)
+    del rows                                        # Generator wird verworfen, ohne zu Ende zu lesen
+    assert "Written while streaming" in _titles(db_path)
+
+
+def test_interleaved_generators_do_not_release_a_connection_in_use(db_path):
+    for i in range(6):
+        _add(db_path, f"Task {i}")
+    first = tasks.iter_tasks(1, db_path, chunk_size=2)
+    second = tasks.iter_export_chunks(db_path=db_path, chunk_size=2)
+    next(first)
+    next(second)
+    first.close()                                   # nicht in LIFO-Reihenfolge
+    with connection(db_path) as con:
+        assert con.execute("SELECT COUNT(*) FROM task").fetchone()[0] == 6
+    assert sum(len(chunk) for chunk in second) == 4
+    assert get_pool(db_path)._local.depth == 0
+
+
+def test_inner_error_rolls_back_only_the_inner_block(db_path):
+    with connection(db_path) as con:
+        con.execute("INSERT INTO category (name) VALUES ('Outer')")
+        with pytest.raises(ValueError):
+            with connection(db_path) as inner:
+                inner.execute("INSERT INTO category (name) VALUES ('Inner')")
+                raise ValueError("inner failure")
+        con.execute("INSERT INTO category (name) VALUES ('After')")
+
+    with connection(db_path) as con:
+        names = {row[0] for row in con.execute("SELECT name FROM category")}
+    assert names == {"Outer", "After"}
+
+
+def test_outer_error_rolls_back_released_inner_blocks(db_path):
+    with pytest.raises(ValueError):
+        with connection(db_path):
+            _add(db_path, "Nested")
+            raise ValueError("outer failure")
+    assert _titles(db_path) == []
@@ -0,0 +1,49 @@
+from concurrent.futures import Future
+
+import pytest
+
+gui = pytest.importorskip("gui")
+
+
+class FakeRoot:
+    """Ersetzt tk.Tk: after() merkt sich den nächsten Poll, Fehler werden gesammelt."""
+
+    def __init__(self):
+        self.scheduled = []
+        self.errors = []
+
+    def after(self, _ms, fn):
+        self.scheduled.append(fn)
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.errors.append(exc)
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def test_failing_callback_does_not_stop_polling():
+    root = FakeRoot()
+    busy = []
+    worker = gui.Worker(root, max_workers=1, on_busy=busy.append)
+    results = []
+
+    def broken(_value):
+        raise KeyError("boom")
+
+    worker.watch(None, _done(1), on_done=broken)
+    worker.watch(None, _done(2), on_done=results.append)
+    root.scheduled.pop()()
+
+    assert results == [2]                           # zweites Ergebnis trotz Fehler zugestellt
+    assert [type(e) for e in root.errors] == [KeyError]
+    assert busy == [True, False] and worker.pending == 0
+    assert len(root.scheduled) == 1                 # nächster Poll ist geplant
+
+    worker.watch(None, _done(3), on_done=results.append)
+    root.scheduled.pop()()
+    assert results == [2, 3]
+    worker.shutdown()
@@ -0,0 +1,90 @@
+import pytest
+
+import migrations
+from counters import check_counters
+from db import close_pools, connection
+
+
+def _insert_tasks(con, n, start=0):
+    con.executemany("""
+        INSERT INTO task (title, description, creation_date, completed, due_date, category_id, user_id)
+        VALUES (?, ?, '2025-01-01', ?, ?, ?, ?)
+    """, [(f"Task {i} report", "details", i % 3 == 0, f"2025-01-{i % 28 + 1:02d}" if i % 4 else None,
+           i % 5 or None, i % 3 + 1) for i in range(start, start + n)])
+
+
+@pytest.fixture
+def v3_db(tmp_path):
+    path = str(tmp_path / "old.db")
+    migrations.migrate(path, target=3)
+    with connection(path) as con:
+        _insert_tasks(con, 40)
+    yield path
+    close_pools()
+
+
+def _with_writes_between_blocks(monkeypatch, version):
+    """Simuliert andere Sitzungen, die zwischen zwei Blöcken schreiben."""
+    step = next(m for m in migrations.MIGRATIONS if m.version == version)
+    fill = step.backfill
+
+    def backfill(con, lo, hi):
+        if lo > 1:
+            con.execute("UPDATE task SET title = 'Renamed report', completed = 1 - completed, "
+                        "due_date = '2025-02-01' WHERE id = ?", (lo - 1,))     # schon nachgefüllt
+            con.execute("DELETE FROM task WHERE id = ?", (lo + 2,))             # noch nicht nachgefüllt
+            _insert_tasks(con, 1, start=100 + lo)
+        fill(con, lo, hi)
+    monkeypatch.setattr(step, "backfill", backfill)
+
+
+def test_backfill_in_blocks_keeps_fts_and_counters_consistent(v3_db, monkeypatch):
+    monkeypatch.setattr(migrations, "BATCH_SIZE", 7)
+    _with_writes_between_blocks(monkeypatch, 4)
+    _with_writes_between_blocks(monkeypatch, 5)
+    _with_writes_between_blocks(monkeypatch, 7)
+    migrations.migrate(v3_db)
+
+    with connection(v3_db) as con:
+        assert migrations.get_schema_version(con) == migrations.latest_version()
+        con.execute("INSERT INTO task_fts (task_fts) VALUES ('integrity-check')")
+        matched = {row[0] for row in con.execute("SELECT rowid FROM task_fts WHERE task_fts MATCH 'renamed'")}
+        renamed = {row[0] for row in con.execute("SELECT id FROM task WHERE title = 'Renamed report'")}
+        assert matched == renamed and renamed
+        assert con.execute("SELECT COUNT(*) FROM migration_backfill").fetchone()[0] == 0
+        # Nach dem Abschluss gelten die Trigger wieder für alle Zeilen
+        triggers = [row[0] for row in con.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger'")]
+        assert triggers and not any("migration_backfill" in sql for sql in triggers)
+        assert not migrations.table_exists(con, "task_due_counter")
+    assert check_counters(v3_db) == []
+
+
+def test_backfill_resumes_after_an_aborted_block(v3_db, monkeypatch):
+    monkeypatch.setattr(migrations, "BATCH_SIZE", 10)
+    step = next(m for m in migrations.MIGRATIONS if m.version == 5)
+    fill = step.backfill
+
+    def failing(con, lo, hi):
+        if lo > 20:
+            raise RuntimeError("interrupted")
+        fill(con, lo, hi)
+    monkeypatch.setattr(step, "backfill", failing)
+    with pytest.raises(RuntimeError):
+        migrations.migrate(v3_db)
+    with connection(v3_db) as con:
+        assert migrations.get_schema_version(con) == 4
+        assert con.execute("SELECT done_id FROM migration_backfill WHERE version = 5").fetchone()[0] == 20
+
+    monkeypatch.setattr(step, "backfill", fill)
+    migrations.migrate(v3_db)
+    assert check_counters(v3_db) == []
+
+
+def test_migrate_refuses_an_open_outer_transaction(v3_db):
+    with pytest.raises(RuntimeError):
+        with connection(v3_db) as con:
+            con.execute("UPDATE task SET title = 'Outer' WHERE id = 1")
+            migrations.migrate(v3_db)
+    with connection(v3_db) as con:
+        assert con.execute("SELECT title FROM task WHERE id = 1").fetchone()[0] != "Outer"
+        assert migrations.get_schema_version(con) == 3
@@ -0,0 +1,86 @@
+"""
+Query-Pläne der häufigsten Abfragen (EXPLAIN QUERY PLAN).
+
+Die SQL-Texte kommen aus denselben Buildern/Konstanten wie in tasks.py,
+categories.py und counters.py. Fehler:
+- 'SCAN <tabelle>' ohne Index (Full-Table-Scan)
+- 'SCAN ... USING INDEX' bei Abfragen mit Filter (Index wird komplett gelesen)
+- 'USE TEMP B-TREE' (Sortierung/Gruppierung ohne Index)
+Geprüft wird auf einer frischen Datenbank (ohne Statistiken) und nach ANALYZE.
+"""
+import pytest
+
+import categories
+import counters
+import datagen
+import tasks
+from db import connection
+from tasks import TaskQuery
+
+
+def hot_queries():
+    """Name → (SQL, Parameter, ungefiltert); nur ungefilterte Abfragen dürfen einen Index scannen."""
+    page = {"user_id": 1, "completed": 0, "due_key": "", "last_id": 0, "limit": 51, "offset": 100}
+    queries = {
+        "get_tasks / iter_tasks (admin)": (*TaskQuery(1, True).sql(), True),
+        "count_tasks (admin)": (*TaskQuery(1, True).count_sql(), True),
+        "get_tasks_page offset (admin)": (tasks._page_sql(True, jump=True), page, True),
+        "get_tasks / iter_tasks (user)": (*TaskQuery(1).sql(), False),
+        "count_tasks (user)": (*TaskQuery(1).count_sql(), False),
+        "get_task (user)": (*TaskQuery(1).task_id(1).sql(), False),
+        "get_task (admin)": (*TaskQuery(1, True).task_id(1).sql(), False),
+        "get_tasks_page (user)": (tasks._page_sql(False), page, False),
+        "get_tasks_page (admin)": (tasks._page_sql(True), page, False),
+        "get_tasks_page offset (user)": (tasks._page_sql(False, jump=True), page, False),
+        "TaskQuery open (user)": (*TaskQuery(1).open().sql(), False),
+        "TaskQuery overdue (user)": (*TaskQuery(1).overdue("2025-01-01").sql(), False),
+        "TaskQuery overdue (admin)": (*TaskQuery(1, True).overdue("2025-01-01").sql(), False),
+        "TaskQuery due range (user)": (*TaskQuery(1).due_between("2025-01-01", "2025-01-31").sql(), False),
+        "TaskQuery due range (admin)": (*TaskQuery(1, True).due_between("2025-01-01", "2025-01-31").sql(), False),
+        "TaskQuery owner (admin)": (*TaskQuery(1, True).owner(2).sql(), False),
+        "delete_category (count)": (categories._USAGE_COUNT, (1,), False),
+    }
+    return queries
+
+
+def explain(sql, params, db_path):
+    with connection(db_path) as con:
+        return [row[3] for row in con.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def plan_problems(details, unfiltered):
+    problems = []
+    for detail in details:
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif detail.startswith("SCAN") and not (unfiltered and "USING" in detail and "INDEX" in detail):
+            problems.append(detail)
+    return problems
+
+
+@pytest.fixture(params=["fresh", "analyzed"])
+def plan_db(request, db_path):
+    if request.param == "analyzed":
+        datagen.generate(db_path, tasks=2000, seed=1)
+    return db_path
+
+
+@pytest.mark.parametrize("name", list(hot_queries()))
+def test_query_uses_index(plan_db, name):
+    sql, params, unfiltered = hot_queries()[name]
+    details = explain(sql, params, plan_db)
+    assert plan_problems(details, unfiltered) == [], "\n".join(details)
+
+
+def test_user_category_counts_read_only_the_users_counters(plan_db):
+    # Sortiert werden nur die wenigen Zähler-Zeilen eines Users (TEMP B-TREE ist hier gewollt)
+    details = explain(counters._USER_CATEGORY_COUNTS, ("2025-01-01", 1), plan_db)
+    assert any(d.startswith("SEARCH task_counter USING PRIMARY KEY (user_id=?)") for d in details), details
+    assert any(d.startswith("SEARCH due USING PRIMARY KEY (user_id=? AND category_id=? AND due_date<?)")
+               for d in details), details
+
+
+def test_plan_problems_rejects_filtered_index_scan():
+    assert plan_problems(["SCAN task USING INDEX idx_task_order"], unfiltered=False)
+    assert not plan_problems(["SCAN task USING INDEX idx_task_order"], unfiltered=True)
+    assert plan_problems(["SCAN task"], unfiltered=True)
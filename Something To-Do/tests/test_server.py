@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import server
+from categories import get_categories
+from db import POOL_SIZE
+from sessions import create_session
+
+
+def _request(db_path, method, path, body=None, token=None):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    raw = json.dumps(body).encode() if body is not None else b""
+    req = server.Request(method, path, {}, headers, raw, db_path)
+    status, data, _route = server.dispatch(req)
+    return status, data
+
+
+@pytest.fixture
+def token(db_path):
+    return create_session(1, db_path)
+
+
+@pytest.mark.parametrize("body", [
+    {"title": 5, "category": "Leak"},
+    {"title": "   ", "category": "Leak"},
+    {"category": "Leak"},
+    {"title": "ok", "category": 7},
+    {"title": "ok", "category": "Leak", "due_date": "31.12.2025"},
+])
+def test_create_task_rejects_invalid_fields_without_writing(db_path, token, body):
+    with pytest.raises(server.ApiError) as err:
+        _request(db_path, "POST", "/tasks", body, token)
+    assert err.value.status == 400
+    assert get_categories(db_path) == []
+
+
+def test_create_task(db_path, token):
+    status, data = _request(db_path, "POST", "/tasks", {"title": "Write report", "category": "Work"}, token)
+    assert status == 201
+    status, data = _request(db_path, "GET", f"/tasks/{data['id']}", token=token)
+    assert (data["task"]["title"], data["task"]["category"]) == ("Write report", "Work")
+
+
+@pytest.mark.parametrize("body", [
+    {"name": None},
+    {"name": 123},
+    {"name": {"x": 1}},
+    {"name": "  "},
+    {},
+    {"name": "Work", "description": 5},
+])
+def test_create_category_rejects_non_string_fields(db_path, token, body):
+    with pytest.raises(server.ApiError) as err:
+        _request(db_path, "POST", "/categories", body, token)
+    assert err.value.status == 400
+    assert get_categories(db_path) == []
+
+
+def test_create_category(db_path, token):
+    status, data = _request(db_path, "POST", "/categories", {"name": "Work", "description": None}, token)
+    assert status == 201
+    assert get_categories(db_path) == [(data["id"], "Work")]
+
+
+def test_workers_are_capped_to_pool_size():
+    api = server.ApiServer(workers=POOL_SIZE + 10)
+    try:
+        assert api.executor._max_workers == POOL_SIZE
+    finally:
+        api.executor.shutdown()
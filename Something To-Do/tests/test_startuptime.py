@@ -0,0 +1,14 @@
+import startuptime
+
+
+def test_entry_points_do_not_import_heavy_modules():
+    # Zeiten werden hier nicht geprüft (rechnerabhängig), nur die Importe
+    for module, *_times, heavy, _problems in startuptime.check_startup(runs=1):
+        assert heavy == [], f"{module} imports {heavy} at startup"
+
+
+def test_regression_needs_relative_and_absolute_slowdown():
+    assert not startuptime.is_regression(80, None)
+    assert not startuptime.is_regression(80, 60)        # +33 %
+    assert not startuptime.is_regression(30, 10)        # +200 %, aber nur 20 ms
+    assert startuptime.is_regression(100, 60)
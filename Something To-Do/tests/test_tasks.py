@@ -0,0 +1,31 @@
+import tasks
+from auth import register_user
+
+
+def _task(db_path, user_id=1, title="Write report"):
+    return tasks.create_task(title, None, None, "2025-01-01", 0, None, user_id, db_path)
+
+
+def test_update_task_returns_true_when_changed(db_path):
+    task_id = _task(db_path)
+    assert tasks.update_task(task_id, 1, title="Renamed", db_path=db_path) is True
+    assert tasks.get_task(task_id, 1, db_path=db_path)[1] == "Renamed"
+
+
+def test_update_task_returns_false_without_change(db_path):
+    other = register_user("bob", "secret", db_path)
+    task_id = _task(db_path)
+    assert tasks.update_task(task_id, 1, db_path=db_path) is False                          # nichts geändert
+    assert tasks.update_task(task_id, 1, due_date="31.01.2025", db_path=db_path) is False    # ungültiges Datum
+    assert tasks.update_task(task_id, other, title="Mine", db_path=db_path) is False        # fremder Task
+    assert tasks.update_task(9999, 1, title="Ghost", db_path=db_path, is_admin=True) is False  # gibt es nicht
+    assert tasks.get_task(task_id, 1, db_path=db_path)[1] == "Write report"
+
+
+def test_batch_report_counts_mixed_duplicate_ids_once(db_path, capsys):
+    task_id = _task(db_path)
+    assert tasks.complete_tasks(1, [str(task_id), task_id], db_path) == 1
+    assert capsys.readouterr().out.strip() == "1 task(s) marked as completed."
+
+    assert tasks.delete_tasks(1, (i for i in [task_id, str(task_id), "9999"]), db_path) == 1
+    assert capsys.readouterr().out.strip() == "1 task(s) deleted. (1 not found or not yours)"
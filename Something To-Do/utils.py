@@ -24,3 +24,19 @@ def input_date_or_empty(prompt):
 
 def is_back(val):
     return val.strip() == "0"
+
+
+def parse_id_list(val):
+    """'1, 4, 7-9' → [1, 4, 7, 8, 9]; ValueError bei ungültiger Eingabe."""
+    ids = []
+    for part in val.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = (int(x) for x in part.split("-", 1))
+            if lo > hi:
+                raise ValueError(f"Invalid range '{part}'.")
+            ids.extend(range(lo, hi + 1))
+        else:
+            ids.append(int(part))
+    return ids